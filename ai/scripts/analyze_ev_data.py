@@ -1,32 +1,36 @@
-import pandas as pd
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
-import networkx as nx
-import matplotlib.patches as mpatches
 
-# Load EV dataset
-csv_path = os.path.join(os.path.dirname(__file__), '../data/ev_data.csv')
-df = pd.read_csv(csv_path)
+import pandas as pd
+
+from ev_data import EV_DATA_CSV, extract_lat_lon, iter_ev_data, load_ev_data
+from ev_network import correlation_graph, network_layout
+from ev_stage_cache import StageCache
+from ev_stats import streaming_correlations, summarize
+
+# Load EV dataset (served from the Parquet cache after the first run)
+df = load_ev_data()
 
-# Clean up column names
-df.columns = df.columns.str.strip()
+# Basic summary (grouped tables computed together, one factorize per key)
+summary = summarize(df, {
+    'vehicles_by_make': ('size', 'Make'),
+    'range_by_make': ('mean', 'Make', 'Electric Range'),
+    'missing': ('nulls',),
+})
 
-# Basic summary
 print("=== Head ===")
 print(df.head(), "\n")
 
 print("=== Vehicle Counts by Make ===")
-print(df['Make'].value_counts(), "\n")
+print(summary['vehicles_by_make'].sort_values(ascending=False), "\n")
 
 print("=== Average Electric Range by Make ===")
-print(df.groupby('Make')['Electric Range'].mean().sort_values(ascending=False), "\n")
+print(summary['range_by_make'].sort_values(ascending=False), "\n")
 
 print("=== Unique Electric Vehicle Types ===")
 print(df['Electric Vehicle Type'].unique(), "\n")
 
 print("=== Missing Values per Column ===")
-print(df.isnull().sum(), "\n")
+print(summary['missing'], "\n")
 
 # # Distribution of Electric Range
 # plt.figure(figsize=(8, 4))
@@ -68,17 +72,10 @@ df['MSRP Z-Score'] = (df['Base MSRP'] - df['Base MSRP'].mean()) / df['Base MSRP'
 print("Added 'MSRP Z-Score' column.\n")
 
 # 3. Extract Latitude and Longitude from 'Vehicle Location'
-def extract_lat_lon(wkt):
-    try:
-        wkt = wkt.strip().replace("POINT (", "").replace(")", "")
-        lon, lat = map(float, wkt.split())
-        return pd.Series({'Latitude': lat, 'Longitude': lon})
-    except:
-        return pd.Series({'Latitude': None, 'Longitude': None})
-
-coords = df['Vehicle Location'].apply(extract_lat_lon)
-df = pd.concat([df, coords], axis=1)
-print("Extracted 'Latitude' and 'Longitude' from 'Vehicle Location'.\n")
+lat, lon, malformed = extract_lat_lon(df['Vehicle Location'])
+df['Latitude'] = lat
+df['Longitude'] = lon
+print(f"Extracted 'Latitude' and 'Longitude' from 'Vehicle Location' ({malformed} malformed).\n")
 
 # --- Visualizing Engineered Features ---
 
@@ -112,8 +109,33 @@ print("Extracted 'Latitude' and 'Longitude' from 'Vehicle Location'.\n")
 # === Correlation Matrix (with Engineered Features) ===
 features_for_corr = df.select_dtypes(include=['number']).columns.tolist()
 
+msrp_mean, msrp_std = df['Base MSRP'].mean(), df['Base MSRP'].std()
+
+
+def engineered_batches(batch_size=100_000):
+    """The dataset streamed from disk batch by batch, with the numeric engineered features added."""
+    for batch in iter_ev_data(batch_size=batch_size):
+        batch['MSRP Z-Score'] = (batch['Base MSRP'] - msrp_mean) / msrp_std
+        batch_lat, batch_lon, _ = extract_lat_lon(batch['Vehicle Location'])
+        batch['Latitude'] = batch_lat
+        batch['Longitude'] = batch_lon
+        yield batch
+
+
+# Full, BEV-only and PHEV-only correlations in a single streaming pass over the
+# CSV/Parquet source, so the matrices never need the whole dataset in memory
+vehicle_type = 'Electric Vehicle Type'
+correlations = streaming_correlations(
+    engineered_batches(),
+    features_for_corr,
+    groups={
+        'BEV': lambda batch: batch[vehicle_type].str.contains('Battery Electric', na=False),
+        'PHEV': lambda batch: batch[vehicle_type].str.contains('Plug-in Hybrid', na=False),
+    },
+)
+
 print("=== Correlation Matrix (with Engineered Features) ===")
-print(df[features_for_corr].corr(), "\n")
+print(correlations['all'].corr(), "\n")
 
 # Updated Heatmap including engineered features
 # plt.figure(figsize=(10, 6))
@@ -122,41 +144,36 @@ print(df[features_for_corr].corr(), "\n")
 # plt.tight_layout()
 # plt.show()
 
-# Compute correlation matrix
-corr_matrix = df[features_for_corr].corr()
+# Plotting libraries are only needed from here on; importing them late lets the
+# summaries above print before matplotlib/seaborn/networkx have loaded
+import matplotlib.pyplot as plt
+import matplotlib.patches as mpatches
+import networkx as nx
+import seaborn as sns
+
+corr_matrix = correlations['all'].corr()
 
 # Threshold to draw edges (e.g., |correlation| > 0.5)
 threshold = 0.5
 
-# Create graph from filtered correlations
-G = nx.Graph()
-
-# Add nodes
-for col in corr_matrix.columns:
-    G.add_node(col)
-
-# Add edges with correlation weights
-for i in range(len(corr_matrix.columns)):
-    for j in range(i):
-        corr_value = corr_matrix.iloc[i, j]
-        if abs(corr_value) >= threshold:
-            G.add_edge(
-                corr_matrix.columns[i],
-                corr_matrix.columns[j],
-                weight=corr_value
-            )
+# Create graph from filtered correlations, all edges added in one vectorized pass
+G = correlation_graph(corr_matrix, threshold)
 
 # Draw the graph
 plt.figure(figsize=(10, 8))
-pos = nx.spring_layout(G, seed=42)  # force-directed layout
+# Force-directed layout, cached per graph structure so later runs reuse it
+stages = StageCache(os.path.join(os.path.dirname(os.path.abspath(EV_DATA_CSV)), '.cache', 'stages'))
+pos = network_layout(G, stages=stages)
 
 # Draw nodes and edges
 nx.draw_networkx_nodes(G, pos, node_color='lightblue', node_size=1500)
+edge_corr = list(G.edges(data='corr'))
 # Color edges based on sign
-edge_colors = ['red' if G[u][v]['weight'] < 0 else 'green' for u, v in G.edges()]
-edge_weights = [abs(G[u][v]['weight']) * 3 for u, v in G.edges()]  # emphasize strength
+edge_colors = ['red' if value < 0 else 'green' for _, _, value in edge_corr]
+edge_weights = [abs(value) * 3 for _, _, value in edge_corr]  # emphasize strength
 edges = nx.draw_networkx_edges(
     G, pos,
+    edgelist=[(u, v) for u, v, _ in edge_corr],
     edge_color=edge_colors,
     width=edge_weights
 )
@@ -170,16 +187,10 @@ plt.axis('off')
 plt.tight_layout()
 plt.show()
 
-# Filter for Battery Electric Vehicles (BEV)
-bev_df = df[df['Electric Vehicle Type'].str.contains('Battery Electric', na=False)]
-
-print(f"Filtered BEV dataset contains {len(bev_df)} records.\n")
-
-# Select numeric features from BEV-only data
-bev_features = bev_df.select_dtypes(include=['number']).columns.tolist()
+# Battery Electric Vehicles (BEV) only, accumulated above without a filtered copy
+print(f"Filtered BEV dataset contains {correlations['BEV'].rows} records.\n")
 
-# Compute correlation matrix
-bev_corr = bev_df[bev_features].corr()
+bev_corr = correlations['BEV'].corr()
 
 # Display correlation matrix
 print("=== BEV-Only Correlation Matrix ===")
@@ -192,9 +203,7 @@ plt.title("Correlation Heatmap (Battery Electric Vehicles Only)")
 plt.tight_layout()
 plt.show()
 
-phev_df = df[df['Electric Vehicle Type'].str.contains('Plug-in Hybrid', na=False)]
-phev_features = phev_df.select_dtypes(include=['number']).columns.tolist()
-phev_corr = phev_df[phev_features].corr()
+phev_corr = correlations['PHEV'].corr()
 
 plt.figure(figsize=(10, 6))
 sns.heatmap(phev_corr, annot=True, cmap="coolwarm", fmt=".2f")
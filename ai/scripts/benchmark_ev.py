@@ -0,0 +1,238 @@
+"""
+Benchmark the EV pipeline on synthetic datasets of increasing size.
+
+    python benchmark_ev.py --sizes 10k,100k,1M --repeat 3
+    python benchmark_ev.py --sizes 100k --methods kmeans,dbscan --compare ../data/benchmarks/ev-previous.json
+
+Synthetic ev_data.csv files (see ev_synthetic.py) are generated once per size
+and reused. Each run times loading, feature_engineering, every cluster_dispatch
+method and the correlation steps of analyze_ev_data.py, and writes the results
+with the environment they were measured in to a JSON file, so runs can be
+compared over time.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from importlib import metadata
+
+from ev_clustering import (
+    CLUSTER_METHODS,
+    DEFAULT_CLUSTER_KWARGS,
+    cluster_dispatch,
+    feature_engineering,
+    load_and_prepare_data,
+)
+from ev_data import DATA_DIR, cache_path_for, iter_frame_batches, load_ev_data
+from ev_stats import streaming_correlations, summarize
+from ev_synthetic import write_ev_csv
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000, 10_000_000)
+SYNTHETIC_DIR = os.path.join(DATA_DIR, '.cache', 'synthetic')
+BENCHMARK_DIR = os.path.join(DATA_DIR, 'benchmarks')
+FEATURES = ['Electric Range', 'Base MSRP', 'Model Year']
+LIBRARIES = ('pandas', 'numpy', 'scikit-learn', 'scipy', 'pyarrow')
+SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+WARMUP_ROWS = 20_000
+
+
+def parse_size(text):
+    """'10000', '100k' or '1M' -> number of rows."""
+    text = text.strip().lower().replace('_', '')
+    if text[-1:] in SUFFIXES:
+        return int(float(text[:-1]) * SUFFIXES[text[-1]])
+    return int(text)
+
+
+def format_size(n_rows):
+    for suffix, factor in (('M', 1_000_000), ('k', 1_000)):
+        if n_rows >= factor and n_rows % factor == 0:
+            return f"{n_rows // factor}{suffix}"
+    return str(n_rows)
+
+
+def synthetic_csv(n_rows, data_dir=SYNTHETIC_DIR, random_state=0):
+    """Path of the synthetic dataset with n_rows rows, generating it on first use."""
+    path = os.path.join(data_dir, f"ev_data_{format_size(n_rows)}_seed{random_state}.csv")
+    if not os.path.exists(path):
+        started = time.perf_counter()
+        write_ev_csv(path, n_rows, random_state=random_state)
+        print(f"Generated {path} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return path
+
+
+def environment():
+    versions = {}
+    for library in LIBRARIES:
+        try:
+            versions[library] = metadata.version(library)
+        except metadata.PackageNotFoundError:
+            versions[library] = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'libraries': versions,
+        'git_commit': commit,
+    }
+
+
+def pipeline_stages(csv_path, methods):
+    """
+    Yield (stage, function) pairs in pipeline order. Later stages use the
+    results of earlier ones, which are kept in a shared dict.
+    """
+    state = {}
+
+    def load_csv():
+        state['df'] = load_ev_data(csv_path, use_cache=False)
+
+    def load_prepared():
+        state['prepared'] = feature_engineering(load_and_prepare_data(csv_path))
+
+    def correlations():
+        vehicle_type = 'Electric Vehicle Type'
+        columns = state['df'].select_dtypes(include=['number']).columns.tolist()
+        state['correlations'] = streaming_correlations(
+            iter_frame_batches(state['df'], 100_000),
+            columns,
+            groups={
+                'BEV': lambda batch: batch[vehicle_type].str.contains('Battery Electric', na=False),
+                'PHEV': lambda batch: batch[vehicle_type].str.contains('Plug-in Hybrid', na=False),
+            },
+        )
+
+    yield 'load_csv', load_csv
+    # The first cached load writes the Parquet file; time the warm reads
+    yield 'load_parquet', lambda: load_ev_data(csv_path)
+    yield 'feature_engineering', lambda: feature_engineering(state['df'])
+    yield 'summarize', lambda: summarize(state['df'], {
+        'vehicles_by_make': ('size', 'Make'),
+        'range_by_make': ('mean', 'Make', 'Electric Range'),
+        'missing': ('nulls',),
+    })
+    yield 'streaming_correlations', correlations
+    yield 'correlation_matrix', lambda: [accumulator.corr() for accumulator in state['correlations'].values()]
+    yield 'load_and_prepare_data', load_prepared
+    for method in methods:
+        yield f"cluster:{method}", lambda method=method: cluster_dispatch(
+            method, state['prepared'], FEATURES, **DEFAULT_CLUSTER_KWARGS[method]
+        )
+
+
+def warm_up(methods, data_dir=SYNTHETIC_DIR):
+    """Run every stage once on a tiny dataset, so lazy imports are not timed in the first stage that needs them."""
+    csv_path = synthetic_csv(WARMUP_ROWS, data_dir)
+    with redirect_stdout(io.StringIO()):
+        load_ev_data(csv_path)
+        for _, run in pipeline_stages(csv_path, methods):
+            run()
+
+
+def benchmark_size(n_rows, methods, repeat=3, data_dir=SYNTHETIC_DIR, verbose=False):
+    """Time every pipeline stage repeat times on the n_rows dataset. Returns a list of result dicts."""
+    csv_path = synthetic_csv(n_rows, data_dir)
+    with redirect_stdout(sys.stdout if verbose else io.StringIO()):
+        # Rebuild the Parquet cache from this CSV, outside the timed stages
+        if os.path.exists(cache_path_for(csv_path)):
+            os.remove(cache_path_for(csv_path))
+        load_ev_data(csv_path)
+
+    seconds = {}
+    for _ in range(repeat):
+        for stage, run in pipeline_stages(csv_path, methods):
+            started = time.perf_counter()
+            with redirect_stdout(sys.stdout if verbose else io.StringIO()):
+                run()
+            seconds.setdefault(stage, []).append(round(time.perf_counter() - started, 4))
+
+    results = []
+    for stage, runs in seconds.items():
+        results.append({
+            'rows': n_rows, 'stage': stage, 'seconds': runs,
+            'min': min(runs), 'median': round(statistics.median(runs), 4),
+        })
+        print(f"{format_size(n_rows):>6} {stage:<32} min {min(runs):9.3f}s  median {statistics.median(runs):9.3f}s",
+              file=sys.stderr)
+    return results
+
+
+def compare(results, previous):
+    """Print median ratios (current / previous) for the stages both runs measured."""
+    before = {(result['rows'], result['stage']): result['median'] for result in previous['results']}
+    print(f"Compared with {previous.get('created')} (commit {previous['environment'].get('git_commit')}):")
+    for result in results:
+        key = (result['rows'], result['stage'])
+        if key in before and before[key] > 0:
+            ratio = result['median'] / before[key]
+            print(f"{format_size(result['rows']):>6} {result['stage']:<32} {before[key]:9.3f}s -> "
+                  f"{result['median']:9.3f}s  x{ratio:.2f}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the EV pipeline on synthetic datasets.")
+    parser.add_argument('--sizes', default=','.join(map(format_size, DEFAULT_SIZES)),
+                        help="comma-separated row counts, e.g. 10k,100k,1M (default: %(default)s)")
+    parser.add_argument('--methods', default=','.join(CLUSTER_METHODS),
+                        help="comma-separated cluster_dispatch methods (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per stage (default: %(default)s)")
+    parser.add_argument('--data-dir', default=SYNTHETIC_DIR,
+                        help="where synthetic CSVs are generated and reused (default: %(default)s)")
+    parser.add_argument('--output', help="results JSON (default: ev-<timestamp>.json in the benchmarks directory)")
+    parser.add_argument('--compare', metavar='JSON', help="earlier results to compare medians against")
+    parser.add_argument('--verbose', action='store_true', help="show the output of the timed stages")
+    return parser
+
+
+def cli(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        sizes = [parse_size(size) for size in args.sizes.split(',')]
+    except ValueError:
+        parser.error(f"invalid --sizes: {args.sizes}")
+    methods = [method.strip() for method in args.methods.split(',')]
+    unknown = sorted(set(methods) - set(CLUSTER_METHODS))
+    if unknown:
+        parser.error(f"unknown methods: {', '.join(unknown)}")
+
+    created = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    warm_up(methods, args.data_dir)
+    results = []
+    for n_rows in sizes:
+        results.extend(benchmark_size(n_rows, methods, args.repeat, args.data_dir, args.verbose))
+
+    report = {
+        'created': created,
+        'environment': environment(),
+        'config': {'sizes': sizes, 'methods': methods, 'repeat': args.repeat,
+                   'cluster_kwargs': {method: DEFAULT_CLUSTER_KWARGS[method] for method in methods}},
+        'results': results,
+    }
+    output = args.output or os.path.join(BENCHMARK_DIR, f"ev-{created.replace(':', '').replace('-', '')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+    return report
+
+
+if __name__ == "__main__":
+    cli()
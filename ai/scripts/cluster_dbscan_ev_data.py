@@ -1,5 +1,7 @@
+import sys
+
 import pandas as pd
-import os
+import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import networkx as nx
@@ -8,14 +10,14 @@ from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import DBSCAN
 
-# Load EV dataset
-csv_path = os.path.join(os.path.dirname(__file__), '../data/ev_data.csv')
-df = pd.read_csv(csv_path)
+from ev_cluster_assign import label_and_merge_clusters
+from ev_data import CLUSTER_COLUMNS, extract_lat_lon, filter_priced, load_ev_data
+from ev_dbscan import dbscan_sweep
 
-# Clean up column names
-df.columns = df.columns.str.strip()
+# Load EV dataset (served from the Parquet cache after the first run)
+df = load_ev_data(columns=CLUSTER_COLUMNS)
 
-df = df[df['Base MSRP'] > 1000]
+df = filter_priced(df)
 
 cluster_labels = {
     0: 'Early BEV (Tesla S)',
@@ -37,17 +39,10 @@ df['MSRP Z-Score'] = (df['Base MSRP'] - df['Base MSRP'].mean()) / df['Base MSRP'
 print("Added 'MSRP Z-Score' column.\n")
 
 # 3. Extract Latitude and Longitude from 'Vehicle Location'
-def extract_lat_lon(wkt):
-    try:
-        wkt = wkt.strip().replace("POINT (", "").replace(")", "")
-        lon, lat = map(float, wkt.split())
-        return pd.Series({'Latitude': lat, 'Longitude': lon})
-    except:
-        return pd.Series({'Latitude': None, 'Longitude': None})
-
-coords = df['Vehicle Location'].apply(extract_lat_lon)
-df = pd.concat([df, coords], axis=1)
-print("Extracted 'Latitude' and 'Longitude' from 'Vehicle Location'.\n")
+lat, lon, malformed = extract_lat_lon(df['Vehicle Location'])
+df['Latitude'] = lat
+df['Longitude'] = lon
+print(f"Extracted 'Latitude' and 'Longitude' from 'Vehicle Location' ({malformed} malformed).\n")
 
 # Select features for clustering
 features = ['Electric Range', 'Base MSRP', 'Model Year']
@@ -61,17 +56,19 @@ scaled_features = scaler.fit_transform(ev_cluster_df)
 
 print("Feature matrix shape:", scaled_features.shape)
 
+# Compare eps/min_samples settings from a single neighbor graph (run with --sweep)
+if '--sweep' in sys.argv[1:]:
+    print("=== DBSCAN Parameter Sweep ===")
+    print(dbscan_sweep(scaled_features, [0.5, 1.0, 1.5], [5, 10, 20]), "\n")
+
 # === DBSCAN Clustering ===
 dbscan = DBSCAN(eps=1.5, min_samples=5)
-df_clustered = ev_cluster_df.copy()
-df_clustered['Cluster'] = dbscan.fit_predict(scaled_features)
-df_clustered_tmp = df_clustered.copy()
-df_clustered_tmp['Cluster'] = dbscan.fit_predict(scaled_features)
-df_clustered_tmp['Cluster Label'] = df_clustered_tmp['Cluster'].map(cluster_labels)
+df_clustered = ev_cluster_df
+df_clustered['Cluster'] = dbscan.fit_predict(scaled_features).astype(np.int32)
 
 plt.figure(figsize=(8, 5))
 sns.scatterplot(
-    data=df_clustered_tmp,
+    data=df_clustered,
     x='Electric Range',
     y='Base MSRP',
     hue='Cluster',
@@ -83,15 +80,11 @@ plt.ylabel('Base MSRP')
 plt.tight_layout()
 plt.show()
 
-# Add DBSCAN cluster labels to full DataFrame
-df_clusters = df.copy()
-df_clusters['Cluster'] = -1  # default
-df_clusters.loc[df_clustered.index, 'Cluster'] = df_clustered['Cluster']
-
-df_clusters['Cluster Label'] = df_clusters['Cluster'].map(cluster_labels)
+# Add DBSCAN cluster labels to full DataFrame (in place, -1 for rows not clustered)
+df_clusters = label_and_merge_clusters(df, df_clustered, cluster_labels)
 
 print("=== DBSCAN Cluster Summary ===")
-print(df_clusters.groupby('Cluster')[['Electric Range', 'Base MSRP', 'Model Year']].mean(), "\n")
+print(df_clusters.groupby('Cluster', observed=True)[['Electric Range', 'Base MSRP', 'Model Year']].mean(), "\n")
 
 print("=== DBSCAN Cluster Sizes ===")
 print(df_clusters['Cluster'].value_counts(), "\n")
@@ -103,14 +96,15 @@ plt.suptitle('Pairwise Feature Distribution by Cluster', y=1.02)
 plt.show()
 
 print("=== Vehicle Type Breakdown by Cluster ===")
-print(df_clusters.groupby('Cluster')['Electric Vehicle Type'].value_counts())
+# Categorical value_counts list unobserved categories with count 0; drop them
+print(df_clusters.groupby('Cluster', observed=True)['Electric Vehicle Type'].value_counts()[lambda s: s > 0])
 
 sns.countplot(data=df_clusters, x='Cluster', hue='Electric Vehicle Type')
 plt.title("Vehicle Type by Cluster")
 plt.tight_layout()
 plt.show()
 
-print(df_clusters[df_clusters['Cluster'] == 0][['Make', 'Model', 'Electric Vehicle Type']].value_counts().head(10))
+print(df_clusters[df_clusters['Cluster'] == 0][['Make', 'Model', 'Electric Vehicle Type']].value_counts()[lambda s: s > 0].head(10))
 
 sns.scatterplot(data=df_clusters.loc[df_clustered.index], 
                 x='Model Year', y='Base MSRP', hue='Cluster Label', palette='tab10')
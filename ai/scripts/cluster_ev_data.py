@@ -1,5 +1,4 @@
 import pandas as pd
-import os
 import matplotlib.pyplot as plt
 import seaborn as sns
 import networkx as nx
@@ -7,12 +6,10 @@ import matplotlib.patches as mpatches
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 
-# Load EV dataset
-csv_path = os.path.join(os.path.dirname(__file__), '../data/ev_data.csv')
-df = pd.read_csv(csv_path)
+from ev_data import CLUSTER_COLUMNS, extract_lat_lon, load_ev_data
 
-# Clean up column names
-df.columns = df.columns.str.strip()
+# Load EV dataset (served from the Parquet cache after the first run)
+df = load_ev_data(columns=CLUSTER_COLUMNS)
 
 # 1. Create a new column for Electric Range Category
 bins = [0, 50, 150, float('inf')]
@@ -25,17 +22,10 @@ df['MSRP Z-Score'] = (df['Base MSRP'] - df['Base MSRP'].mean()) / df['Base MSRP'
 print("Added 'MSRP Z-Score' column.\n")
 
 # 3. Extract Latitude and Longitude from 'Vehicle Location'
-def extract_lat_lon(wkt):
-    try:
-        wkt = wkt.strip().replace("POINT (", "").replace(")", "")
-        lon, lat = map(float, wkt.split())
-        return pd.Series({'Latitude': lat, 'Longitude': lon})
-    except:
-        return pd.Series({'Latitude': None, 'Longitude': None})
-
-coords = df['Vehicle Location'].apply(extract_lat_lon)
-df = pd.concat([df, coords], axis=1)
-print("Extracted 'Latitude' and 'Longitude' from 'Vehicle Location'.\n")
+lat, lon, malformed = extract_lat_lon(df['Vehicle Location'])
+df['Latitude'] = lat
+df['Longitude'] = lon
+print(f"Extracted 'Latitude' and 'Longitude' from 'Vehicle Location' ({malformed} malformed).\n")
 
 # Select features for clustering
 features = ['Electric Range', 'Base MSRP', 'Model Year']
@@ -87,7 +77,7 @@ df_clusters['Cluster'] = -1  # default for rows not in training set
 df_clusters.loc[ev_cluster_df.index, 'Cluster'] = ev_cluster_df['Cluster']
 
 print("=== Cluster Summary ===")
-cluster_profile = df_clusters.groupby('Cluster')[['Electric Range', 'Base MSRP', 'Model Year']].mean()
+cluster_profile = df_clusters.groupby('Cluster', observed=True)[['Electric Range', 'Base MSRP', 'Model Year']].mean()
 print(cluster_profile, "\n")
 
 print("=== Cluster Sizes ===")
@@ -100,7 +90,8 @@ plt.suptitle('Pairwise Feature Distribution by Cluster', y=1.02)
 plt.show()
 
 print("=== Vehicle Type Breakdown by Cluster ===")
-print(df_clusters.groupby('Cluster')['Electric Vehicle Type'].value_counts())
+# Categorical value_counts list unobserved categories with count 0; drop them
+print(df_clusters.groupby('Cluster', observed=True)['Electric Vehicle Type'].value_counts()[lambda s: s > 0])
 
 sns.countplot(data=df_clusters, x='Cluster', hue='Electric Vehicle Type')
 plt.title("Vehicle Type by Cluster")
@@ -1,230 +1,307 @@
-import pandas as pd
+import argparse
+import inspect
+import json
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import DBSCAN, AgglomerativeClustering, KMeans
-from scipy.cluster.hierarchy import linkage, dendrogram, fcluster
-import networkx as nx
-import numpy as np
-
-def plot_correlation_network(df, features, threshold=0.5):
-    corr = df[features].corr()
-    G = nx.Graph()
-
-    for i in range(len(corr.columns)):
-        for j in range(i + 1, len(corr.columns)):
-            value = corr.iloc[i, j]
-            if abs(value) >= threshold:
-                G.add_edge(corr.columns[i], corr.columns[j], weight=abs(value), label=f"{value:.2f}")
-
-    pos = nx.spring_layout(G, seed=42)
-    plt.figure(figsize=(8, 6))
-    nx.draw(G, pos, with_labels=True, node_size=1500, node_color='lightblue', font_size=10, width=2)
-    edge_labels = nx.get_edge_attributes(G, 'label')
-    nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels)
-    plt.title(f"Correlation Network (threshold ≥ {threshold})")
-    plt.tight_layout()
-    plt.show()
-
-def load_and_prepare_data():
-    csv_path = os.path.join(os.path.dirname(__file__), '../data/ev_data.csv')
-    df = pd.read_csv(csv_path)
-    df.columns = df.columns.str.strip()
-    df = df[df['Base MSRP'] > 1000]
-    return df
-
-def feature_engineering(df):
-    bins = [0, 50, 150, float('inf')]
-    labels = ['Short Range', 'Medium Range', 'Long Range']
-    df['Range Category'] = pd.cut(df['Electric Range'], bins=bins, labels=labels)
-
-    df['MSRP Z-Score'] = (df['Base MSRP'] - df['Base MSRP'].mean()) / df['Base MSRP'].std()
-
-    def extract_lat_lon(wkt):
-        try:
-            wkt = wkt.strip().replace("POINT (", "").replace(")", "")
-            lon, lat = map(float, wkt.split())
-            return pd.Series({'Latitude': lat, 'Longitude': lon})
-        except:
-            return pd.Series({'Latitude': None, 'Longitude': None})
-
-    coords = df['Vehicle Location'].apply(extract_lat_lon)
-    df = pd.concat([df, coords], axis=1)
-    return df
-
-def run_dbscan(df, features, eps=1.5, min_samples=5, max_samples=50000):
-    ev_cluster_df = df[features].replace([np.inf, -np.inf], np.nan).dropna()
-    if len(ev_cluster_df) > max_samples:
-        ev_cluster_df = ev_cluster_df.sample(n=max_samples, random_state=42)
-
-    scaler = StandardScaler()
-    scaled_features = scaler.fit_transform(ev_cluster_df)
-
-    dbscan = DBSCAN(eps=eps, min_samples=min_samples)
-    ev_cluster_df['Cluster'] = dbscan.fit_predict(scaled_features)
-    return df, ev_cluster_df
-
-def run_kmeans(df, features, n_clusters=5, max_samples=50000):
-    ev_cluster_df = df[features].replace([np.inf, -np.inf], np.nan).dropna()
-    if len(ev_cluster_df) > max_samples:
-        ev_cluster_df = ev_cluster_df.sample(n=max_samples, random_state=42)
-
-    scaler = StandardScaler()
-    scaled_features = scaler.fit_transform(ev_cluster_df)
-
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-    ev_cluster_df['Cluster'] = kmeans.fit_predict(scaled_features)
-    return df, ev_cluster_df
-
-def run_hierarchical(df, features, n_clusters=5, max_samples=50000):
-    ev_cluster_df = df[features].replace([np.inf, -np.inf], np.nan).dropna()
-    if len(ev_cluster_df) > max_samples:
-        ev_cluster_df = ev_cluster_df.sample(n=max_samples, random_state=42)
-
-    scaler = StandardScaler()
-    scaled_features = scaler.fit_transform(ev_cluster_df)
-
-    hc = AgglomerativeClustering(n_clusters=n_clusters)
-    ev_cluster_df['Cluster'] = hc.fit_predict(scaled_features)
-    return df, ev_cluster_df
-
-def compute_hierarchical_clusters(df, features, distance_threshold=25, max_samples=500):
-    df_sample = df[features].replace([np.inf, -np.inf], np.nan).dropna()
-    if len(df_sample) > max_samples:
-        df_sample = df_sample.sample(n=max_samples, random_state=42)
-
-    scaler = StandardScaler()
-    scaled = scaler.fit_transform(df_sample)
-
-    linked = linkage(scaled, method='ward')
-    cluster_assignments = fcluster(linked, t=distance_threshold, criterion='distance')
-    df_sample = df_sample.copy()
-    df_sample['Cluster'] = cluster_assignments
-
-    return df_sample, linked
-
-def plot_dendrogram(linked, cutoff=None):
-    plt.figure(figsize=(12, 6))
-    dendrogram(linked,
-               orientation='top',
-               distance_sort='descending',
-               show_leaf_counts=True)
-
-    if cutoff:
-        plt.axhline(y=cutoff, c='red', linestyle='--', label=f'Distance Cutoff = {cutoff}')
-        plt.legend()
-
-    plt.title("Hierarchical Clustering Dendrogram")
-    plt.xlabel("Sample Index")
-    plt.ylabel("Distance")
-    plt.tight_layout()
-    plt.show()
-
-def label_and_merge_clusters(df, ev_cluster_df, cluster_labels):
-    df_clusters = df.copy()
-    df_clusters['Cluster'] = -1
-    df_clusters.loc[ev_cluster_df.index, 'Cluster'] = ev_cluster_df['Cluster']
-    df_clusters['Cluster Label'] = df_clusters['Cluster'].map(cluster_labels)
-    return df_clusters
-
-def plot_clusters(ev_cluster_df, cluster_labels):
-    ev_cluster_df = ev_cluster_df.copy()
-    ev_cluster_df['Cluster Label'] = ev_cluster_df['Cluster'].map(cluster_labels)
-
-    plt.figure(figsize=(8, 5))
-    sns.scatterplot(
-        data=ev_cluster_df,
-        x='Electric Range',
-        y='Base MSRP',
-        hue='Cluster Label',
-        palette='tab10'
-    )
-    plt.title('Clustering of EVs')
-    plt.xlabel('Electric Range')
-    plt.ylabel('Base MSRP')
-    plt.tight_layout()
-    plt.show()
-
-def analyze_clusters(df_clusters):
-    print("=== Cluster Summary ===")
-    print(df_clusters.groupby('Cluster')[['Electric Range', 'Base MSRP', 'Model Year']].mean(), "\n")
-
-    print("=== Cluster Sizes ===")
-    print(df_clusters['Cluster'].value_counts(), "\n")
-
-    sns.pairplot(df_clusters.dropna(subset=['Cluster Label']), 
-                 vars=['Electric Range', 'Base MSRP', 'Model Year'], 
-                 hue='Cluster Label', palette='Set2')
-    plt.suptitle('Pairwise Feature Distribution by Cluster', y=1.02)
-    plt.show()
-
-    print("=== Vehicle Type Breakdown by Cluster ===")
-    print(df_clusters.groupby('Cluster')['Electric Vehicle Type'].value_counts())
-
-    sns.countplot(data=df_clusters, x='Cluster', hue='Electric Vehicle Type')
-    plt.title("Vehicle Type by Cluster")
-    plt.tight_layout()
-    plt.show()
-
-    print(df_clusters[df_clusters['Cluster'] == 0][['Make', 'Model', 'Electric Vehicle Type']].value_counts().head(10))
-
-    sns.scatterplot(data=df_clusters[df_clusters['Cluster'] != -1], 
-                    x='Model Year', y='Base MSRP', hue='Cluster Label', palette='tab10')
-    plt.title("Model Year vs MSRP by Cluster")
-    plt.tight_layout()
-    plt.show()
-
-def cluster_dispatch(method, df, features, **kwargs):
-    if method == 'dbscan':
-        return run_dbscan(df, features, **kwargs)
-    elif method == 'kmeans':
-        return run_kmeans(df, features, **kwargs)
-    elif method == 'hierarchical':
-        return run_hierarchical(df, features, **kwargs)
-    elif method == 'hierarchical_fcluster':
-        return compute_hierarchical_clusters(df, features, **kwargs)
-    else:
-        raise ValueError(f"Unknown clustering method: {method}")
-
-def generate_cluster_labels(df_clusters):
-    grouped = df_clusters.groupby('Cluster')[['Electric Range', 'Base MSRP', 'Model Year']].mean()
-    labels = {}
-    for cluster, row in grouped.iterrows():
-        label = f"Range≈{int(row['Electric Range'])} MSRP≈{int(row['Base MSRP']/1000)}k Year≈{int(row['Model Year'])}"
-        labels[cluster] = label
-    return labels
-
-def main():
-    df = load_and_prepare_data()
-    df = feature_engineering(df)
-    features = ['Electric Range', 'Base MSRP', 'Model Year']
+import sys
+import time
+from contextlib import contextmanager, nullcontext
 
-    clustering_method = 'kmeans'  # Options: 'dbscan', 'kmeans', 'hierarchical', 'hierarchical_fcluster'
+from ev_importtime import ImportTimer
 
-    cluster_kwargs = {}
+# Run as a script with --import-report, the timer is installed before the
+# imports below so the report covers them; importing this module never installs
+# it. Plotting libraries, sklearn and scipy are imported inside the functions
+# that use them, so a run only pays for the backend and output it asks for.
+IMPORT_TIMER = ImportTimer().install() if __name__ == '__main__' and '--import-report' in sys.argv[1:] else None
 
-    if clustering_method in ['kmeans', 'hierarchical']:
-        cluster_kwargs['n_clusters'] = 5
-    elif clustering_method == 'dbscan':
-        cluster_kwargs = {'eps': 1.5, 'min_samples': 5}
-    elif clustering_method == 'hierarchical_fcluster':
-        cluster_kwargs = {'distance_threshold': 25}
-
-    plot_correlation_network(df, features, threshold=0.2)
+import pandas as pd
+import numpy as np
 
-    # Run the selected clustering method
-    if clustering_method == 'hierarchical_fcluster':
-        df_clustered, linkage_matrix = cluster_dispatch(clustering_method, df, features, **cluster_kwargs)
-        plot_dendrogram(linkage_matrix, cutoff=25)
-    else:
-        df, df_clustered = cluster_dispatch(clustering_method, df, features, **cluster_kwargs)
+from ev_artifacts import save_cluster_model
+from ev_cluster_assign import assign_in_chunks, label_and_merge_clusters, nearest_centroid
+from ev_clustering import (
+    CLUSTER_METHODS,
+    CLUSTER_PROFILE_FEATURES,
+    DEFAULT_CLUSTER_KWARGS,
+    analyze_clusters,
+    cluster_stage,
+    describe_clusters,
+    feature_engineering,
+    generate_cluster_labels,
+    load_and_prepare_data,
+    plot_clusters,
+    plot_correlation_network,
+    plot_dendrogram,
+    sweep_dbscan,
+)
+from ev_data import CLUSTER_COLUMNS, DATA_DIR, EV_DATA_CSV, cache_path_for, filter_priced, iter_ev_data
+from ev_plotting import DEFAULT_MAX_POINTS, FIGURE_FORMATS, PLOT_MODES, configure_plots, save_figures_to
+from ev_profiling import CAPTURES, StageProfiler, stage
+from ev_stage_cache import StageCache, file_fingerprint
+from ev_stats import CorrelationAccumulator
+
+STREAMING_OUTPUT_CSV = os.path.join(DATA_DIR, 'ev_clusters.csv')
+HYPERPARAMETERS = (
+    'n_clusters', 'eps', 'min_samples', 'max_samples', 'distance_threshold', 'batch_size', 'tol', 'n_micro',
+)
+
+@contextmanager
+def timed(timings, name):
+    """Time a pipeline stage into timings[name]; also recorded by an active StageProfiler."""
+    started = time.perf_counter()
+    with stage(name) as record:
+        yield record
+    timings[name] = round(time.perf_counter() - started, 4)
+
+def main(method='kmeans', cluster_kwargs=None, csv_path=EV_DATA_CSV, output_dir=None, use_stage_cache=True,
+         artifact_dir=None, plots=True, sweep=False):
+    """
+    Run the clustering pipeline and return {stage: seconds}.
+
+    cluster_kwargs override DEFAULT_CLUSTER_KWARGS for the method. With
+    output_dir the labeled rows are written to clusters.csv there. With
+    plots=False only the printed summaries are produced and no plotting
+    library is imported. With sweep=True a DBSCAN run first prints an eps x
+    min_samples parameter sweep.
+    """
+    timings = {}
+    features = ['Electric Range', 'Base MSRP', 'Model Year']
+    user_kwargs = cluster_kwargs or {}
+    cluster_kwargs = {**DEFAULT_CLUSTER_KWARGS[method], **user_kwargs}
+    # A distance threshold replaces the default cluster count; the tree is cut by one or the other
+    if user_kwargs.get('distance_threshold') is not None and 'n_clusters' not in user_kwargs:
+        cluster_kwargs.pop('n_clusters', None)
+    # Keep the fitted scaler/model for score_ev_data.py (not supported by the fcluster sample). It is
+    # part of the cached result and saved below, so a stage cache hit still writes the artifact.
+    save_model = artifact_dir and method != 'hierarchical_fcluster'
+    if save_model:
+        cluster_kwargs['return_model'] = True
+
+    # Stage results are cached by input, parameters and code, so a re-run that
+    # only changes plotting or reporting skips loading and clustering
+    stages = StageCache(os.path.join(os.path.dirname(os.path.abspath(csv_path)), '.cache', 'stages'),
+                        enabled=use_stage_cache)
+    with timed(timings, 'load_and_feature_engineering') as record:
+        prepared = stages.run('load_and_prepare_data', load_and_prepare_data, csv_path,
+                              inputs=[file_fingerprint(csv_path)])
+        engineered = stages.run('feature_engineering', feature_engineering, prepared)
+        df = engineered.value
+        record['rows'] = len(df)
+
+    if plots:
+        with timed(timings, 'correlation_network'):
+            plot_correlation_network(df, features, threshold=0.2, stages=stages)
+
+    if sweep and method == 'dbscan':
+        with timed(timings, 'dbscan_sweep'):
+            sweep_table = stages.run('sweep_dbscan', sweep_dbscan, engineered, features).value
+            print("=== DBSCAN Parameter Sweep ===")
+            print(sweep_table, "\n")
+
+    with timed(timings, 'clustering') as record:
+        # The fitted model is cached in the form save_cluster_model() takes, so its module is part of the key
+        clustered = stages.run('cluster_dispatch', cluster_stage, method, engineered, features,
+                               code=('ev_artifacts',), **cluster_kwargs)
+        df_clustered, linkage_matrix, fitted_model = clustered.value
+        record['rows'] = len(df_clustered)
+
+    if not plots:
+        pass
+    elif method == 'hierarchical_fcluster':
+        with timed(timings, 'dendrogram'):
+            plot_dendrogram(linkage_matrix, cutoff=cluster_kwargs['distance_threshold'])
+    elif method == 'hierarchical_two_stage':
+        with timed(timings, 'dendrogram'):
+            n_clusters = cluster_kwargs.get('n_clusters')
+            if n_clusters is None:
+                cutoff = cluster_kwargs['distance_threshold']
+            else:
+                # Halfway between the last merge kept and the first one cut
+                cutoff = round((linkage_matrix[-n_clusters, 2] + linkage_matrix[-n_clusters + 1, 2]) / 2, 1)
+            plot_dendrogram(linkage_matrix, cutoff=cutoff, truncate_p=30)
+
+    with timed(timings, 'cluster_labels'):
+        cluster_labels = stages.run('generate_cluster_labels', generate_cluster_labels, clustered.part(0)).value
+        df_clusters = label_and_merge_clusters(df, df_clustered, cluster_labels)
+
+    if save_model:
+        path = save_cluster_model(artifact_dir, cluster_labels=cluster_labels, **fitted_model)
+        print(f"Saved {method} model to {path}")
+
+    with timed(timings, 'cluster_report'):
+        if plots:
+            plot_clusters(df_clustered, cluster_labels)
+        analyze_clusters(df_clusters, plots=plots)
+
+    if output_dir:
+        with timed(timings, 'write_clusters'):
+            df_clusters.to_csv(os.path.join(output_dir, 'clusters.csv'), index=False)
+    return timings
+
+def run_streaming_pipeline(csv_path=EV_DATA_CSV, output_path=STREAMING_OUTPUT_CSV, features=None,
+                           n_clusters=5, chunk_size=100000, batch_size=10000, tol=1e-4, max_epochs=5):
+    """
+    Cluster the dataset with MiniBatch KMeans without holding it in memory.
+
+    Every stage works on chunks of chunk_size rows: a first pass computes the
+    MSRP mean/std for the z-score, the fit streams over the feature columns,
+    and a final pass engineers features, labels each chunk and appends it to
+    output_path. Peak memory depends on chunk_size, not on the input size.
+    """
+    features = features or CLUSTER_PROFILE_FEATURES
+    # Reuse a fresh Parquet cache, but never build one: that loads the whole CSV
+    use_cache = os.path.exists(cache_path_for(csv_path))
+
+    def iter_chunks(columns=CLUSTER_COLUMNS):
+        for chunk in iter_ev_data(csv_path, columns=columns, batch_size=chunk_size, use_cache=use_cache):
+            yield filter_priced(chunk)
+
+    msrp = CorrelationAccumulator(['Base MSRP'])
+    for chunk in iter_chunks(['Base MSRP']):
+        msrp.update(chunk)
+    moments = msrp.moments()
+    msrp_stats = (moments.loc['Base MSRP', 'mean'], moments.loc['Base MSRP', 'std'])
+
+    from ev_minibatch_kmeans import fit_minibatch_kmeans
+
+    scaler, model, stats = fit_minibatch_kmeans(
+        lambda: iter_chunks(features), features,
+        n_clusters=n_clusters, batch_size=batch_size, tol=tol, max_epochs=max_epochs,
+    )
+    print(f"MiniBatchKMeans: {stats['rows']} rows in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_second']:,.0f} rows/s, {stats['epochs']} epochs)")
+
+    # Centroids in original units stand in for the per-cluster means
+    centers = pd.DataFrame(scaler.inverse_transform(model.cluster_centers_), columns=features)
+    cluster_labels = describe_clusters(centers[CLUSTER_PROFILE_FEATURES])
+    predict = nearest_centroid(model.cluster_centers_)
+
+    sizes = np.zeros(n_clusters + 1, dtype=np.int64)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    written = False
+    for chunk in iter_chunks():
+        if chunk.empty:
+            continue
+        chunk = feature_engineering(chunk.copy(), msrp_stats)
+        ev_cluster_df = chunk[features].replace([np.inf, -np.inf], np.nan).dropna()
+        ev_cluster_df['Cluster'] = assign_in_chunks(ev_cluster_df, scaler, predict, chunk_size)
+        label_and_merge_clusters(chunk, ev_cluster_df, cluster_labels)
+        sizes += np.bincount(chunk['Cluster'] + 1, minlength=n_clusters + 1)
+        chunk.to_csv(tmp_path, mode='a' if written else 'w', header=not written, index=False)
+        written = True
+    os.replace(tmp_path, output_path)
+
+    print(f"Wrote {sizes.sum()} labeled rows to {output_path}")
+    print("=== Cluster Sizes ===")
+    print(pd.Series(sizes[1:], index=[cluster_labels[c] for c in range(n_clusters)], name='count'))
+    return cluster_labels
 
-    cluster_labels = generate_cluster_labels(df_clustered)
+def _n_clusters(value):
+    return value if value == 'auto' else int(value)
 
-    df_clusters = label_and_merge_clusters(df, df_clustered, cluster_labels)
-    plot_clusters(df_clustered, cluster_labels)
-    analyze_clusters(df_clusters)
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Cluster the Washington EV population dataset.",
+        epilog="The last line of output is a JSON report with per-stage timings in seconds.",
+    )
+    parser.add_argument('--method', choices=sorted(CLUSTER_METHODS),
+                        help="clustering method (default: kmeans; minibatch_kmeans with --streaming)")
+    parser.add_argument('--input', default=EV_DATA_CSV, help="EV population CSV (default: %(default)s)")
+    parser.add_argument('--output-dir',
+                        help="save figures, clusters.csv and timings.json here instead of showing figures")
+    parser.add_argument('--format', dest='formats', action='append', choices=FIGURE_FORMATS,
+                        help="figure file format, repeat for several (default: png)")
+    parser.add_argument('--plot-mode', choices=PLOT_MODES, default='sample',
+                        help="'sample' draws a stratified per-cluster sample, 'density' bins every row")
+    parser.add_argument('--max-plot-points', type=int, default=DEFAULT_MAX_POINTS,
+                        help="point budget per scatter plot in sample mode (default: %(default)s)")
+    parser.add_argument('--no-plots', action='store_true',
+                        help="print summaries only; skips importing the plotting libraries")
+    parser.add_argument('--import-report', action='store_true',
+                        help="print module import times (like python -X importtime) and add them to the JSON report")
+    parser.add_argument('--sweep', action='store_true',
+                        help="with --method dbscan, first print an eps x min_samples parameter sweep")
+    parser.add_argument('--no-stage-cache', action='store_true', help="recompute every pipeline stage")
+    parser.add_argument('--profile', metavar='DIR',
+                        help="write per-stage wall/CPU time, memory and row counts to DIR/profile.json "
+                             "and a Chrome trace to DIR/trace.json")
+    parser.add_argument('--profile-capture', action='append', choices=CAPTURES,
+                        help="with --profile, also capture cProfile top functions or tracemalloc peaks per stage")
+    parser.add_argument('--save-model', metavar='DIR',
+                        help="save the fitted scaler, model points and labels under DIR for score_ev_data.py")
+
+    hyper = parser.add_argument_group('hyperparameters', "only those the chosen method accepts may be given")
+    hyper.add_argument('--n-clusters', type=_n_clusters,
+                       help="number of clusters (default 5), or 'auto' to pick k by silhouette with kmeans")
+    hyper.add_argument('--eps', type=float)
+    hyper.add_argument('--min-samples', type=int)
+    hyper.add_argument('--max-samples', type=int, help="fit on a sample of at most this many rows")
+    hyper.add_argument('--distance-threshold', type=float)
+    hyper.add_argument('--batch-size', type=int)
+    hyper.add_argument('--tol', type=float)
+    hyper.add_argument('--n-micro', type=int, help="micro-clusters for hierarchical_two_stage")
+
+    streaming = parser.add_argument_group('streaming')
+    streaming.add_argument('--streaming', action='store_true',
+                           help="run MiniBatch KMeans chunk by chunk with bounded memory and write labeled rows")
+    streaming.add_argument('--chunk-size', type=int, default=100000, help="rows per chunk in streaming mode")
+    streaming.add_argument('--output', help="labeled CSV written in streaming mode "
+                                            "(default: ev_clusters.csv in --output-dir or the data directory)")
+    return parser
+
+def cli(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    method = args.method or ('minibatch_kmeans' if args.streaming else 'kmeans')
+    cluster_kwargs = {name: getattr(args, name) for name in HYPERPARAMETERS if getattr(args, name) is not None}
+
+    accepted = run_streaming_pipeline if args.streaming else CLUSTER_METHODS[method]
+    rejected = sorted(set(cluster_kwargs) - set(inspect.signature(accepted).parameters))
+    if args.streaming and method != 'minibatch_kmeans':
+        parser.error("--streaming only supports --method minibatch_kmeans")
+    if cluster_kwargs.get('n_clusters') == 'auto' and (args.streaming or method != 'kmeans'):
+        parser.error("--n-clusters auto is only supported by --method kmeans")
+    if rejected:
+        flags = ', '.join('--' + name.replace('_', '-') for name in rejected)
+        parser.error(f"{flags} not supported by {'--streaming' if args.streaming else method}")
+    if args.sweep and (args.streaming or method != 'dbscan'):
+        parser.error("--sweep is only supported by --method dbscan")
+    if args.profile_capture and not args.profile:
+        parser.error("--profile-capture needs --profile")
+
+    configure_plots(args.plot_mode, args.max_plot_points)
+    if args.output_dir:
+        save_figures_to(args.output_dir, args.formats or ['png'])
+
+    profiler = StageProfiler(args.profile_capture or ()) if args.profile else None
+    # Called from Python, only the imports the pipeline makes lazily are timed
+    import_timer = (IMPORT_TIMER or ImportTimer()) if args.import_report else None
+    started = time.perf_counter()
+    with profiler.activate() if profiler else nullcontext(), import_timer or nullcontext():
+        if args.streaming:
+            output_path = args.output or (
+                os.path.join(args.output_dir, 'ev_clusters.csv') if args.output_dir else STREAMING_OUTPUT_CSV
+            )
+            timings = {}
+            with timed(timings, 'streaming_pipeline'):
+                run_streaming_pipeline(args.input, output_path, chunk_size=args.chunk_size, **cluster_kwargs)
+        else:
+            timings = main(method, cluster_kwargs, csv_path=args.input, output_dir=args.output_dir,
+                           use_stage_cache=not args.no_stage_cache, artifact_dir=args.save_model,
+                           plots=not args.no_plots, sweep=args.sweep)
+    timings['total'] = round(time.perf_counter() - started, 4)
+
+    report = {'method': method, 'streaming': args.streaming, 'input': args.input, 'timings': timings}
+    if profiler:
+        report['profile'] = profiler.write(args.profile)
+    if import_timer:
+        import_timer.print_report()
+        report['imports'] = import_timer.report()
+    if args.output_dir:
+        with open(os.path.join(args.output_dir, 'timings.json'), 'w') as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report))
+    return report
 
 if __name__ == "__main__":
-    main()
+    cli()
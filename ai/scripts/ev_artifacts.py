@@ -0,0 +1,141 @@
+"""
+Versioned clustering model artifacts.
+
+A fitted model is saved as a directory of plain .npy arrays (scaler mean and
+scale, the points that define cluster membership and their cluster ids) plus a
+manifest.json with the method, features, parameters and cluster label map.
+Loading memory-maps the arrays, so scoring a new batch only needs one
+vectorized nearest-point pass instead of re-fitting.
+"""
+
+import json
+import os
+import time
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+
+from ev_cluster_assign import DEFAULT_CHUNK_SIZE, nearest_centroid, nearest_core_point, nearest_representative
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST = 'manifest.json'
+LATEST = 'LATEST'
+ARRAYS = ('scaler_mean', 'scaler_scale', 'points', 'point_labels')
+
+# How each kind of artifact turns its points into a predict(scaled_chunk) function
+PREDICTORS = {
+    'centroid': lambda points, point_labels, params: nearest_centroid(points),
+    'core_point': lambda points, point_labels, params: nearest_core_point(points, point_labels, params['eps']),
+    'representative': lambda points, point_labels, params: nearest_representative(point_labels, points),
+}
+
+
+def save_cluster_model(artifact_root, method, features, scaler_mean, scaler_scale, kind, points, point_labels,
+                       cluster_labels, params=None):
+    """
+    Write a new artifact version under artifact_root and point LATEST at it.
+
+    scaler_mean/scaler_scale are the fitted StandardScaler's mean_ and scale_;
+    kind is a key of PREDICTORS; cluster_labels maps cluster id -> label.
+    Returns the artifact directory.
+    """
+    if kind not in PREDICTORS:
+        raise ValueError(f"Unknown artifact kind: {kind}")
+    version = f"{method}-{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}"
+    path = os.path.join(artifact_root, version)
+    suffix = 1
+    while os.path.exists(path):
+        suffix += 1
+        path = os.path.join(artifact_root, f"{version}-{suffix}")
+    os.makedirs(path)
+
+    arrays = {
+        'scaler_mean': scaler_mean,
+        'scaler_scale': scaler_scale,
+        'points': points,
+        'point_labels': point_labels,
+    }
+    for name, values in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(values))
+
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'method': method,
+        'kind': kind,
+        'features': list(features),
+        'params': params or {},
+        'labels': {str(cluster): label for cluster, label in cluster_labels.items()},
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'sklearn_version': metadata.version('scikit-learn'),
+    }
+    with open(os.path.join(path, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    with open(os.path.join(artifact_root, f"{LATEST}.{os.getpid()}.tmp"), 'w') as f:
+        f.write(os.path.basename(path))
+    os.replace(os.path.join(artifact_root, f"{LATEST}.{os.getpid()}.tmp"), os.path.join(artifact_root, LATEST))
+    return path
+
+
+def resolve_artifact(path):
+    """Accept either an artifact directory or an artifact root containing LATEST."""
+    if os.path.exists(os.path.join(path, MANIFEST)):
+        return path
+    latest = os.path.join(path, LATEST)
+    if not os.path.exists(latest):
+        raise FileNotFoundError(f"No model artifact found at {path}")
+    with open(latest) as f:
+        return os.path.join(path, f.read().strip())
+
+
+def load_cluster_model(path):
+    """Load an artifact with memory-mapped arrays. Returns a dict used by score_frame()."""
+    path = resolve_artifact(path)
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest['format_version'] != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(
+            f"Artifact {path} has format version {manifest['format_version']}, "
+            f"expected {ARTIFACT_FORMAT_VERSION}"
+        )
+
+    arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in ARRAYS}
+    predict = PREDICTORS[manifest['kind']](arrays['points'], arrays['point_labels'], manifest['params'])
+    return {
+        'path': path,
+        'manifest': manifest,
+        'features': manifest['features'],
+        'labels': {int(cluster): label for cluster, label in manifest['labels'].items()},
+        'mean': arrays['scaler_mean'],
+        'scale': arrays['scaler_scale'],
+        'predict': predict,
+    }
+
+
+def score_frame(model, df, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Return int32 cluster ids for the rows of df (-1 for noise or rows with
+    missing/non-finite features), scaled and labeled with the saved model.
+    """
+    values = df[model['features']].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = np.isfinite(values).all(axis=1)
+    rows = values[valid]
+    scored = np.empty(len(rows), dtype=np.int32)
+    for start in range(0, len(rows), chunk_size):
+        chunk = (rows[start:start + chunk_size] - model['mean']) / model['scale']
+        scored[start:start + chunk_size] = model['predict'](chunk)
+
+    clusters = np.full(len(df), -1, dtype=np.int32)
+    clusters[valid] = scored
+    return clusters
+
+
+def cluster_label_column(model, clusters):
+    """Categorical label column for cluster ids (NaN for ids without a label)."""
+    categories = pd.unique(pd.Series(list(model['labels'].values()), dtype=object))
+    codes = {label: code for code, label in enumerate(categories)}
+    lookup = {cluster: codes[label] for cluster, label in model['labels'].items()}
+    return pd.Categorical.from_codes(
+        pd.Series(clusters).map(lookup).fillna(-1).astype(np.int32).to_numpy(), categories=categories
+    )
@@ -0,0 +1,91 @@
+"""
+Fit-on-sample, predict-on-all cluster assignment.
+
+The clustering runners fit on a bounded sample; these helpers then label every
+row in fixed-size chunks so memory stays bounded and cost grows linearly.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def assign_in_chunks(features_df, scaler, predict, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Scale features_df chunk by chunk and label it with predict(scaled_chunk)."""
+    labels = np.empty(len(features_df), dtype=np.int32)
+    for start in range(0, len(features_df), chunk_size):
+        chunk = scaler.transform(features_df.iloc[start:start + chunk_size])
+        labels[start:start + chunk_size] = predict(chunk)
+    return labels
+
+
+def nearest_centroid(centroids):
+    centroids = np.asarray(centroids, dtype=np.float64)
+    centroid_sq = (centroids ** 2).sum(axis=1)
+
+    def predict(chunk):
+        # argmin ||x - c||^2 == argmin (||c||^2 - 2 x.c)
+        return np.argmin(centroid_sq - 2.0 * chunk @ centroids.T, axis=1)
+
+    return predict
+
+
+def nearest_core_point(core_points, core_labels, eps):
+    """Label points within eps of a core point with its cluster, others as noise (-1)."""
+    from scipy.spatial import cKDTree
+
+    core_labels = np.append(np.asarray(core_labels, dtype=np.int32), -1)
+    if len(core_points) == 0:
+        return lambda chunk: np.full(len(chunk), -1, dtype=np.int32)
+    tree = cKDTree(core_points)
+
+    def predict(chunk):
+        # Misses come back with index == len(core_points), i.e. the trailing -1
+        # distance_upper_bound is strict; neighbors at exactly eps are reachable
+        _, nearest = tree.query(chunk, k=1, distance_upper_bound=np.nextafter(eps, np.inf))
+        return core_labels[nearest]
+
+    return predict
+
+
+def cluster_representatives(scaled_features, labels):
+    """Return (cluster ids, per-cluster mean points) for labels >= 0."""
+    cluster_ids = np.unique(labels[labels >= 0])
+    centroids = np.vstack([scaled_features[labels == cluster].mean(axis=0) for cluster in cluster_ids])
+    return cluster_ids, centroids
+
+
+def nearest_representative(cluster_ids, centroids):
+    closest = nearest_centroid(centroids)
+    return lambda chunk: cluster_ids[closest(chunk)]
+
+
+def label_and_merge_clusters(df, ev_cluster_df, cluster_labels):
+    """
+    Add 'Cluster' (int32, -1 for unclustered rows) and a categorical
+    'Cluster Label' to df. df is modified in place, not copied, and returned
+    for convenience; pass df.copy() to keep the original unchanged. Every
+    index label of ev_cluster_df must occur exactly once in df's index.
+    """
+    if not df.index.is_unique:
+        raise ValueError('label_and_merge_clusters needs a unique index on df')
+    positions = df.index.get_indexer(ev_cluster_df.index)
+    if not (positions >= 0).all():
+        missing = ev_cluster_df.index[positions < 0]
+        raise ValueError(f'{len(missing)} clustered rows are not in df, e.g. index {missing[0]!r}')
+    cluster_ids = np.full(len(df), -1, dtype=np.int32)
+    cluster_ids[positions] = ev_cluster_df['Cluster'].to_numpy()
+
+    categories = pd.unique(pd.Series(list(cluster_labels.values()), dtype=object))
+    # initial= keeps the reductions defined for an empty df
+    lowest = min(cluster_ids.min(initial=0), min(cluster_labels, default=0))
+    highest = max(cluster_ids.max(initial=0), max(cluster_labels, default=0))
+    code_lookup = np.full(highest - lowest + 1, -1, dtype=np.int32)
+    category_codes = {label: code for code, label in enumerate(categories)}
+    for cluster, label in cluster_labels.items():
+        code_lookup[cluster - lowest] = category_codes[label]
+
+    df['Cluster'] = cluster_ids
+    df['Cluster Label'] = pd.Categorical.from_codes(code_lookup[cluster_ids - lowest], categories=categories)
+    return df
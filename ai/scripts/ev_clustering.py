@@ -0,0 +1,423 @@
+"""
+The EV clustering pipeline used by cluster_ev_data_refactored.py.
+
+Loading and feature engineering, one runner per clustering method (dispatched
+through CLUSTER_METHODS), cluster labels, and the printed reports and figures.
+The script caches these stages; their cache keys cover this module and every
+local module it imports, so no list of dependencies is kept here.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ev_cluster_assign import (
+    assign_in_chunks,
+    cluster_representatives,
+    nearest_centroid,
+    nearest_core_point,
+    nearest_representative,
+)
+from ev_data import CLUSTER_COLUMNS, EV_DATA_CSV, extract_lat_lon, filter_priced, iter_frame_batches, load_ev_data
+from ev_network import correlation_graph, network_layout
+from ev_plotting import cluster_pairplot, cluster_scatter, finish_figure
+from ev_profiling import stage
+from ev_stats import summarize
+
+
+def plot_correlation_network(df, features, threshold=0.5, stages=None):
+    """stages (a StageCache) persists the layout across runs."""
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
+    G = correlation_graph(df[features].corr(), threshold, include_isolated=False, absolute_weight=True)
+    pos = network_layout(G, stages=stages)
+    plt.figure(figsize=(8, 6))
+    nx.draw(G, pos, with_labels=True, node_size=1500, node_color='lightblue', font_size=10, width=2)
+    edge_labels = {(u, v): f"{value:.2f}" for u, v, value in G.edges(data='corr')}
+    nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels)
+    plt.title(f"Correlation Network (threshold ≥ {threshold})")
+    plt.tight_layout()
+    finish_figure('correlation_network')
+
+
+def load_and_prepare_data(csv_path=EV_DATA_CSV):
+    df = load_ev_data(csv_path, columns=CLUSTER_COLUMNS)
+    df = filter_priced(df)
+    return df
+
+
+def feature_engineering(df, msrp_stats=None):
+    """msrp_stats is a (mean, std) pair for chunked input; by default it comes from df."""
+    bins = [0, 50, 150, float('inf')]
+    labels = ['Short Range', 'Medium Range', 'Long Range']
+    df['Range Category'] = pd.cut(df['Electric Range'], bins=bins, labels=labels)
+
+    msrp_mean, msrp_std = msrp_stats or (df['Base MSRP'].mean(), df['Base MSRP'].std())
+    df['MSRP Z-Score'] = (df['Base MSRP'] - msrp_mean) / msrp_std
+
+    with stage('extract_lat_lon', rows=len(df)):
+        lat, lon, malformed = extract_lat_lon(df['Vehicle Location'])
+    df['Latitude'] = lat
+    df['Longitude'] = lon
+    if malformed:
+        print(f"Skipped {malformed} malformed 'Vehicle Location' values.")
+    return df
+
+
+def _prepare_cluster_frames(df, features, max_samples):
+    ev_cluster_df = df[features].replace([np.inf, -np.inf], np.nan).dropna()
+    sample_df = ev_cluster_df
+    if len(ev_cluster_df) > max_samples:
+        sample_df = ev_cluster_df.sample(n=max_samples, random_state=42)
+    return ev_cluster_df, sample_df
+
+
+def _assign_all_rows(ev_cluster_df, sample_df, sample_labels, scaler, predict):
+    with stage('assign_all', rows=len(ev_cluster_df)):
+        labels = assign_in_chunks(ev_cluster_df, scaler, predict)
+    # Sampled rows keep the labels the model was fit with
+    labels[ev_cluster_df.index.get_indexer(sample_df.index)] = sample_labels
+    ev_cluster_df['Cluster'] = labels
+    return ev_cluster_df
+
+
+def _fitted_model(method, features, scaler, kind, points, point_labels, **params):
+    """
+    The fitted scaler and membership points, as keyword arguments for
+    save_cluster_model(). Only plain arrays are kept, so loading a cached
+    model does not import sklearn.
+    """
+    return {
+        'method': method, 'features': list(features), 'kind': kind,
+        'scaler_mean': np.asarray(scaler.mean_), 'scaler_scale': np.asarray(scaler.scale_),
+        'points': np.asarray(points), 'point_labels': np.asarray(point_labels), 'params': params,
+    }
+
+
+def run_dbscan(df, features, eps=1.5, min_samples=5, max_samples=None, assign_all=False, backend='kdtree',
+               return_model=False):
+    """
+    backend='kdtree' runs the memory-bounded ev_dbscan implementation, which
+    handles the full dataset (max_samples=None). backend='sklearn' needs a
+    max_samples cap to keep sklearn's neighbor lists in memory. With
+    return_model, the scaler and core points are returned as well, for
+    save_cluster_model().
+    """
+    from sklearn.preprocessing import StandardScaler
+
+    ev_cluster_df, sample_df = _prepare_cluster_frames(df, features, max_samples or len(df))
+
+    scaler = StandardScaler()
+    with stage('scale', rows=len(sample_df)):
+        scaled_features = scaler.fit_transform(sample_df)
+
+    if backend == 'kdtree':
+        from ev_dbscan import kdtree_dbscan
+
+        with stage('fit_predict', rows=len(scaled_features)):
+            labels, core_mask = kdtree_dbscan(scaled_features, eps=eps, min_samples=min_samples)
+        core = np.flatnonzero(core_mask)
+    elif backend == 'sklearn':
+        from sklearn.cluster import DBSCAN
+
+        dbscan = DBSCAN(eps=eps, min_samples=min_samples)
+        with stage('fit_predict', rows=len(scaled_features)):
+            labels = dbscan.fit_predict(scaled_features)
+        core = dbscan.core_sample_indices_
+    else:
+        raise ValueError(f"Unknown DBSCAN backend: {backend}")
+
+    if not assign_all or len(sample_df) == len(ev_cluster_df):
+        sample_df['Cluster'] = labels
+        clustered_df = sample_df
+    else:
+        predict = nearest_core_point(scaled_features[core], labels[core], eps)
+        clustered_df = _assign_all_rows(ev_cluster_df, sample_df, labels, scaler, predict)
+
+    if return_model:
+        return df, clustered_df, _fitted_model('dbscan', features, scaler, 'core_point', scaled_features[core],
+                                               labels[core], eps=eps, min_samples=min_samples)
+    return df, clustered_df
+
+
+def sweep_dbscan(df, features, eps_values=(0.5, 1.0, 1.5), min_samples_values=(5, 10, 20), max_samples=None):
+    from sklearn.preprocessing import StandardScaler
+    from ev_dbscan import dbscan_sweep
+
+    _, sample_df = _prepare_cluster_frames(df, features, max_samples or len(df))
+    scaled_features = StandardScaler().fit_transform(sample_df)
+    return dbscan_sweep(scaled_features, eps_values, min_samples_values)
+
+
+def run_kmeans(df, features, n_clusters=5, max_samples=50000, assign_all=False,
+               k_values=range(1, 10), k_criterion='silhouette', return_model=False):
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import StandardScaler
+
+    ev_cluster_df, sample_df = _prepare_cluster_frames(df, features, max_samples)
+
+    scaler = StandardScaler()
+    with stage('scale', rows=len(sample_df)):
+        scaled_features = scaler.fit_transform(sample_df)
+
+    if n_clusters == 'auto':
+        from ev_kselect import select_k
+
+        with stage('select_k', rows=len(scaled_features)):
+            n_clusters, k_scores = select_k(scaled_features, k_values, criterion=k_criterion)
+        print("=== K Selection ===")
+        print(k_scores.to_string(index=False))
+        print(f"Selected k={n_clusters} by {k_criterion}\n")
+
+    kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+    with stage('fit_predict', rows=len(scaled_features)):
+        labels = kmeans.fit_predict(scaled_features)
+    if not assign_all:
+        sample_df['Cluster'] = labels
+        clustered_df = sample_df
+    else:
+        predict = nearest_centroid(kmeans.cluster_centers_)
+        clustered_df = _assign_all_rows(ev_cluster_df, sample_df, labels, scaler, predict)
+
+    if return_model:
+        return df, clustered_df, _fitted_model('kmeans', features, scaler, 'centroid', kmeans.cluster_centers_,
+                                               np.arange(n_clusters), n_clusters=n_clusters)
+    return df, clustered_df
+
+
+def run_hierarchical(df, features, n_clusters=5, max_samples=50000, assign_all=False, return_model=False):
+    from sklearn.cluster import AgglomerativeClustering
+    from sklearn.preprocessing import StandardScaler
+
+    ev_cluster_df, sample_df = _prepare_cluster_frames(df, features, max_samples)
+
+    scaler = StandardScaler()
+    with stage('scale', rows=len(sample_df)):
+        scaled_features = scaler.fit_transform(sample_df)
+
+    hc = AgglomerativeClustering(n_clusters=n_clusters)
+    with stage('fit_predict', rows=len(scaled_features)):
+        labels = hc.fit_predict(scaled_features)
+    cluster_ids, centroids = cluster_representatives(scaled_features, labels)
+    if not assign_all:
+        sample_df['Cluster'] = labels
+        clustered_df = sample_df
+    else:
+        predict = nearest_representative(cluster_ids, centroids)
+        clustered_df = _assign_all_rows(ev_cluster_df, sample_df, labels, scaler, predict)
+
+    if return_model:
+        return df, clustered_df, _fitted_model('hierarchical', features, scaler, 'representative', centroids,
+                                               cluster_ids, n_clusters=n_clusters)
+    return df, clustered_df
+
+
+def run_minibatch_kmeans(df, features, n_clusters=5, batch_size=10000, tol=1e-4, max_epochs=5,
+                         chunk_size=100000, make_batches=None, return_model=False):
+    from ev_minibatch_kmeans import fit_minibatch_kmeans
+
+    ev_cluster_df = df[features].replace([np.inf, -np.inf], np.nan).dropna()
+    if make_batches is None:
+        make_batches = lambda: iter_frame_batches(ev_cluster_df, chunk_size)
+
+    with stage('fit', rows=len(ev_cluster_df)):
+        scaler, model, stats = fit_minibatch_kmeans(
+            make_batches, features, n_clusters=n_clusters, batch_size=batch_size, tol=tol, max_epochs=max_epochs
+        )
+    print(f"MiniBatchKMeans: {stats['rows']} rows in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_second']:,.0f} rows/s, {stats['epochs']} epochs)")
+
+    predict = nearest_centroid(model.cluster_centers_)
+    with stage('assign_all', rows=len(ev_cluster_df)):
+        ev_cluster_df['Cluster'] = assign_in_chunks(ev_cluster_df, scaler, predict, chunk_size)
+    if return_model:
+        return df, ev_cluster_df, _fitted_model('minibatch_kmeans', features, scaler, 'centroid',
+                                                model.cluster_centers_, np.arange(n_clusters), n_clusters=n_clusters)
+    return df, ev_cluster_df
+
+
+def compute_hierarchical_clusters(df, features, distance_threshold=25, max_samples=500):
+    from scipy.cluster.hierarchy import fcluster, linkage
+    from sklearn.preprocessing import StandardScaler
+
+    df_sample = df[features].replace([np.inf, -np.inf], np.nan).dropna()
+    if len(df_sample) > max_samples:
+        df_sample = df_sample.sample(n=max_samples, random_state=42)
+
+    scaler = StandardScaler()
+    with stage('scale', rows=len(df_sample)):
+        scaled = scaler.fit_transform(df_sample)
+
+    with stage('fit_predict', rows=len(scaled)):
+        linked = linkage(scaled, method='ward')
+        cluster_assignments = fcluster(linked, t=distance_threshold, criterion='distance')
+    df_sample = df_sample.copy()
+    df_sample['Cluster'] = cluster_assignments
+
+    return df_sample, linked
+
+
+def compute_two_stage_hierarchical_clusters(df, features, n_clusters=None, distance_threshold=None,
+                                            n_micro=None, return_model=False):
+    from sklearn.preprocessing import StandardScaler
+    from ev_hierarchical import DEFAULT_MICRO_CLUSTERS, two_stage_hierarchical
+
+    ev_cluster_df = df[features].replace([np.inf, -np.inf], np.nan).dropna()
+
+    scaler = StandardScaler()
+    with stage('scale', rows=len(ev_cluster_df)):
+        scaled = scaler.fit_transform(ev_cluster_df)
+
+    if n_clusters is None and distance_threshold is None:
+        n_clusters = 5
+    with stage('fit_predict', rows=len(scaled)):
+        ev_cluster_df['Cluster'], linked = two_stage_hierarchical(
+            scaled, n_clusters=n_clusters, distance_threshold=distance_threshold,
+            n_micro=n_micro or DEFAULT_MICRO_CLUSTERS
+        )
+    if return_model:
+        cluster_ids, centroids = cluster_representatives(scaled, ev_cluster_df['Cluster'].to_numpy())
+        return ev_cluster_df, linked, _fitted_model('hierarchical_two_stage', features, scaler, 'representative',
+                                                    centroids, cluster_ids, n_clusters=n_clusters,
+                                                    distance_threshold=distance_threshold)
+    return ev_cluster_df, linked
+
+
+def plot_dendrogram(linked, cutoff=None, truncate_p=None):
+    import matplotlib.pyplot as plt
+    from scipy.cluster.hierarchy import dendrogram
+
+    plt.figure(figsize=(12, 6))
+    truncate_kwargs = {'truncate_mode': 'lastp', 'p': truncate_p} if truncate_p else {}
+    dendrogram(linked,
+               orientation='top',
+               distance_sort='descending',
+               show_leaf_counts=True,
+               **truncate_kwargs)
+
+    if cutoff:
+        plt.axhline(y=cutoff, c='red', linestyle='--', label=f'Distance Cutoff = {cutoff}')
+        plt.legend()
+
+    plt.title("Hierarchical Clustering Dendrogram")
+    plt.xlabel("Sample Index")
+    plt.ylabel("Distance")
+    plt.tight_layout()
+    finish_figure('dendrogram')
+
+
+def plot_clusters(ev_cluster_df, cluster_labels):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(8, 5))
+    cluster_scatter(
+        ev_cluster_df,
+        x='Electric Range',
+        y='Base MSRP',
+        hue=ev_cluster_df['Cluster'].map(cluster_labels).rename('Cluster Label'),
+        palette='tab10'
+    )
+    plt.title('Clustering of EVs')
+    plt.xlabel('Electric Range')
+    plt.ylabel('Base MSRP')
+    plt.tight_layout()
+    finish_figure('clusters')
+
+
+CLUSTER_PROFILE_FEATURES = ['Electric Range', 'Base MSRP', 'Model Year']
+
+
+def analyze_clusters(df_clusters, plots=True):
+    summary = summarize(df_clusters, {
+        'profile': ('mean', 'Cluster', CLUSTER_PROFILE_FEATURES),
+        'sizes': ('size', 'Cluster'),
+        'vehicle_types': ('size', ['Cluster', 'Electric Vehicle Type']),
+        'models': ('size', ['Cluster', 'Make', 'Model', 'Electric Vehicle Type']),
+    })
+
+    print("=== Cluster Summary ===")
+    print(summary['profile'], "\n")
+
+    print("=== Cluster Sizes ===")
+    print(summary['sizes'].sort_values(ascending=False), "\n")
+
+    if plots:
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        cluster_pairplot(df_clusters, CLUSTER_PROFILE_FEATURES, hue='Cluster Label', palette='Set2')
+        plt.suptitle('Pairwise Feature Distribution by Cluster', y=1.02)
+        finish_figure('cluster_pairplot')
+
+    print("=== Vehicle Type Breakdown by Cluster ===")
+    print(summary['vehicle_types'])
+
+    if plots:
+        sns.countplot(data=df_clusters, x='Cluster', hue='Electric Vehicle Type')
+        plt.title("Vehicle Type by Cluster")
+        plt.tight_layout()
+        finish_figure('vehicle_type_by_cluster')
+
+    if 0 in summary['models'].index.get_level_values('Cluster'):
+        print(summary['models'].loc[0].sort_values(ascending=False).head(10))
+
+    if plots:
+        clustered = df_clusters['Cluster'] != -1
+        cluster_scatter(df_clusters.loc[clustered, ['Model Year', 'Base MSRP', 'Cluster Label']],
+                        x='Model Year', y='Base MSRP', hue='Cluster Label', palette='tab10')
+        plt.title("Model Year vs MSRP by Cluster")
+        plt.tight_layout()
+        finish_figure('model_year_vs_msrp')
+
+
+CLUSTER_METHODS = {
+    'dbscan': run_dbscan,
+    'kmeans': run_kmeans,
+    'minibatch_kmeans': run_minibatch_kmeans,
+    'hierarchical': run_hierarchical,
+    'hierarchical_fcluster': compute_hierarchical_clusters,
+    'hierarchical_two_stage': compute_two_stage_hierarchical_clusters,
+}
+
+
+# KMeans/hierarchical fit on a sample and then label every row; DBSCAN runs on every row
+DEFAULT_CLUSTER_KWARGS = {
+    'kmeans': {'n_clusters': 5, 'assign_all': True},
+    'hierarchical': {'n_clusters': 5, 'assign_all': True},
+    'minibatch_kmeans': {'n_clusters': 5, 'batch_size': 10000, 'tol': 1e-4},
+    'dbscan': {'eps': 1.5, 'min_samples': 5},
+    'hierarchical_fcluster': {'distance_threshold': 25},
+    'hierarchical_two_stage': {'n_clusters': 5},
+}
+
+
+def cluster_dispatch(method, df, features, **kwargs):
+    if method not in CLUSTER_METHODS:
+        raise ValueError(f"Unknown clustering method: {method}")
+    return CLUSTER_METHODS[method](df, features, **kwargs)
+
+
+def cluster_stage(method, df, features, **kwargs):
+    """
+    cluster_dispatch() reduced to (df_clustered, linkage matrix or None, fitted
+    model or None), the part worth caching.
+    """
+    result = cluster_dispatch(method, df, features, **kwargs)
+    model = result[2] if kwargs.get('return_model') else None
+    if method in ('hierarchical_fcluster', 'hierarchical_two_stage'):
+        return result[0], result[1], model
+    return result[1], None, model
+
+
+def generate_cluster_labels(df_clusters):
+    grouped = summarize(df_clusters, {'profile': ('mean', 'Cluster', CLUSTER_PROFILE_FEATURES)})['profile']
+    return describe_clusters(grouped)
+
+
+def describe_clusters(grouped):
+    labels = {}
+    for cluster, row in grouped.iterrows():
+        label = f"Range≈{int(row['Electric Range'])} MSRP≈{int(row['Base MSRP']/1000)}k Year≈{int(row['Model Year'])}"
+        labels[cluster] = label
+    return labels
+
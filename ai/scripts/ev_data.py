@@ -0,0 +1,231 @@
+"""
+Shared loader for the EV registration dataset.
+
+The first read of a CSV is compacted to the EV schema (categorical strings,
+downcast numerics) and written to a Parquet cache in a `.cache` directory next
+to it, keyed by the source file's mtime and size. Later runs read the typed
+cache instead of re-parsing the CSV, and can project only the columns they need.
+"""
+
+import glob
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+
+from ev_profiling import stage
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '../data')
+EV_DATA_CSV = os.environ.get('EV_DATA_CSV', os.path.join(DATA_DIR, 'ev_data.csv'))
+
+# Columns used by the clustering scripts and feature_engineering()
+CLUSTER_COLUMNS = [
+    'Make',
+    'Model',
+    'Model Year',
+    'Electric Vehicle Type',
+    'Electric Range',
+    'Base MSRP',
+    'Vehicle Location',
+]
+
+# Rows at or below this Base MSRP have no list price (mostly 0) and are not clustered
+MIN_PRICED_MSRP = 1000
+
+# Low-cardinality string columns stored as `category`
+CATEGORICAL_COLUMNS = [
+    'County',
+    'City',
+    'State',
+    'Make',
+    'Model',
+    'Electric Vehicle Type',
+    'Clean Alternative Fuel Vehicle (CAFV) Eligibility',
+    'Electric Utility',
+    'Vehicle Location',
+]
+# Candidates whose unique/row ratio exceeds this stay plain strings
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+# Bump when compact_dtypes() changes so stale caches are rebuilt
+CACHE_SCHEMA_VERSION = 2
+
+_NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+WKT_POINT_PATTERN = rf'^\s*POINT\s*\(\s*(?P<lon>{_NUMBER})\s+(?P<lat>{_NUMBER})\s*\)\s*$'
+
+
+def parquet_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def cache_path_for(csv_path, cache_dir=None):
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(csv_path)), '.cache')
+    stat = os.stat(csv_path)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(
+        cache_dir, f"{stem}-v{CACHE_SCHEMA_VERSION}-{stat.st_mtime_ns}-{stat.st_size}.parquet"
+    )
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024**2
+
+
+def _downcast_numeric(series):
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+
+    values = series.to_numpy()
+    finite = values[~np.isnan(values)]
+    if len(finite) == len(values) and np.array_equal(finite, np.round(finite)):
+        return pd.to_numeric(series, downcast='integer')
+
+    narrowed = values.astype('float32')
+    if np.array_equal(narrowed.astype('float64'), values, equal_nan=True):
+        return pd.Series(narrowed, index=series.index, name=series.name)
+    return series
+
+
+def compact_dtypes(df, categorical=CATEGORICAL_COLUMNS, report=False):
+    """
+    Convert low-cardinality strings to `category` and downcast numeric columns
+    to the narrowest type that holds every value exactly.
+    """
+    before = memory_mb(df) if report else None
+
+    for column in df.columns:
+        series = df[column]
+        if column in categorical:
+            if series.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * max(len(series), 1):
+                df[column] = series.astype('category')
+        elif pd.api.types.is_float_dtype(series) or pd.api.types.is_integer_dtype(series):
+            df[column] = _downcast_numeric(series)
+
+    if report:
+        print(f"Memory usage: {before:.1f} MB -> {memory_mb(df):.1f} MB")
+    return df
+
+
+def _usecols(columns):
+    if columns is None:
+        return None
+    wanted = set(columns)
+    return lambda name: name.strip() in wanted
+
+
+def _read_csv(csv_path, columns=None):
+    with stage('read_csv') as record:
+        df = pd.read_csv(csv_path, usecols=_usecols(columns), low_memory=False)
+        record['rows'] = len(df)
+    df.columns = df.columns.str.strip()
+    with stage('compact_dtypes', rows=len(df)):
+        return compact_dtypes(df, report=True)
+
+
+def _write_cache(df, cache_path):
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    stem = os.path.basename(cache_path).rsplit('-', 3)[0]
+    for stale in glob.glob(os.path.join(cache_dir, f"{stem}-*.parquet")):
+        if stale != cache_path and os.path.basename(stale).rsplit('-', 3)[0] == stem:
+            os.remove(stale)
+
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with stage('write_parquet_cache', rows=len(df)):
+        df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, cache_path)
+
+
+def load_ev_data(csv_path=EV_DATA_CSV, columns=None, use_cache=True):
+    """
+    Load the EV dataset with compact dtypes, serving it from the Parquet cache
+    when it is fresh.
+
+    `columns` projects the result to a subset of (stripped) column names.
+    Without pyarrow, or with use_cache=False, the CSV is read directly.
+    """
+    if not use_cache or not parquet_available():
+        return _read_csv(csv_path, columns)
+
+    cache_path = _ensure_cache(csv_path)
+    with stage('read_parquet') as record:
+        df = pd.read_parquet(cache_path, columns=columns)
+        record['rows'] = len(df)
+    return df
+
+
+def _ensure_cache(csv_path):
+    cache_path = cache_path_for(csv_path)
+    if not os.path.exists(cache_path):
+        _write_cache(_read_csv(csv_path), cache_path)
+    return cache_path
+
+
+def iter_frame_batches(df, batch_size):
+    for start in range(0, len(df), batch_size):
+        yield df.iloc[start:start + batch_size]
+
+
+def iter_ev_data(csv_path=EV_DATA_CSV, columns=None, batch_size=100_000, use_cache=True):
+    """
+    Yield the EV dataset as DataFrames of at most batch_size rows, so callers
+    can stream it with bounded memory. Batches are not dtype-compacted.
+    """
+    if use_cache and parquet_available():
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(_ensure_cache(csv_path))
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+        return
+
+    for chunk in pd.read_csv(csv_path, usecols=_usecols(columns), chunksize=batch_size):
+        chunk.columns = chunk.columns.str.strip()
+        yield chunk
+
+
+def is_priced(df):
+    return df['Base MSRP'] > MIN_PRICED_MSRP
+
+
+def filter_priced(df):
+    return df[is_priced(df)]
+
+
+def _extract_point_parts(locations):
+    if parquet_available():
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        parts = pc.extract_regex(pa.array(locations, type=pa.string(), from_pandas=True), WKT_POINT_PATTERN)
+        lon = pc.cast(pc.struct_field(parts, 'lon'), pa.float64())
+        lat = pc.cast(pc.struct_field(parts, 'lat'), pa.float64())
+        return (
+            lat.to_numpy(zero_copy_only=False),
+            lon.to_numpy(zero_copy_only=False),
+        )
+
+    parts = locations.astype(object).str.extract(WKT_POINT_PATTERN)
+    lat = pd.to_numeric(parts['lat']).to_numpy(dtype='float64')
+    lon = pd.to_numeric(parts['lon']).to_numpy(dtype='float64')
+    return lat, lon
+
+
+def extract_lat_lon(locations):
+    """
+    Parse a `POINT (lon lat)` WKT column into float64 latitude/longitude arrays.
+
+    Missing and malformed entries become NaN. Returns (lat, lon, malformed),
+    where malformed counts non-null entries that did not parse.
+    """
+    if isinstance(locations.dtype, pd.CategoricalDtype):
+        # Parse each distinct location once and broadcast through the codes
+        codes = locations.cat.codes.to_numpy()
+        cat_lat, cat_lon = _extract_point_parts(pd.Series(locations.cat.categories))
+        lat = np.append(cat_lat, np.nan)[codes]
+        lon = np.append(cat_lon, np.nan)[codes]
+    else:
+        lat, lon = _extract_point_parts(locations)
+    malformed = int((locations.notna().to_numpy() & np.isnan(lat)).sum())
+    return lat, lon, malformed
@@ -0,0 +1,210 @@
+"""
+Memory-bounded DBSCAN for low-dimensional feature matrices.
+
+Identical rows are collapsed into weighted points first (the EV features take
+few distinct values). Core points come from a chunked k-nearest-neighbor query
+on a KD-tree, core points within eps are joined with an array-based disjoint
+set, and border points attach to their nearest core point. Memory stays O(n)
+instead of holding sklearn's full eps-neighborhood lists.
+
+Core-core links are enumerated with chunked radius queries when the eps-graph
+is small. When it is dense (large eps), only Delaunay edges no longer than eps
+are used: the Euclidean minimum spanning tree is a subgraph of the Delaunay
+triangulation, so these edges give the same connected components.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import Delaunay, QhullError, cKDTree
+from sklearn.metrics import silhouette_score
+
+DEFAULT_CHUNK_SIZE = 4096
+# Above this many core-core pairs, link clusters through Delaunay edges instead
+MAX_ENUMERATED_PAIRS = 20_000_000
+
+
+def _find(parent, nodes):
+    roots = parent[nodes]
+    while True:
+        next_roots = parent[roots]
+        if np.array_equal(next_roots, roots):
+            return roots
+        roots = next_roots
+
+
+def _union(parent, a, b):
+    # Always hang the larger root under the smaller one, so parent links never
+    # form cycles; colliding writes are lost and retried on the next pass.
+    while len(a):
+        root_a, root_b = _find(parent, a), _find(parent, b)
+        pending = root_a != root_b
+        if not pending.any():
+            return
+        root_a, root_b = root_a[pending], root_b[pending]
+        parent[np.maximum(root_a, root_b)] = np.minimum(root_a, root_b)
+        a, b = a[pending], b[pending]
+
+
+def collapse_duplicates(X):
+    """Return (unique points, inverse index, multiplicity) for the rows of X."""
+    points, inverse, weights = np.unique(X, axis=0, return_inverse=True, return_counts=True)
+    return points, inverse.ravel(), weights
+
+
+def iter_neighbor_pairs(tree, points, eps, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (i, j, distance) arrays for every pair within eps, one chunk of i at a time."""
+    for start in range(0, len(points), chunk_size):
+        chunk_tree = cKDTree(points[start:start + chunk_size])
+        pairs = chunk_tree.sparse_distance_matrix(tree, eps, output_type='ndarray')
+        yield pairs['i'] + start, pairs['j'], pairs['v']
+
+
+def core_mask(tree, points, weights, eps, min_samples, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Weighted core test from the min_samples nearest unique points: if the
+    farthest of them is within eps the point is core, otherwise they are all
+    of its eps-neighbors and their weights are the exact neighborhood size.
+    """
+    k = min(min_samples, len(points))
+    core = np.empty(len(points), dtype=bool)
+    for start in range(0, len(points), chunk_size):
+        distances, neighbors = tree.query(points[start:start + chunk_size], k=k)
+        distances, neighbors = distances.reshape(-1, k), neighbors.reshape(-1, k)
+        counts = np.where(distances <= eps, weights[neighbors], 0).sum(axis=1)
+        core[start:start + chunk_size] = counts >= min_samples
+    return core
+
+
+def _delaunay_links(points, eps):
+    simplices = Delaunay(points, qhull_options='QJ').simplices
+    corners = simplices.shape[1]
+    a = np.concatenate([simplices[:, i] for i in range(corners) for _ in range(i + 1, corners)])
+    b = np.concatenate([simplices[:, j] for i in range(corners) for j in range(i + 1, corners)])
+    short = np.linalg.norm(points[a] - points[b], axis=1) <= eps
+    yield a[short], b[short]
+
+
+def _core_links(core_points, eps, chunk_size):
+    tree = cKDTree(core_points)
+    dense = tree.count_neighbors(tree, eps) > MAX_ENUMERATED_PAIRS
+    if dense and core_points.shape[1] > 1 and len(core_points) > core_points.shape[1] + 1:
+        try:
+            return list(_delaunay_links(core_points, eps))
+        except QhullError:
+            pass  # degenerate (e.g. flat) inputs fall back to enumeration
+    return ((i, j) for i, j, _ in iter_neighbor_pairs(tree, core_points, eps, chunk_size))
+
+
+def kdtree_dbscan(X, eps=1.5, min_samples=5, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    DBSCAN with the same core/noise semantics as sklearn (a point counts itself
+    and neighbors at distance <= eps). Border points reachable from several
+    clusters join their nearest core point's cluster.
+
+    Returns (labels, core_mask) over the rows of X.
+    """
+    points, inverse, weights = collapse_duplicates(np.asarray(X, dtype=np.float64))
+    core = core_mask(cKDTree(points), points, weights, eps, min_samples, chunk_size)
+    labels = _label_points(points, core, eps, chunk_size)
+    return labels[inverse], core[inverse]
+
+
+def _label_points(points, core, eps, chunk_size=DEFAULT_CHUNK_SIZE):
+    labels = np.full(len(points), -1, dtype=np.int32)
+    core_idx = np.flatnonzero(core)
+    if not len(core_idx):
+        return labels
+
+    parent = np.arange(len(core_idx))
+    for a, b in _core_links(points[core_idx], eps, chunk_size):
+        _union(parent, a, b)
+    _, labels[core_idx] = np.unique(_find(parent, np.arange(len(core_idx))), return_inverse=True)
+
+    border_idx = np.flatnonzero(~core)
+    # distance_upper_bound is strict; DBSCAN reaches neighbors at exactly eps
+    _, nearest = cKDTree(points[core_idx]).query(
+        points[border_idx], k=1, distance_upper_bound=np.nextafter(eps, np.inf))
+    reached = nearest < len(core_idx)
+    labels[border_idx[reached]] = labels[core_idx[nearest[reached]]]
+    return labels
+
+
+def _sweep_labels(n_points, core, i, j, d):
+    """Label one sweep setting from the (distance-sorted) pairs within its eps."""
+    labels = np.full(n_points, -1, dtype=np.int32)
+    core_idx = np.flatnonzero(core)
+    if not len(core_idx):
+        return labels
+
+    parent = np.arange(n_points)
+    linked = core[i] & core[j]
+    _union(parent, i[linked], j[linked])
+    _, labels[core_idx] = np.unique(_find(parent, core_idx), return_inverse=True)
+
+    # Attach border points to their nearest core neighbor: write the pairs
+    # farthest first so the nearest one is the value left in place.
+    to_i, to_j = ~core[i] & core[j], core[i] & ~core[j]
+    border = np.concatenate([i[to_i], j[to_j]])
+    source = np.concatenate([j[to_i], i[to_j]])
+    order = np.argsort(np.concatenate([d[to_i], d[to_j]]), kind='stable')[::-1]
+    labels[border[order]] = labels[source[order]]
+    return labels
+
+
+def dbscan_sweep(X, eps_values, min_samples_values, silhouette_samples=5000,
+                 max_pairs=MAX_ENUMERATED_PAIRS, random_state=42):
+    """
+    Evaluate DBSCAN over a grid of (eps, min_samples) from one neighbor graph.
+
+    The radius-neighbor graph is built once at max(eps_values) on the collapsed
+    points and each setting is derived from its distance-sorted prefix. If that
+    graph would exceed max_pairs, each setting is linked separately instead
+    (still sharing the collapsed points and one k-NN query). Returns a
+    DataFrame with n_clusters, noise_fraction and silhouette (on a subsample
+    of non-noise rows) per setting.
+    """
+    points, inverse, weights = collapse_duplicates(np.asarray(X, dtype=np.float64))
+    tree = cKDTree(points)
+    max_eps = max(eps_values)
+    use_graph = tree.count_neighbors(tree, max_eps) <= max_pairs
+
+    if use_graph:
+        chunks = [(i[i < j], j[i < j], d[i < j]) for i, j, d in iter_neighbor_pairs(tree, points, max_eps)]
+        i, j, d = (np.concatenate(parts) for parts in zip(*chunks))
+        order = np.argsort(d, kind='stable')
+        i, j, d = i[order].astype(np.int32), j[order].astype(np.int32), d[order]
+
+    # One k-NN query at the largest min_samples serves every core test
+    k = min(max(min_samples_values), len(points))
+    knn_distances, knn_neighbors = tree.query(points, k=k)
+    knn_distances, knn_weights = knn_distances.reshape(-1, k), weights[knn_neighbors.reshape(-1, k)]
+
+    rng = np.random.default_rng(random_state)
+    sample = rng.choice(len(inverse), size=min(silhouette_samples, len(inverse)), replace=False)
+
+    rows = []
+    for eps in sorted(eps_values):
+        if use_graph:
+            n_within = np.searchsorted(d, eps, side='right')
+            eps_i, eps_j, eps_d = i[:n_within], j[:n_within], d[:n_within]
+        counts = np.where(knn_distances <= eps, knn_weights, 0).sum(axis=1)
+        for min_samples in sorted(min_samples_values):
+            core = counts >= min_samples
+            if use_graph:
+                labels = _sweep_labels(len(points), core, eps_i, eps_j, eps_d)
+            else:
+                labels = _label_points(points, core, eps)
+            noise = labels == -1
+            sample_labels = labels[inverse[sample]]
+            clustered = sample_labels >= 0
+            silhouette = np.nan
+            if len(np.unique(sample_labels[clustered])) > 1:
+                silhouette = silhouette_score(points[inverse[sample[clustered]]], sample_labels[clustered])
+            rows.append({
+                'eps': eps,
+                'min_samples': min_samples,
+                'n_clusters': int(labels.max()) + 1,
+                'noise_fraction': weights[noise].sum() / weights.sum(),
+                'silhouette': silhouette,
+            })
+    return pd.DataFrame(rows)
@@ -0,0 +1,124 @@
+"""
+Two-stage hierarchical clustering for the full dataset.
+
+Rows are first reduced to at most n_micro weighted micro-clusters (the
+distinct rows when there are few enough, otherwise MiniBatch KMeans
+centroids). Ward linkage then runs on the weighted micro-centroids and labels
+are mapped back to every row, so the dendrogram covers the whole fleet at
+O(n_micro^2) cost instead of O(n^2).
+"""
+
+import numpy as np
+from scipy.cluster.hierarchy import fcluster
+from sklearn.cluster import MiniBatchKMeans
+
+from ev_dbscan import collapse_duplicates
+
+DEFAULT_MICRO_CLUSTERS = 2000
+
+
+def _ward_distances(centroids, sizes, i, candidates):
+    # Ward merge cost in scipy's units: sqrt(2 * n_i * n_j / (n_i + n_j)) * ||c_i - c_j||
+    gap = np.linalg.norm(centroids[candidates] - centroids[i], axis=1)
+    return np.sqrt(2.0 * sizes[i] * sizes[candidates] / (sizes[i] + sizes[candidates])) * gap
+
+
+def _to_scipy_linkage(merges, n_points):
+    """Sort (a, b, height) merges by height and renumber clusters scipy-style."""
+    merges = sorted(merges, key=lambda merge: merge[2])
+    parent = np.arange(2 * n_points - 1)
+    counts = np.concatenate([np.ones(n_points), np.zeros(n_points - 1)])
+
+    def root(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    Z = np.empty((len(merges), 4))
+    for step, (a, b, height) in enumerate(merges):
+        root_a, root_b = root(a), root(b)
+        new_id = n_points + step
+        parent[root_a] = parent[root_b] = new_id
+        counts[new_id] = counts[root_a] + counts[root_b]
+        Z[step] = [min(root_a, root_b), max(root_a, root_b), height, counts[new_id]]
+    return Z
+
+
+def weighted_ward_linkage(centroids, weights):
+    """
+    Ward linkage over weighted points using the nearest-neighbor chain algorithm.
+
+    Matches scipy's linkage(method='ward') when all weights are 1. As scipy
+    requires, the count column holds leaves (weighted points), not weights.
+    """
+    centroids = np.array(centroids, dtype=np.float64)
+    sizes = np.array(weights, dtype=np.float64)
+    n_points = len(centroids)
+    active = np.ones(n_points, dtype=bool)
+    merges = []
+    chain = []
+
+    while len(merges) < n_points - 1:
+        if not chain:
+            chain.append(int(np.flatnonzero(active)[0]))
+        current = chain[-1]
+        candidates = np.flatnonzero(active)
+        candidates = candidates[candidates != current]
+        distances = _ward_distances(centroids, sizes, current, candidates)
+        nearest = int(candidates[np.argmin(distances)])
+        # On ties prefer the previous chain element so the chain terminates
+        if len(chain) > 1 and distances[candidates == chain[-2]][0] <= distances.min():
+            nearest = chain[-2]
+
+        if len(chain) == 1 or nearest != chain[-2]:
+            chain.append(nearest)
+            continue
+
+        # Reciprocal nearest neighbors: merge into the lower slot. A slot always
+        # contains the original point with its index, which is how merges are
+        # recorded for _to_scipy_linkage.
+        del chain[-2:]
+        keep, drop = min(current, nearest), max(current, nearest)
+        merges.append((keep, drop, distances.min()))
+        total = sizes[keep] + sizes[drop]
+        centroids[keep] = (sizes[keep] * centroids[keep] + sizes[drop] * centroids[drop]) / total
+        sizes[keep] = total
+        active[drop] = False
+
+    return _to_scipy_linkage(merges, n_points)
+
+
+def micro_clusters(scaled_features, n_micro=DEFAULT_MICRO_CLUSTERS, random_state=42):
+    """Return (micro-centroids, weights, row -> micro-cluster index)."""
+    points, inverse, weights = collapse_duplicates(scaled_features)
+    if len(points) <= n_micro:
+        return points, weights, inverse
+
+    model = MiniBatchKMeans(n_clusters=n_micro, random_state=random_state, n_init=3)
+    model.fit(points, sample_weight=weights)
+    point_micro = model.predict(points)
+    micro_weights = np.bincount(point_micro, weights=weights, minlength=n_micro)
+
+    # Drop empty micro-clusters and renumber the rest
+    used = np.flatnonzero(micro_weights)
+    renumber = np.full(n_micro, -1)
+    renumber[used] = np.arange(len(used))
+    return model.cluster_centers_[used], micro_weights[used], renumber[point_micro][inverse]
+
+
+def two_stage_hierarchical(scaled_features, n_clusters=None, distance_threshold=None,
+                           n_micro=DEFAULT_MICRO_CLUSTERS, random_state=42):
+    """
+    Cluster every row with Ward linkage over weighted micro-clusters.
+
+    Cut the tree either into n_clusters or at distance_threshold. Returns
+    (labels starting at 0, linkage matrix).
+    """
+    centroids, weights, row_micro = micro_clusters(scaled_features, n_micro, random_state)
+    linked = weighted_ward_linkage(centroids, weights)
+    if n_clusters is not None:
+        micro_labels = fcluster(linked, t=n_clusters, criterion='maxclust')
+    else:
+        micro_labels = fcluster(linked, t=distance_threshold, criterion='distance')
+    return (micro_labels - 1)[row_micro].astype(np.int32), linked
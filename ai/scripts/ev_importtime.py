@@ -0,0 +1,91 @@
+"""
+In-process import timing, similar to `python -X importtime`.
+
+ImportTimer is a meta path finder that wraps each module's exec_module and
+records self and cumulative import time. Install it before the imports you
+want measured (or use it as a context manager); only the standard library is
+used here so installing it is cheap.
+"""
+
+import importlib.abc
+import sys
+import time
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.records = []
+        self._stack = []
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self):
+        """Stop timing new imports; the records so far are kept."""
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        loader = spec.loader
+        # Builtin/frozen loaders are shared classes; only wrap per-module loader instances
+        if loader is None or isinstance(loader, type) or not hasattr(loader, 'exec_module'):
+            return spec
+        exec_module = loader.exec_module
+
+        def timed_exec_module(module):
+            self._stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                cumulative = time.perf_counter() - started
+                children = self._stack.pop()
+                if self._stack:
+                    self._stack[-1] += cumulative
+                self.records.append({
+                    'module': name, 'depth': len(self._stack), 'self': cumulative - children, 'cumulative': cumulative,
+                })
+
+        loader.exec_module = timed_exec_module
+        return spec
+
+    def report(self, top=15):
+        """Total seconds spent importing since install() and the slowest outermost imports."""
+        # Outermost imports include the time of everything they imported in turn
+        roots = [record for record in self.records if record['depth'] == 0]
+        return {
+            'total_seconds': round(sum(record['cumulative'] for record in roots), 4),
+            'since_install_seconds': round(time.perf_counter() - self.started, 4),
+            'modules': len(self.records),
+            'slowest': [
+                {'module': record['module'], 'cumulative_seconds': round(record['cumulative'], 4),
+                 'self_seconds': round(record['self'], 4)}
+                for record in sorted(roots, key=lambda record: record['cumulative'], reverse=True)[:top]
+            ],
+        }
+
+    def print_report(self, top=15, file=sys.stderr):
+        report = self.report(top)
+        print("import time: self [us] | cumulative | imported package", file=file)
+        for record in report['slowest']:
+            print(f"import time: {record['self_seconds'] * 1e6:>9.0f} | {record['cumulative_seconds'] * 1e6:>10.0f} | "
+                  f"{record['module']}", file=file)
+        print(f"import time: {report['total_seconds']:.3f}s total over {report['modules']} modules", file=file)
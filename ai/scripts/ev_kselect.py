@@ -0,0 +1,73 @@
+"""
+Parallel k-selection for KMeans.
+
+The scaled matrix is written once to a temporary .npy file and memory-mapped
+by each worker process, so candidates run in parallel without pickling the
+data per task.
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score
+from threadpoolctl import threadpool_limits
+
+
+def _score_k(matrix_path, k, silhouette_samples, random_state):
+    scaled_features = np.load(matrix_path, mmap_mode='r')
+    # One process per candidate; keep each one single-threaded
+    with threadpool_limits(limits=1):
+        kmeans = KMeans(n_clusters=k, random_state=random_state).fit(scaled_features)
+        silhouette = np.nan
+        if k > 1:
+            silhouette = silhouette_score(
+                scaled_features,
+                kmeans.labels_,
+                sample_size=min(silhouette_samples, len(scaled_features)),
+                random_state=random_state,
+            )
+    return {'k': k, 'inertia': kmeans.inertia_, 'silhouette': silhouette}
+
+
+def elbow_k(scores):
+    """Pick the k farthest from the chord between the first and last inertia."""
+    k = scores['k'].to_numpy(dtype=float)
+    inertia = scores['inertia'].to_numpy(dtype=float)
+    if len(k) < 3:
+        return int(k[0])
+    x = (k - k[0]) / (k[-1] - k[0])
+    y = (inertia - inertia[-1]) / (inertia[0] - inertia[-1] or 1.0)
+    return int(k[np.argmax(np.abs(1 - x - y))])
+
+
+def select_k(scaled_features, k_values=range(1, 10), criterion='silhouette', max_workers=None,
+             silhouette_samples=5000, random_state=42):
+    """
+    Fit KMeans for every candidate k in a process pool and return (best_k, scores).
+
+    scores has inertia and subsample silhouette per k. criterion='silhouette'
+    picks the highest silhouette (k >= 2); criterion='elbow' picks the knee of
+    the inertia curve.
+    """
+    k_values = sorted(k for k in k_values if k <= len(scaled_features))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        matrix_path = os.path.join(tmp_dir, 'scaled_features.npy')
+        np.save(matrix_path, np.ascontiguousarray(scaled_features, dtype=np.float64))
+
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(_score_k, matrix_path, k, silhouette_samples, random_state)
+                for k in k_values
+            ]
+            scores = pd.DataFrame([future.result() for future in futures])
+
+    if criterion == 'elbow':
+        return elbow_k(scores), scores
+    if criterion == 'silhouette':
+        best = scores['silhouette'].idxmax() if scores['silhouette'].notna().any() else 0
+        return int(scores.loc[best, 'k']), scores
+    raise ValueError(f"Unknown k-selection criterion: {criterion}")
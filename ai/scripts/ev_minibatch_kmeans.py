@@ -0,0 +1,91 @@
+"""
+Streaming MiniBatch KMeans over feature batches.
+
+`make_batches` is a zero-argument callable returning a fresh iterator of
+DataFrames (for example slices of an in-memory frame, or ev_data.iter_ev_data).
+Only one batch is scaled and held in memory at a time.
+"""
+
+import time
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+
+
+def clean_features(batch, features):
+    return batch[features].replace([np.inf, -np.inf], np.nan).dropna()
+
+
+def stream_fit_scaler(make_batches, features):
+    scaler = StandardScaler()
+    for batch in make_batches():
+        batch = clean_features(batch, features)
+        # Filtered chunks may be empty; StandardScaler rejects 0 samples
+        if len(batch):
+            scaler.partial_fit(batch)
+    if not hasattr(scaler, 'mean_'):
+        raise ValueError("No rows with complete features to fit on")
+    return scaler
+
+
+def fit_minibatch_kmeans(
+    make_batches,
+    features,
+    n_clusters=5,
+    batch_size=10_000,
+    tol=1e-4,
+    max_epochs=5,
+    random_state=42,
+):
+    """
+    Fit a StandardScaler and MiniBatchKMeans in streaming passes over the batches.
+
+    Each epoch is one pass over the data; training stops once the largest
+    centroid shift over an epoch is <= tol. Returns (scaler, model, stats).
+    """
+    scaler = stream_fit_scaler(make_batches, features)
+    model = MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size, random_state=random_state, n_init=3)
+    rng = np.random.default_rng(random_state)
+
+    rows = 0
+    shift = np.inf
+    pending = np.empty((0, len(features)))
+    started = time.perf_counter()
+    for epoch in range(1, max_epochs + 1):
+        previous = getattr(model, 'cluster_centers_', None)
+        previous = None if previous is None else previous.copy()
+
+        for batch in make_batches():
+            batch = clean_features(batch, features)
+            if not len(batch):
+                continue
+            scaled = scaler.transform(batch)
+            # Source batches may be sorted (e.g. by make); shuffle before slicing
+            scaled = np.concatenate([pending, scaled[rng.permutation(len(scaled))]])
+            usable = len(scaled) - len(scaled) % batch_size
+            for start in range(0, usable, batch_size):
+                model.partial_fit(scaled[start:start + batch_size])
+            rows += usable
+            pending = scaled[usable:]
+
+        # Flush the short remainder as a final minibatch for this epoch
+        if len(pending) >= n_clusters:
+            model.partial_fit(pending)
+            rows += len(pending)
+        pending = pending[:0]
+
+        if previous is not None:
+            shift = np.linalg.norm(model.cluster_centers_ - previous, axis=1).max()
+            if shift <= tol:
+                break
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        'rows': rows,
+        'epochs': epoch,
+        'center_shift': float(shift),
+        'seconds': elapsed,
+        'rows_per_second': rows / elapsed if elapsed else float('inf'),
+    }
+    return scaler, model, stats
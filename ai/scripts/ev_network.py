@@ -0,0 +1,94 @@
+"""
+Correlation networks over wide feature sets.
+
+The edge list comes straight from the upper triangle of the correlation matrix
+with one vectorized threshold mask, and the graph is handed to networkx in
+bulk, so building a network over hundreds of features takes milliseconds.
+Layouts are computed with a fixed seed and iteration budget (networkx switches
+to its sparse solver from 500 nodes) and cached by graph structure: in memory
+for the life of the process, and across runs when a StageCache is passed.
+"""
+
+import hashlib
+
+import numpy as np
+
+LAYOUT_SEED = 42
+LAYOUT_ITERATIONS = 50
+
+# Graph structure hash -> node positions, for this process only
+_layouts = {}
+
+
+def correlation_edges(corr, threshold=0.5):
+    """(source, target, r) arrays for every feature pair with |r| >= threshold."""
+    values = corr.to_numpy(dtype=np.float64)
+    rows, cols = np.triu_indices(len(values), k=1)
+    r = values[rows, cols]
+    # NaN correlations (constant or empty columns) compare False and drop out
+    keep = np.abs(r) >= threshold
+    names = np.asarray(corr.columns, dtype=object)
+    return names[rows[keep]], names[cols[keep]], r[keep]
+
+
+def correlation_graph(corr, threshold=0.5, include_isolated=True, absolute_weight=False):
+    """
+    Graph with an edge per feature pair with |r| >= threshold. Each edge keeps
+    the signed r as 'corr'; its 'weight', which the spring layout pulls by, is
+    r, or |r| with absolute_weight so negatively correlated features attract
+    as well. Features without any such edge are nodes too, unless
+    include_isolated is False.
+    """
+    import networkx as nx
+
+    sources, targets, r = correlation_edges(corr, threshold)
+    weights = np.abs(r) if absolute_weight else r
+    G = nx.Graph()
+    if include_isolated:
+        G.add_nodes_from(corr.columns)
+    G.add_edges_from(
+        (u, v, {'weight': weight, 'corr': value})
+        for u, v, weight, value in zip(sources.tolist(), targets.tolist(), weights.tolist(), r.tolist())
+    )
+    return G
+
+
+def _structure(G):
+    """(nodes, weighted edges) of G, enough to rebuild it for the layout."""
+    return list(G.nodes), list(G.edges(data='weight', default=1.0))
+
+
+def _structure_key(nodes, edges, seed, iterations):
+    digest = hashlib.sha256(repr((seed, iterations)).encode())
+    digest.update(repr(nodes).encode())
+    digest.update(repr(edges).encode())
+    return digest.hexdigest()
+
+
+def _spring_layout(nodes, edges, seed, iterations):
+    import networkx as nx
+
+    G = nx.Graph()
+    G.add_nodes_from(nodes)
+    G.add_weighted_edges_from(edges)
+    return nx.spring_layout(G, seed=seed, iterations=iterations)
+
+
+def network_layout(G, seed=LAYOUT_SEED, iterations=LAYOUT_ITERATIONS, stages=None):
+    """
+    Spring layout of G, reused for any graph with the same nodes and weighted
+    edges. With stages (an ev_stage_cache.StageCache) the positions are also
+    persisted, so later runs skip the layout too.
+    """
+    nodes, edges = _structure(G)
+    key = _structure_key(nodes, edges, seed, iterations)
+    if key not in _layouts:
+        if stages is None:
+            _layouts[key] = _spring_layout(nodes, edges, seed, iterations)
+        else:
+            import networkx as nx
+
+            layout = stages.run('network_layout', _spring_layout, nodes, edges, seed, iterations,
+                                inputs=[nx.__version__])
+            _layouts[key] = layout.value
+    return _layouts[key]
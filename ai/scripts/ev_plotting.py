@@ -0,0 +1,137 @@
+"""
+Figure output and large-data plotting for the EV scripts.
+
+Figures are shown interactively by default. After save_figures_to(), they are
+rendered with the non-interactive Agg backend and written to files instead,
+so the scripts can run on headless workers.
+
+Cluster scatter and pair plots draw a stratified per-cluster sample of at most
+max_points rows ('sample' mode) or hexbin/2D-histogram densities of every row
+('density' mode). Point artists are rasterized either way, so render time and
+file size stay bounded regardless of the dataset size.
+
+matplotlib and seaborn are imported on first use, so importing this module
+costs nothing for runs that never plot.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from ev_profiling import stage
+
+FIGURE_FORMATS = ('png', 'svg')
+PLOT_MODES = ('sample', 'density')
+DEFAULT_MAX_POINTS = 20_000
+# Clusters smaller than this are drawn in full even when that exceeds their share
+MIN_POINTS_PER_GROUP = 200
+
+_output = {'dir': None, 'formats': ('png',)}
+_plots = {'mode': 'sample', 'max_points': DEFAULT_MAX_POINTS}
+
+
+def save_figures_to(output_dir, formats=('png',)):
+    """Write every finished figure to output_dir in each of formats instead of showing it."""
+    unknown = set(formats) - set(FIGURE_FORMATS)
+    if unknown:
+        raise ValueError(f"Unsupported figure formats: {sorted(unknown)}")
+    import matplotlib
+
+    matplotlib.use('Agg')
+    os.makedirs(output_dir, exist_ok=True)
+    _output.update(dir=output_dir, formats=tuple(formats))
+
+
+def finish_figure(name, fig=None):
+    """Show the current (or given) figure, or save it as <name>.<format>. Returns the saved paths."""
+    import matplotlib.pyplot as plt
+
+    fig = fig or plt.gcf()
+    if _output['dir'] is None:
+        plt.show()
+        return []
+
+    paths = []
+    # Figures are drawn lazily, so most of the rendering cost lands in savefig
+    with stage(f"render:{name}"):
+        for fmt in _output['formats']:
+            path = os.path.join(_output['dir'], f"{name}.{fmt}")
+            fig.savefig(path, bbox_inches='tight')
+            paths.append(path)
+    plt.close(fig)
+    return paths
+
+
+def configure_plots(mode='sample', max_points=DEFAULT_MAX_POINTS):
+    if mode not in PLOT_MODES:
+        raise ValueError(f"Unknown plot mode: {mode}")
+    _plots.update(mode=mode, max_points=max_points)
+
+
+def stratified_positions(groups, max_points, min_per_group=MIN_POINTS_PER_GROUP, random_state=42):
+    """
+    Sorted row positions of a random sample of about max_points rows in which
+    each group of `groups` keeps its share (but at least min_per_group rows).
+    Rows with a missing group are left out.
+    """
+    codes, _ = pd.factorize(groups)
+    present = np.flatnonzero(codes >= 0)
+    if len(present) <= max_points:
+        return present
+
+    codes = codes[present]
+    sizes = np.bincount(codes)
+    quota = np.maximum(sizes * max_points // len(present), np.minimum(sizes, min_per_group))
+    # Group-major order, random within each group; keep the first quota rows of each group
+    order = np.lexsort((np.random.default_rng(random_state).random(len(codes)), codes))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rank = np.arange(len(order)) - starts[codes[order]]
+    return np.sort(present[order[rank < quota[codes[order]]]])
+
+
+def cluster_scatter(data, x, y, hue, palette='tab10', ax=None):
+    """
+    Scatter plot of data[x] vs data[y] colored by hue (a column name or a
+    Series aligned with data), bounded by the configured plot mode.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    hue_values = data[hue] if isinstance(hue, str) else hue
+    hue_name = hue if isinstance(hue, str) else hue.name
+    ax = ax or plt.gca()
+
+    if _plots['mode'] == 'density':
+        valid = data[[x, y]].notna().all(axis=1).to_numpy()
+        ax.hexbin(data[x].to_numpy()[valid], data[y].to_numpy()[valid],
+                  gridsize=80, bins='log', mincnt=1, cmap='Greys', rasterized=True)
+        # Mark each cluster at its median so the density map stays readable
+        medians = data[[x, y]].groupby(hue_values.to_numpy(), observed=True).median()
+        medians.index.name = hue_name
+        return sns.scatterplot(data=medians.reset_index(), x=x, y=y, hue=hue_name, palette=palette,
+                               marker='X', s=150, edgecolor='black', ax=ax)
+
+    keep = stratified_positions(hue_values, _plots['max_points'])
+    sample = data[[x, y]].iloc[keep]
+    sample[hue_name] = hue_values.iloc[keep].array
+    return sns.scatterplot(data=sample, x=x, y=y, hue=hue_name, palette=palette, s=12,
+                           linewidth=0, rasterized=True, ax=ax)
+
+
+def cluster_pairplot(data, variables, hue, palette='Set2'):
+    """sns.pairplot of variables by hue, bounded by the configured plot mode."""
+    import seaborn as sns
+
+    columns = [*variables, hue]
+    if _plots['mode'] == 'density':
+        # 2D histograms bin every row instead of drawing it
+        with stage('pairplot', rows=len(data)):
+            return sns.pairplot(data.loc[data[hue].notna(), columns], vars=variables, hue=hue, palette=palette,
+                                kind='hist', diag_kind='hist', plot_kws={'bins': 50, 'rasterized': True},
+                                diag_kws={'bins': 50, 'element': 'step'})
+
+    sample = data[columns].iloc[stratified_positions(data[hue], _plots['max_points'])]
+    with stage('pairplot', rows=len(sample)):
+        return sns.pairplot(sample, vars=variables, hue=hue, palette=palette,
+                            plot_kws={'s': 12, 'linewidth': 0, 'rasterized': True})
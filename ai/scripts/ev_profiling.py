@@ -0,0 +1,184 @@
+"""
+Per-stage profiling for the EV pipeline.
+
+Code marks its stages with `with stage('name') as record:` and may set
+record['rows']. While a StageProfiler is active, each stage records wall and
+CPU time, resident memory and the growth of peak RSS, and optionally a
+cProfile summary or the tracemalloc peak of Python allocations. Otherwise
+stage() only yields a throwaway dict.
+
+Stages nest: a stage opened inside another is recorded with its parent, so
+CSV parsing, WKT parsing, scaling, fitting and figure rendering show up inside
+the pipeline stages that run them. The records are exported as JSON and as a
+Chrome trace (chrome://tracing or https://ui.perfetto.dev).
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CAPTURES = ('cprofile', 'tracemalloc')
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+_MAXRSS_BYTES = 1 if sys.platform == 'darwin' else 1024
+
+_active = {'profiler': None}
+
+
+def _rss_mb():
+    """Current resident set size in MB (peak RSS where the current size is not available)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError):
+        return _peak_rss_mb()
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return float('nan')
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_BYTES / 2**20
+
+
+class StageProfiler:
+    """
+    Collects stage records while active (see activate()).
+
+    captures may include 'cprofile' (top functions of each outermost stage,
+    since only one profiler can run at a time) and 'tracemalloc' (peak traced
+    Python memory of every stage; slows allocation-heavy code noticeably).
+    """
+
+    def __init__(self, captures=(), top=15):
+        unknown = set(captures) - set(CAPTURES)
+        if unknown:
+            raise ValueError(f"Unknown profiling captures: {sorted(unknown)}")
+        self.captures = tuple(captures)
+        self.top = top
+        self.records = []
+        self.started = time.perf_counter()
+        self._stack = []
+
+    @contextmanager
+    def activate(self):
+        """Make this the profiler that stage() records into."""
+        previous = _active['profiler']
+        _active['profiler'] = self
+        started_tracing = 'tracemalloc' in self.captures and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        try:
+            yield self
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+            _active['profiler'] = previous
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        record = {'name': name, 'depth': len(self._stack), 'rows': rows,
+                  'parent': self._stack[-1]['name'] if self._stack else None}
+        profile = None
+        if 'cprofile' in self.captures and not self._stack:
+            profile = cProfile.Profile()
+        tracing = 'tracemalloc' in self.captures and tracemalloc.is_tracing()
+        if tracing:
+            # reset_peak() would lose the parent's peak so far; fold it in first
+            self._fold_traced_peak()
+            record['_traced_start'], _ = tracemalloc.get_traced_memory()
+            record['_traced_peak'] = 0
+            tracemalloc.reset_peak()
+
+        rss_before, peak_before = _rss_mb(), _peak_rss_mb()
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        self._stack.append(record)
+        if profile:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile:
+                profile.disable()
+            self._stack.pop()
+            record['start'] = round(wall_started - self.started, 6)
+            record['wall_seconds'] = round(time.perf_counter() - wall_started, 6)
+            record['cpu_seconds'] = round(time.process_time() - cpu_started, 6)
+            record['rss_mb'] = round(_rss_mb(), 1)
+            record['rss_delta_mb'] = round(record['rss_mb'] - rss_before, 1)
+            record['peak_rss_delta_mb'] = round(_peak_rss_mb() - peak_before, 1)
+            if tracing:
+                peak = max(record.pop('_traced_peak'), tracemalloc.get_traced_memory()[1])
+                record['traced_peak_mb'] = round((peak - record.pop('_traced_start')) / 2**20, 2)
+                if self._stack:
+                    self._stack[-1]['_traced_peak'] = max(self._stack[-1].get('_traced_peak', 0), peak)
+                    tracemalloc.reset_peak()
+            if profile:
+                record['top_functions'] = self._top_functions(profile)
+            self.records.append(record)
+
+    def _fold_traced_peak(self):
+        if self._stack and '_traced_peak' in self._stack[-1]:
+            parent = self._stack[-1]
+            parent['_traced_peak'] = max(parent['_traced_peak'], tracemalloc.get_traced_memory()[1])
+
+    def _top_functions(self, profile):
+        """The functions with the most self time; the cumulative time of the stage itself is in its record."""
+        stats = pstats.Stats(profile, stream=io.StringIO())
+        top = []
+        for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+            top.append({'function': f"{os.path.basename(filename)}:{line}({function})", 'calls': calls,
+                        'self_seconds': round(own, 6), 'cumulative_seconds': round(cumulative, 6)})
+        return sorted(top, key=lambda entry: entry['self_seconds'], reverse=True)[:self.top]
+
+    def report(self):
+        return {
+            'captures': list(self.captures),
+            'stages': sorted(self.records, key=lambda record: record['start']),
+        }
+
+    def chrome_trace(self):
+        """The records as Chrome trace events: one complete event per stage plus an RSS counter."""
+        pid, tid = os.getpid(), threading.get_ident()
+        events = []
+        for record in sorted(self.records, key=lambda record: record['start']):
+            start_us = record['start'] * 1e6
+            args = {key: value for key, value in record.items()
+                    if key not in ('name', 'start', 'depth', 'parent', 'top_functions')}
+            events.append({'name': record['name'], 'cat': 'stage', 'ph': 'X', 'ts': start_us,
+                           'dur': record['wall_seconds'] * 1e6, 'pid': pid, 'tid': tid, 'args': args})
+            events.append({'name': 'rss_mb', 'ph': 'C', 'ts': start_us + record['wall_seconds'] * 1e6,
+                           'pid': pid, 'args': {'rss_mb': record['rss_mb']}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self, output_dir):
+        """Write profile.json and trace.json (Chrome trace format) to output_dir. Returns their paths."""
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+        for name, data in (('profile.json', self.report()), ('trace.json', self.chrome_trace())):
+            path = os.path.join(output_dir, name)
+            with open(path, 'w') as f:
+                json.dump(data, f, indent=2 if name == 'profile.json' else None)
+            paths.append(path)
+        return paths
+
+
+@contextmanager
+def stage(name, rows=None):
+    """Record a stage in the active StageProfiler, if any. Yields the stage record."""
+    profiler = _active['profiler']
+    if profiler is None:
+        yield {'name': name, 'rows': rows}
+        return
+    with profiler.stage(name, rows) as record:
+        yield record
@@ -0,0 +1,275 @@
+"""
+Content-addressed cache for pipeline stage results.
+
+A stage is keyed by a hash of its name, its inputs, its keyword parameters and
+the source of the code it runs: the module defining the stage function plus
+every module next to it that it imports, directly or not. Inputs that are themselves stage results
+contribute their key rather than their data, so a chain of cached stages is
+resolved without hashing or even loading the intermediate frames. Results are
+stored as Parquet (DataFrames), NPY (arrays) or pickle (anything else) and the
+least recently used entries are evicted once the cache exceeds its size cap.
+"""
+
+import ast
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import pickle
+import shutil
+import sys
+import time
+from functools import lru_cache
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+
+from ev_data import parquet_available
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+MANIFEST = 'manifest.json'
+# Libraries whose upgrades can change stage results, besides numpy and pandas
+FINGERPRINT_PACKAGES = ('scikit-learn', 'scipy')
+
+
+def file_fingerprint(path):
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _package_version(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return 'not installed'
+
+
+@lru_cache(maxsize=None)
+def _read_module(path, mtime_ns, size):
+    """(source, top-level names of every module it imports, including inside functions)."""
+    with open(path, 'rb') as f:
+        source = f.read()
+    imported = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            imported.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            imported.add(node.module.split('.')[0])
+    return source, frozenset(imported)
+
+
+def local_sources(path):
+    """{file name: source} of path and the modules in its directory it imports, transitively."""
+    directory = os.path.dirname(os.path.abspath(path))
+    sources = {}
+    pending = [os.path.abspath(path)]
+    while pending:
+        current = pending.pop()
+        name = os.path.basename(current)
+        if name in sources:
+            continue
+        stat = os.stat(current)
+        sources[name], imported = _read_module(current, stat.st_mtime_ns, stat.st_size)
+        pending.extend(
+            candidate for candidate in (os.path.join(directory, f"{module}.py") for module in imported)
+            if os.path.isfile(candidate)
+        )
+    return sources
+
+
+def _source_file(obj):
+    if isinstance(obj, str):
+        return importlib.util.find_spec(obj).origin
+    module = sys.modules.get(getattr(obj, '__module__', None))
+    return getattr(module, '__file__', None)
+
+
+def code_fingerprint(*objects):
+    """
+    Hash the numeric library versions and, for each function/class/module, the
+    source of its module and of the local modules that one imports, so a change
+    to any helper a stage can reach invalidates it. Modules may be given by
+    name, which hashes their source files without importing them.
+    """
+    versions = [np.__version__, pd.__version__] + [_package_version(name) for name in FINGERPRINT_PACKAGES]
+    digest = hashlib.sha256(':'.join(versions).encode())
+    sources = {}
+    for obj in objects:
+        path = _source_file(obj)
+        if path is not None and path.endswith('.py') and os.path.isfile(path):
+            sources.update(local_sources(path))
+            continue
+        try:
+            digest.update(inspect.getsource(obj).encode())
+        except (OSError, TypeError):
+            # No source on disk (e.g. defined interactively): fall back to the bytecode
+            code = getattr(obj, '__code__', None)
+            digest.update(code.co_code if code else repr(obj).encode())
+    for name in sorted(sources):
+        digest.update(name.encode())
+        digest.update(sources[name])
+    return digest.hexdigest()
+
+
+def data_fingerprint(value):
+    if isinstance(value, StageResult):
+        return value.key
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        hashed = pd.util.hash_pandas_object(value, index=True).to_numpy()
+        header = repr(value.dtypes.to_dict() if isinstance(value, pd.DataFrame) else value.dtype)
+        return hashlib.sha256(header.encode() + hashed.tobytes()).hexdigest()
+    if isinstance(value, np.ndarray):
+        return hashlib.sha256(repr((value.dtype, value.shape)).encode() + value.tobytes()).hexdigest()
+    return repr(value)
+
+
+def _write_part(value, path):
+    if isinstance(value, pd.DataFrame) and parquet_available():
+        try:
+            value.to_parquet(f"{path}.parquet")
+            return 'parquet'
+        except (ValueError, TypeError, NotImplementedError):
+            pass  # e.g. mixed-type object columns; pickle below
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        np.save(f"{path}.npy", value)
+        return 'npy'
+    with open(f"{path}.pkl", 'wb') as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return 'pkl'
+
+
+def _read_part(kind, path):
+    if kind == 'parquet':
+        return pd.read_parquet(f"{path}.parquet")
+    if kind == 'npy':
+        return np.load(f"{path}.npy")
+    with open(f"{path}.pkl", 'rb') as f:
+        return pickle.load(f)
+
+
+def _dir_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+class StageResult:
+    """A stage output that is loaded or computed only when .value is read."""
+
+    def __init__(self, cache, name, key, compute):
+        self.cache = cache
+        self.name = name
+        self.key = key
+        self._compute = compute
+        self._resolved = False
+        self._value = None
+
+    @property
+    def value(self):
+        if not self._resolved:
+            self._value = self.cache.resolve(self)
+            self._resolved = True
+        return self._value
+
+    def part(self, index):
+        """A lazy view of one element of a tuple result, usable as a stage input."""
+        return _ResultPart(self, index)
+
+
+class _ResultPart(StageResult):
+    def __init__(self, parent, index):
+        super().__init__(parent.cache, f"{parent.name}[{index}]", f"{parent.key}[{index}]", None)
+        self.parent = parent
+        self.index = index
+
+    @property
+    def value(self):
+        return self.parent.value[self.index]
+
+
+class StageCache:
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, enabled=True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def run(self, name, func, *args, code=(), inputs=(), **kwargs):
+        """
+        Return a lazy StageResult for func(*args, **kwargs).
+
+        The module of func and every local module it imports are always part
+        of the key; `code` lists further functions/modules the result depends
+        on. `inputs` adds fingerprints for data that func reads implicitly,
+        such as a file path.
+        """
+        digest = hashlib.sha256(name.encode())
+        digest.update(code_fingerprint(func, *code).encode())
+        for value in (*inputs, *args):
+            digest.update(data_fingerprint(value).encode())
+        digest.update(repr(sorted(kwargs.items())).encode())
+
+        def compute():
+            resolved = [arg.value if isinstance(arg, StageResult) else arg for arg in args]
+            return func(*resolved, **kwargs)
+
+        return StageResult(self, name, f"{name}-{digest.hexdigest()[:24]}", compute)
+
+    def resolve(self, result):
+        entry = os.path.join(self.cache_dir, result.key)
+        started = time.perf_counter()
+        if self.enabled and os.path.exists(os.path.join(entry, MANIFEST)):
+            value = self._load(entry)
+            self.hits += 1
+            print(f"Stage cache hit: {result.name} ({time.perf_counter() - started:.2f}s)")
+            return value
+
+        value = result._compute()
+        self.misses += 1
+        if self.enabled:
+            self._store(entry, value)
+        print(f"Stage cache miss: {result.name} ({time.perf_counter() - started:.2f}s)")
+        return value
+
+    def _load(self, entry):
+        with open(os.path.join(entry, MANIFEST)) as f:
+            manifest = json.load(f)
+        parts = [_read_part(kind, os.path.join(entry, str(i))) for i, kind in enumerate(manifest['parts'])]
+        os.utime(entry)  # mark as recently used
+        return tuple(parts) if manifest['tuple'] else parts[0]
+
+    def _store(self, entry, value):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_entry = f"{entry}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        os.makedirs(tmp_entry)
+
+        parts = value if isinstance(value, tuple) else (value,)
+        kinds = [_write_part(part, os.path.join(tmp_entry, str(i))) for i, part in enumerate(parts)]
+        with open(os.path.join(tmp_entry, MANIFEST), 'w') as f:
+            json.dump({'parts': kinds, 'tuple': isinstance(value, tuple)}, f)
+
+        if _dir_size(tmp_entry) > self.max_bytes:
+            shutil.rmtree(tmp_entry)
+            return
+        try:
+            os.replace(tmp_entry, entry)
+        except OSError:
+            shutil.rmtree(tmp_entry, ignore_errors=True)  # another run stored it first
+        self.evict(keep=entry)
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = [
+            (entry.stat().st_mtime, _dir_size(entry.path), entry.path)
+            for entry in os.scandir(self.cache_dir)
+            if entry.is_dir() and not entry.name.endswith('.tmp')
+        ]
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
@@ -0,0 +1,205 @@
+"""
+Streaming statistics over DataFrame batches.
+
+CorrelationAccumulator keeps pairwise counts, means, second moments and
+co-moments per column pair and merges batches with Chan's parallel update, so
+Pearson matrices match DataFrame.corr() (pairwise-complete observations)
+without holding the data or any filtered copy of it in memory.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class CorrelationAccumulator:
+    def __init__(self, columns):
+        self.columns = list(columns)
+        size = (len(self.columns), len(self.columns))
+        self.rows = 0
+        self.n = np.zeros(size)
+        # mean_a[a, b] / m2_a[a, b]: mean and M2 of column a over rows where a and b are both set
+        self.mean_a = np.zeros(size)
+        self.m2_a = np.zeros(size)
+        self.comoment = np.zeros(size)
+
+    def update(self, frame, mask=None):
+        """Add the rows of frame (optionally only those where mask is True)."""
+        values = frame[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        return self.update_values(values if mask is None else values[mask])
+
+    def update_values(self, values):
+        values = np.where(np.isfinite(values), values, np.nan)
+        self.rows += len(values)
+        valid = ~np.isnan(values)
+        if not valid.any():
+            return self
+
+        # Shift by the batch means so the sums below stay well conditioned
+        counts = valid.sum(axis=0)
+        shift = np.divide(np.nansum(values, axis=0), counts, out=np.zeros(len(counts)), where=counts > 0)
+        centered = np.where(valid, values - shift, 0.0)
+        mask = valid.astype(np.float64)
+
+        n = mask.T @ mask
+        sums = centered.T @ mask
+        squares = (centered ** 2).T @ mask
+        products = centered.T @ centered
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(n > 0, sums / n, 0.0)
+            m2 = np.where(n > 0, squares - sums * mean, 0.0)
+            comoment = np.where(n > 0, products - sums * mean.T, 0.0)
+        return self._combine(n, mean + shift[:, None], m2, comoment)
+
+    def merge(self, other):
+        self.rows += other.rows
+        return self._combine(other.n, other.mean_a, other.m2_a, other.comoment)
+
+    def _combine(self, n_b, mean_b, m2_b, comoment_b):
+        total = self.n + n_b
+        ratio = np.divide(n_b, total, out=np.zeros_like(total), where=total > 0)
+        weight = self.n * ratio
+        delta = mean_b - self.mean_a
+        self.mean_a = self.mean_a + delta * ratio
+        self.m2_a = self.m2_a + m2_b + delta ** 2 * weight
+        self.comoment = self.comoment + comoment_b + delta * delta.T * weight
+        self.n = total
+        return self
+
+    def moments(self):
+        """Count, mean and sample std (ddof=1) of each column over its non-missing rows."""
+        n, mean, m2 = self.n.diagonal(), self.mean_a.diagonal(), self.m2_a.diagonal()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.where(n > 1, np.sqrt(m2 / (n - 1)), np.nan)
+        return pd.DataFrame({'count': n, 'mean': mean, 'std': std}, index=self.columns)
+
+    def corr(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = self.comoment / np.sqrt(self.m2_a * self.m2_a.T)
+        result[self.n < 2] = np.nan
+        np.clip(result, -1.0, 1.0, out=result)
+        return pd.DataFrame(result, index=self.columns, columns=self.columns)
+
+
+def streaming_correlations(batches, columns, groups=None):
+    """
+    Accumulate Pearson correlations for all rows and for each named row group
+    in one pass over `batches`.
+
+    `groups` maps a name to a function returning a boolean row mask for a
+    batch. Returns {'all': accumulator, name: accumulator, ...}.
+    """
+    groups = groups or {}
+    accumulators = {name: CorrelationAccumulator(columns) for name in ['all', *groups]}
+    for batch in batches:
+        values = batch[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        accumulators['all'].update_values(values)
+        for name, select in groups.items():
+            accumulators[name].update_values(values[np.asarray(select(batch), dtype=bool)])
+    return accumulators
+
+
+# Reductions supported by summarize(); each is built from per-group bincounts
+GROUP_REDUCTIONS = ('size', 'count', 'sum', 'mean', 'std', 'min', 'max')
+
+
+def _factorize(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(dtype=np.int64), series.cat.categories
+    codes, uniques = pd.factorize(series, sort=True)
+    return codes.astype(np.int64), pd.Index(uniques, name=series.name)
+
+
+def _group_codes(df, keys, factorized):
+    """Combine the cached codes of one or more keys into one code per row (-1 for missing)."""
+    codes = np.zeros(len(df), dtype=np.int64)
+    missing = np.zeros(len(df), dtype=bool)
+    levels = []
+    for key in keys:
+        if key not in factorized:
+            factorized[key] = _factorize(df[key])
+        key_codes, uniques = factorized[key]
+        codes = codes * len(uniques) + key_codes
+        missing |= key_codes < 0
+        levels.append(uniques)
+    codes[missing] = -1
+    return codes, levels
+
+
+def _group_index(observed, levels, keys):
+    if len(levels) == 1:
+        return pd.Index(levels[0].take(observed), name=keys[0])
+    positions = np.unravel_index(observed, [len(level) for level in levels])
+    return pd.MultiIndex.from_arrays(
+        [level.take(position) for level, position in zip(levels, positions)], names=keys
+    )
+
+
+def _reduce(reduction, codes, n_groups, values):
+    valid = ~np.isnan(values)
+    in_group = codes[valid]
+    values = values[valid]
+    count = np.bincount(in_group, minlength=n_groups)
+    if reduction == 'count':
+        return count
+    total = np.bincount(in_group, weights=values, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if reduction == 'sum':
+            return total
+        mean = total / count
+        if reduction == 'mean':
+            return mean
+        if reduction == 'std':
+            squares = np.bincount(in_group, weights=(values - mean[in_group]) ** 2, minlength=n_groups)
+            return np.sqrt(squares / (count - 1))
+    extreme = np.full(n_groups, np.inf if reduction == 'min' else -np.inf)
+    (np.minimum if reduction == 'min' else np.maximum).at(extreme, in_group, values)
+    return np.where(count > 0, extreme, np.nan)
+
+
+def summarize(df, aggregations):
+    """
+    Compute many grouped summaries with one factorize pass per key.
+
+    `aggregations` maps a result name to a spec:
+        ('size', keys)                 rows per group (like value_counts)
+        (reduction, keys, columns)     one of GROUP_REDUCTIONS over columns
+        ('nulls',)                     missing values per column
+    keys and columns may be a single name or a list. Groups are sorted by key
+    (category order for categoricals) and only observed groups are returned.
+    Single columns give a Series, lists of columns a DataFrame.
+    """
+    factorized = {}
+    float_columns = {}
+    results = {}
+    for name, spec in aggregations.items():
+        reduction = spec[0]
+        if reduction == 'nulls':
+            results[name] = pd.Series(
+                {column: int(df[column].isna().sum()) for column in df.columns}, dtype=np.int64
+            )
+            continue
+        if reduction not in GROUP_REDUCTIONS:
+            raise ValueError(f"Unknown reduction '{reduction}' for summary '{name}'")
+
+        keys = [spec[1]] if isinstance(spec[1], str) else list(spec[1])
+        codes, levels = _group_codes(df, keys, factorized)
+        n_groups = int(np.prod([len(level) for level in levels]))
+        sizes = np.bincount(codes[codes >= 0], minlength=n_groups)
+        observed = np.flatnonzero(sizes)
+        index = _group_index(observed, levels, keys)
+
+        if reduction == 'size':
+            results[name] = pd.Series(sizes[observed], index=index, name='count')
+            continue
+
+        columns = [spec[2]] if isinstance(spec[2], str) else list(spec[2])
+        table = {}
+        for column in columns:
+            if column not in float_columns:
+                float_columns[column] = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            values = float_columns[column]
+            in_group = codes >= 0
+            table[column] = _reduce(reduction, codes[in_group], n_groups, values[in_group])[observed]
+        frame = pd.DataFrame(table, index=index)
+        results[name] = frame[spec[2]] if isinstance(spec[2], str) else frame
+    return results
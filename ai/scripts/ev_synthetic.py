@@ -0,0 +1,133 @@
+"""
+Synthetic EV registration data in the schema of the Washington State Electric
+Vehicle Population dataset.
+
+Rows are drawn from a small catalog of real make/model/type combinations with
+plausible ranges, MSRPs (mostly 0, as in the real data) and model years, and
+`Vehicle Location` WKT points scattered around Washington cities. Files are
+written in chunks, so multi-million row datasets never sit in memory at once.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# (make, model, vehicle type, electric range, base MSRP, first model year)
+CATALOG = [
+    ('TESLA', 'MODEL 3', 'BEV', 266, 0, 2017),
+    ('TESLA', 'MODEL Y', 'BEV', 291, 0, 2020),
+    ('TESLA', 'MODEL S', 'BEV', 337, 69900, 2012),
+    ('TESLA', 'MODEL X', 'BEV', 293, 110950, 2016),
+    ('NISSAN', 'LEAF', 'BEV', 150, 0, 2011),
+    ('CHEVROLET', 'BOLT EV', 'BEV', 259, 0, 2017),
+    ('CHEVROLET', 'VOLT', 'PHEV', 53, 0, 2011),
+    ('BMW', 'I3', 'BEV', 153, 44100, 2014),
+    ('BMW', 'X5', 'PHEV', 30, 59900, 2016),
+    ('KIA', 'NIRO', 'BEV', 239, 0, 2019),
+    ('KIA', 'NIRO', 'PHEV', 26, 0, 2018),
+    ('FORD', 'MUSTANG MACH-E', 'BEV', 230, 0, 2021),
+    ('FORD', 'FUSION', 'PHEV', 19, 0, 2013),
+    ('TOYOTA', 'PRIUS PRIME', 'PHEV', 25, 0, 2017),
+    ('TOYOTA', 'RAV4 PRIME', 'PHEV', 42, 0, 2021),
+    ('VOLKSWAGEN', 'ID.4', 'BEV', 0, 0, 2021),
+    ('HYUNDAI', 'IONIQ 5', 'BEV', 0, 0, 2022),
+    ('RIVIAN', 'R1T', 'BEV', 0, 0, 2022),
+    ('PORSCHE', 'TAYCAN', 'BEV', 203, 0, 2020),
+    ('JEEP', 'WRANGLER', 'PHEV', 21, 0, 2021),
+    ('CHRYSLER', 'PACIFICA', 'PHEV', 32, 39995, 2017),
+    ('FISKER', 'KARMA', 'PHEV', 33, 102000, 2012),
+    ('PORSCHE', '918', 'PHEV', 12, 845000, 2015),
+]
+# Relative registration counts for the catalog entries
+CATALOG_WEIGHTS = [30, 25, 6, 4, 12, 8, 5, 3, 2, 4, 2, 5, 2, 4, 4, 5, 4, 3, 1, 2, 2, 0.2, 0.05]
+
+VEHICLE_TYPES = {
+    'BEV': 'Battery Electric Vehicle (BEV)',
+    'PHEV': 'Plug-in Hybrid Electric Vehicle (PHEV)',
+}
+ELIGIBILITY = {
+    'BEV': 'Clean Alternative Fuel Vehicle Eligible',
+    'PHEV': 'Not eligible due to low battery range',
+}
+
+# (county, city, postal code, longitude, latitude, electric utility, census tract prefix)
+PLACES = [
+    ('King', 'Seattle', 98101, -122.3321, 47.6062, 'CITY OF SEATTLE - (WA)|CITY OF TACOMA - (WA)', 53033),
+    ('King', 'Bellevue', 98004, -122.2015, 47.6101, 'PUGET SOUND ENERGY INC||CITY OF TACOMA - (WA)', 53033),
+    ('King', 'Redmond', 98052, -122.1215, 47.6740, 'PUGET SOUND ENERGY INC||CITY OF TACOMA - (WA)', 53033),
+    ('Snohomish', 'Everett', 98201, -122.2021, 47.9790, 'PUGET SOUND ENERGY INC', 53061),
+    ('Pierce', 'Tacoma', 98402, -122.4443, 47.2529, 'BONNEVILLE POWER ADMINISTRATION||CITY OF TACOMA - (WA)', 53053),
+    ('Thurston', 'Olympia', 98501, -122.9007, 47.0379, 'PUGET SOUND ENERGY INC', 53067),
+    ('Clark', 'Vancouver', 98660, -122.6615, 45.6387, 'BONNEVILLE POWER ADMINISTRATION||PUD NO 1 OF CLARK COUNTY - (WA)', 53011),
+    ('Spokane', 'Spokane', 99201, -117.4260, 47.6588, 'MODERN ELECTRIC WATER COMPANY', 53063),
+    ('Kitsap', 'Bremerton', 98310, -122.6329, 47.5673, 'PUGET SOUND ENERGY INC', 53035),
+    ('Whatcom', 'Bellingham', 98225, -122.4787, 48.7519, 'PUGET SOUND ENERGY INC||PUD NO 1 OF WHATCOM COUNTY', 53073),
+]
+PLACE_WEIGHTS = [30, 12, 10, 9, 9, 5, 7, 6, 4, 4]
+
+FIRST_YEAR, LAST_YEAR = 2011, 2025
+MISSING_LOCATION_FRACTION = 0.0005
+DEFAULT_CHUNK_SIZE = 500_000
+
+
+def generate_ev_data(n_rows, random_state=0, first_row=0):
+    """Return n_rows synthetic registrations; first_row offsets the DOL Vehicle IDs."""
+    rng = np.random.default_rng(random_state)
+    catalog = pd.DataFrame(CATALOG, columns=['make', 'model', 'type', 'range', 'msrp', 'first_year'])
+    places = pd.DataFrame(PLACES, columns=['county', 'city', 'zip', 'lon', 'lat', 'utility', 'tract'])
+
+    vehicle = rng.choice(len(catalog), size=n_rows, p=np.divide(CATALOG_WEIGHTS, sum(CATALOG_WEIGHTS)))
+    place = rng.choice(len(places), size=n_rows, p=np.divide(PLACE_WEIGHTS, sum(PLACE_WEIGHTS)))
+    vehicles, homes = catalog.iloc[vehicle], places.iloc[place]
+
+    # Later model years are more common; no car predates its model
+    first_year = vehicles['first_year'].to_numpy()
+    span = LAST_YEAR - first_year + 1
+    model_year = first_year + np.floor(span * rng.random(n_rows) ** 0.6).astype(int)
+
+    # As in the real data, range is reported as 0 for most recent BEVs and MSRP is mostly 0
+    electric_range = vehicles['range'].to_numpy() + rng.integers(-10, 11, n_rows)
+    electric_range = np.where(vehicles['range'].to_numpy() == 0, 0, np.clip(electric_range, 6, None))
+    electric_range[(model_year >= 2021) & (rng.random(n_rows) < 0.6)] = 0
+    base_msrp = np.where(rng.random(n_rows) < 0.97, 0, vehicles['msrp'].to_numpy())
+
+    lon = homes['lon'].to_numpy() + rng.normal(0, 0.08, n_rows)
+    lat = homes['lat'].to_numpy() + rng.normal(0, 0.06, n_rows)
+    location = pd.Series('POINT (' + pd.Series(lon.round(5)).astype(str) + ' '
+                         + pd.Series(lat.round(5)).astype(str) + ')', dtype=object)
+    location[rng.random(n_rows) < MISSING_LOCATION_FRACTION] = np.nan
+
+    vehicle_type = vehicles['type'].to_numpy()
+    vin_prefix = np.array(['5YJ3E1EB', '1N4AZ0CP', 'KNDCC3LG', 'WBY1Z2C5', '1G1FY6S0', '7SAYGDEE', 'JTDKARFP'])
+    return pd.DataFrame({
+        'VIN (1-10)': vin_prefix[rng.integers(0, len(vin_prefix), n_rows)] + rng.integers(10, 99, n_rows).astype(str),
+        'County': homes['county'].to_numpy(),
+        'City': homes['city'].to_numpy(),
+        'State': 'WA',
+        'Postal Code': homes['zip'].to_numpy() + rng.integers(0, 20, n_rows),
+        'Model Year': model_year,
+        'Make': vehicles['make'].to_numpy(),
+        'Model': vehicles['model'].to_numpy(),
+        'Electric Vehicle Type': pd.Series(vehicle_type).map(VEHICLE_TYPES).to_numpy(),
+        'Clean Alternative Fuel Vehicle (CAFV) Eligibility': pd.Series(vehicle_type).map(ELIGIBILITY).to_numpy(),
+        'Electric Range': electric_range,
+        'Base MSRP': base_msrp,
+        'Legislative District': rng.integers(1, 50, n_rows),
+        'DOL Vehicle ID': np.arange(first_row, first_row + n_rows) + 100_000_000,
+        'Vehicle Location': location.to_numpy(),
+        'Electric Utility': homes['utility'].to_numpy(),
+        '2020 Census Tract': homes['tract'].to_numpy() * 1_000_000 + rng.integers(0, 999_999, n_rows),
+    })
+
+
+def write_ev_csv(path, n_rows, random_state=0, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Write n_rows synthetic registrations to path chunk by chunk (deterministic for a given random_state)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    for number, start in enumerate(range(0, n_rows, chunk_size)):
+        chunk = generate_ev_data(min(chunk_size, n_rows - start), random_state=[random_state, number],
+                                 first_row=start)
+        chunk.to_csv(tmp_path, mode='w' if number == 0 else 'a', header=number == 0, index=False)
+    os.replace(tmp_path, path)
+    return path
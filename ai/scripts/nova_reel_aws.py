@@ -0,0 +1,80 @@
+"""
+Shared AWS client settings and retry handling for the Nova Reel scripts.
+"""
+
+import random
+import threading
+import time
+from functools import lru_cache
+from urllib.parse import urlparse
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+THROTTLING_ERRORS = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceQuotaExceededException",
+    "ServiceUnavailableException",
+}
+# Connection pool large enough for the submit workers and the poller
+CLIENT_CONFIG = Config(
+    max_pool_connections=32, retries={"max_attempts": 3, "mode": "standard"}
+)
+
+
+_session_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _session():
+    return boto3.session.Session()
+
+
+@lru_cache(maxsize=None)
+def client(service_name, region_name="us-east-1"):
+    """
+    A pooled client per service and region, shared by every caller in the
+    process. botocore clients are thread-safe; creating them is not.
+    """
+    with _session_lock:
+        return _session().client(
+            service_name, region_name=region_name, config=CLIENT_CONFIG
+        )
+
+
+def parse_s3_uri(s3_uri):
+    parsed = urlparse(s3_uri)
+    if parsed.scheme != "s3" or not parsed.netloc or not parsed.path:
+        raise ValueError(f"Invalid S3 URI: {s3_uri}")
+    return parsed.netloc, parsed.path.lstrip("/")
+
+
+def is_throttling(error):
+    return (
+        isinstance(error, ClientError)
+        and error.response.get("Error", {}).get("Code") in THROTTLING_ERRORS
+    )
+
+
+def call_with_retries(
+    func,
+    *args,
+    max_attempts=8,
+    base_delay=1.0,
+    max_delay=60.0,
+    sleep=time.sleep,
+    **kwargs,
+):
+    """
+    Call func, retrying throttling and quota errors with full-jitter
+    exponential backoff. Other errors are raised immediately.
+    """
+    for attempt in range(max_attempts):
+        try:
+            return func(*args, **kwargs)
+        except ClientError as error:
+            if not is_throttling(error) or attempt == max_attempts - 1:
+                raise
+            sleep(random.uniform(0, min(max_delay, base_delay * 2**attempt)))
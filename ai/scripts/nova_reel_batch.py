@@ -0,0 +1,304 @@
+"""
+Batch Amazon Nova Reel text-to-video generation.
+
+Submits every job of a manifest concurrently from a bounded thread pool while
+keeping at most --max-in-flight jobs running at the service, retries
+throttled calls with jittered exponential backoff, and tracks all invocation
+ARNs together in one results file. Running jobs are checked by one shared,
+adaptive poller (see nova_reel_poller.py).
+
+    python nova_reel_batch.py manifest.jsonl --max-in-flight 10 --results batch.json
+    python nova_reel_batch.py manifest.jsonl --fake  # offline, against in-process fakes
+
+The manifest is JSON Lines or a CSV with a header. Each job has a "prompt"
+and optionally an "image" (S3 URI, default INPUT_S3_URI), an "output" (S3 URI
+prefix, default OUTPUT_S3_URI) and a "seed".
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from nova_reel_aws import call_with_retries, client, parse_s3_uri
+from nova_reel_download import download_outputs
+from nova_reel_image_cache import DEFAULT_CACHE_DIR, ImageCache
+from nova_reel_poller import EXPECTED_JOB_SECONDS, InvocationPoller
+from nova_reel_text_to_video import (
+    INPUT_S3_URI,
+    OUTPUT_S3_URI,
+    start_text_to_video_generation_job,
+)
+
+# Nova Reel's default quota for concurrent async invocations; raise it together
+# with the quota
+DEFAULT_MAX_IN_FLIGHT = 10
+DEFAULT_SUBMIT_WORKERS = 4
+
+
+def load_manifest(path):
+    """
+    Jobs from a JSON Lines or CSV manifest, with defaults filled in. Raises
+    ValueError for an entry without a prompt or with a malformed S3 URI, before
+    any job is submitted.
+    """
+    with open(path, newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    jobs = []
+    for index, row in enumerate(rows):
+        if not row.get("prompt"):
+            raise ValueError(f"Manifest entry {index} has no prompt")
+        job = {
+            "index": index,
+            "prompt": row["prompt"],
+            "image": row.get("image") or INPUT_S3_URI,
+            "output": row.get("output") or OUTPUT_S3_URI,
+            "seed": int(row["seed"]) if row.get("seed") not in (None, "") else None,
+            "status": "Pending",
+        }
+        for field in ("image", "output"):
+            try:
+                parse_s3_uri(job[field])
+            except ValueError as error:
+                raise ValueError(f"Manifest entry {index} {field}: {error}") from None
+        jobs.append(job)
+    return jobs
+
+
+def write_results(path, jobs):
+    """Atomically write the current state of every job."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(jobs, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _submit(bedrock_runtime, image_cache, job):
+    # The request token makes a retried submission idempotent
+    return call_with_retries(
+        start_text_to_video_generation_job,
+        bedrock_runtime,
+        image_cache.s3_client,
+        job["prompt"],
+        job["output"],
+        job["image"],
+        seed=job["seed"],
+        client_request_token=job["client_request_token"],
+        image_cache=image_cache,
+    )
+
+
+def _record_submission(future, job):
+    try:
+        job["invocation_arn"] = future.result()
+    except Exception as error:
+        # Any failure is recorded on its job; the rest of the batch keeps running
+        job["status"] = "SubmitFailed"
+        job["failure_message"] = str(error)
+        print(f"[{job['index']}] submission failed: {error}")
+        return False
+    job["status"] = "InProgress"
+    job["submitted_at"] = time.time()
+    print(f"[{job['index']}] started {job['invocation_arn']}")
+    return True
+
+
+def _record_completion(future, job):
+    try:
+        result = future.result()
+    except Exception as error:
+        job["status"] = "PollFailed"
+        job["failure_message"] = str(error)
+        print(f"[{job['index']}] status check failed: {error}")
+        return
+
+    response = result["response"]
+    job["status"] = result["status"]
+    job["completed_at"] = time.time()
+    job["latency_seconds"] = result["latency_seconds"]
+    if "service_seconds" in result:
+        job["service_seconds"] = result["service_seconds"]
+    if job["status"] == "Completed":
+        output_uri = response["outputDataConfig"]["s3OutputDataConfig"]["s3Uri"]
+        job["output_uri"] = f"{output_uri.rstrip('/')}/output.mp4"
+    else:
+        job["failure_message"] = response.get("failureMessage", "Unknown error")
+    print(
+        f"[{job['index']}] {job['status']} after {job['latency_seconds']:.0f}s: "
+        f"{job.get('output_uri') or job.get('failure_message')}"
+    )
+
+
+def run_batch(
+    bedrock_runtime,
+    s3_client,
+    jobs,
+    max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+    submit_workers=DEFAULT_SUBMIT_WORKERS,
+    poller=None,
+    image_cache=None,
+    on_update=None,
+):
+    """
+    Submit jobs concurrently, keeping at most max_in_flight of them submitted
+    or running, until all have finished. Running jobs are watched by poller
+    (a new InvocationPoller by default) and input images are fetched through
+    image_cache (a new ImageCache by default). Jobs are updated in place and
+    on_update(jobs) is called after every change. Returns jobs.
+    """
+    image_cache = image_cache or ImageCache(s3_client)
+    pending = [job for job in jobs if job["status"] == "Pending"][::-1]
+    # Submission and completion futures of every job in flight
+    in_flight = {}
+    own_poller = poller is None
+    poller = (poller or InvocationPoller(bedrock_runtime)).start()
+
+    try:
+        with ThreadPoolExecutor(max_workers=submit_workers) as executor:
+            while pending or in_flight:
+                while pending and len(in_flight) < max_in_flight:
+                    job = pending.pop()
+                    job["status"] = "Submitting"
+                    job["client_request_token"] = str(uuid.uuid4())
+                    future = executor.submit(_submit, bedrock_runtime, image_cache, job)
+                    in_flight[future] = job
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = in_flight.pop(future)
+                    if job["status"] != "Submitting":
+                        _record_completion(future, job)
+                    elif _record_submission(future, job):
+                        in_flight[poller.watch(job["invocation_arn"])] = job
+                if on_update:
+                    on_update(jobs)
+    finally:
+        if own_poller:
+            poller.close()
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a batch of Nova Reel videos from a manifest."
+    )
+    parser.add_argument(
+        "manifest", help="JSON Lines or CSV with prompt[, image, output, seed]"
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=DEFAULT_MAX_IN_FLIGHT,
+        help="jobs submitted or running at once (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--submit-workers",
+        type=int,
+        default=DEFAULT_SUBMIT_WORKERS,
+        help="threads submitting jobs (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--expected-seconds",
+        type=float,
+        default=EXPECTED_JOB_SECONDS,
+        help="initial guess of a job's duration, used to schedule status checks "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--results",
+        default="nova_reel_batch.json",
+        help="job state file (default: %(default)s)",
+    )
+    parser.add_argument("--region", default="us-east-1")
+    parser.add_argument(
+        "--fake",
+        action="store_true",
+        help="run offline against in-process fake Bedrock and S3 clients",
+    )
+    parser.add_argument(
+        "--fake-duration",
+        type=float,
+        default=5.0,
+        help="seconds a fake job takes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--image-cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help="on-disk cache of encoded input images (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--download",
+        metavar="DIR",
+        help="download the completed videos into DIR after the batch",
+    )
+    args = parser.parse_args()
+
+    try:
+        jobs = load_manifest(args.manifest)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.fake:
+        from nova_reel_fake import FakeBedrockRuntime, FakeS3
+
+        bedrock_runtime = FakeBedrockRuntime(
+            duration=args.fake_duration, quota=args.max_in_flight, throttle_rate=0.1
+        )
+        s3_client = FakeS3()
+    else:
+        bedrock_runtime = client("bedrock-runtime", region_name=args.region)
+        s3_client = client("s3", region_name=args.region)
+    image_cache = ImageCache(s3_client, cache_dir=args.image_cache_dir)
+
+    started = time.time()
+    print(f"Submitting {len(jobs)} jobs, at most {args.max_in_flight} in flight...")
+    poll_bounds = {}
+    if args.fake:
+        # Scale the check intervals down to the fake jobs' duration
+        poll_bounds = {
+            "min_interval": args.fake_duration / 20,
+            "max_interval": args.fake_duration,
+        }
+    with InvocationPoller(
+        bedrock_runtime, expected_seconds=args.expected_seconds, **poll_bounds
+    ) as poller:
+        run_batch(
+            bedrock_runtime,
+            s3_client,
+            jobs,
+            max_in_flight=args.max_in_flight,
+            submit_workers=args.submit_workers,
+            poller=poller,
+            image_cache=image_cache,
+            on_update=lambda jobs: write_results(args.results, jobs),
+        )
+    write_results(args.results, jobs)
+
+    completed = sum(job["status"] == "Completed" for job in jobs)
+    print(
+        f"\n{completed}/{len(jobs)} videos completed in {time.time() - started:.0f}s; "
+        f"job states written to {args.results}"
+    )
+    print(f"Status checks: {json.dumps(poller.stats())}")
+    print(f"Input images: {json.dumps(image_cache.report())}")
+
+    if args.download:
+        outputs = [job["output_uri"] for job in jobs if job["status"] == "Completed"]
+        results = download_outputs(s3_client, outputs, args.download)
+        statuses = [result["status"] for result in results]
+        print(
+            f"Downloads into {args.download}: "
+            + ", ".join(
+                f"{statuses.count(status)} {status}" for status in sorted(set(statuses))
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
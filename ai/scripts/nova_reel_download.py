@@ -0,0 +1,252 @@
+"""
+Parallel download of generated Nova Reel videos from S3.
+
+Every output is split into byte ranges that are fetched concurrently through
+one pooled client and streamed straight into place in a preallocated file, so
+no file is ever buffered in memory. Ranged GETs carry IfMatch with the ETag
+seen by HEAD, so an object replaced mid-download fails instead of producing
+a mixed file. Outputs already on disk with a matching size and ETag are
+skipped.
+
+    python nova_reel_download.py --results nova_reel_batch.json --dest videos/
+    python nova_reel_download.py --dest videos/ s3://bucket/videos/abc123/output.mp4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from nova_reel_aws import call_with_retries, client, parse_s3_uri
+
+DEFAULT_PART_SIZE = 8 * 2**20
+DEFAULT_WORKERS = 16
+STREAM_CHUNK_SIZE = 2**20
+ETAG_SUFFIX = ".etag"
+
+
+def local_path(dest_dir, s3_uri):
+    """<dest_dir>/<parent>-<name>, so the output.mp4 of every job gets its own file."""
+    _, key = parse_s3_uri(s3_uri)
+    parts = key.rstrip("/").split("/")
+    name = f"{parts[-2]}-{parts[-1]}" if len(parts) > 1 else parts[-1]
+    return os.path.join(dest_dir, name)
+
+
+def _md5(path):
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_current(path, size, etag):
+    """True if path already holds the object with this size and ETag."""
+    if not os.path.exists(path) or os.path.getsize(path) != size:
+        return False
+    try:
+        with open(path + ETAG_SUFFIX) as f:
+            return f.read().strip() == etag
+    except FileNotFoundError:
+        pass
+    # Single-part uploads have the MD5 of the content as their ETag
+    plain = etag.strip('"')
+    return "-" not in plain and _md5(path) == plain
+
+
+def _download_range(s3_client, bucket, key, etag, path, start, end):
+    response = call_with_retries(
+        s3_client.get_object,
+        Bucket=bucket,
+        Key=key,
+        Range=f"bytes={start}-{end}",
+        IfMatch=etag,
+    )
+    with open(path, "r+b") as f:
+        f.seek(start)
+        for chunk in response["Body"].iter_chunks(STREAM_CHUNK_SIZE):
+            f.write(chunk)
+    return end - start + 1
+
+
+class _Download:
+    """One output file: its parts finish in any order; the last one publishes the file."""
+
+    def __init__(self, s3_uri, path, size, etag, n_parts):
+        self.s3_uri = s3_uri
+        self.path = path
+        self.tmp_path = f"{path}.{os.getpid()}.part"
+        self.size = size
+        self.etag = etag
+        self.remaining = n_parts
+        self.error = None
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def result(self, status, **extra):
+        return {
+            "uri": self.s3_uri,
+            "path": self.path,
+            "status": status,
+            "bytes": self.size,
+            "seconds": round(time.perf_counter() - self.started, 3),
+            **extra,
+        }
+
+
+def download_outputs(
+    s3_client,
+    s3_uris,
+    dest_dir,
+    part_size=DEFAULT_PART_SIZE,
+    max_workers=DEFAULT_WORKERS,
+):
+    """
+    Download s3_uris into dest_dir with up to max_workers concurrent ranged
+    GETs. Returns one {"uri", "path", "status", "bytes", "seconds"} dict per
+    URI, where status is "downloaded", "skipped" or "failed" (with "error").
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    uris = list(dict.fromkeys(s3_uris))
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        heads = {}
+        for uri in uris:
+            bucket, key = parse_s3_uri(uri)
+            future = executor.submit(
+                call_with_retries, s3_client.head_object, Bucket=bucket, Key=key
+            )
+            heads[future] = (uri, bucket, key)
+
+        parts = {}
+        for future in as_completed(heads):
+            uri, bucket, key = heads[future]
+            path = local_path(dest_dir, uri)
+            try:
+                head = future.result()
+            except (BotoCoreError, ClientError) as error:
+                results.append(
+                    {"uri": uri, "path": path, "status": "failed", "error": str(error)}
+                )
+                continue
+
+            size, etag = head["ContentLength"], head["ETag"]
+            if is_current(path, size, etag):
+                results.append(
+                    {"uri": uri, "path": path, "status": "skipped", "bytes": size}
+                )
+                continue
+
+            ranges = [
+                (start, min(start + part_size, size) - 1)
+                for start in range(0, size, part_size)
+            ]
+            download = _Download(uri, path, size, etag, len(ranges))
+            # Preallocate, so every part can be written in place as it arrives
+            with open(download.tmp_path, "wb") as f:
+                f.truncate(size)
+            if not ranges:
+                results.append(_publish(download))
+            for start, end in ranges:
+                future = executor.submit(
+                    _download_range,
+                    s3_client,
+                    bucket,
+                    key,
+                    etag,
+                    download.tmp_path,
+                    start,
+                    end,
+                )
+                parts[future] = download
+
+        for future in as_completed(parts):
+            download = parts[future]
+            with download.lock:
+                try:
+                    future.result()
+                except (BotoCoreError, ClientError, OSError) as error:
+                    download.error = download.error or error
+                download.remaining -= 1
+                if download.remaining == 0:
+                    results.append(_publish(download))
+    order = {uri: index for index, uri in enumerate(uris)}
+    return sorted(results, key=lambda result: order[result["uri"]])
+
+
+def _publish(download):
+    if download.error is not None:
+        os.remove(download.tmp_path)
+        return download.result("failed", error=str(download.error))
+    os.replace(download.tmp_path, download.path)
+    with open(download.path + ETAG_SUFFIX, "w") as f:
+        f.write(download.etag)
+    return download.result("downloaded")
+
+
+def completed_outputs(results_path):
+    """Output URIs of the completed jobs in a nova_reel_batch.py results file."""
+    with open(results_path) as f:
+        jobs = json.load(f)
+    return [job["output_uri"] for job in jobs if job.get("status") == "Completed"]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Download generated Nova Reel videos from S3 in parallel."
+    )
+    parser.add_argument("uris", nargs="*", help="S3 URIs of the videos")
+    parser.add_argument(
+        "--results",
+        help="nova_reel_batch.py results file; downloads its completed jobs",
+    )
+    parser.add_argument("--dest", required=True, help="directory to download into")
+    parser.add_argument(
+        "--part-size-mb",
+        type=float,
+        default=DEFAULT_PART_SIZE / 2**20,
+        help="size of each ranged GET (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="concurrent GETs (default: %(default)s)",
+    )
+    parser.add_argument("--region", default="us-east-1")
+    args = parser.parse_args()
+
+    uris = list(args.uris)
+    if args.results:
+        uris += completed_outputs(args.results)
+    if not uris:
+        parser.error("give S3 URIs or --results")
+
+    started = time.perf_counter()
+    results = download_outputs(
+        client("s3", region_name=args.region),
+        uris,
+        args.dest,
+        part_size=int(args.part_size_mb * 2**20),
+        max_workers=args.workers,
+    )
+    elapsed = time.perf_counter() - started
+    for result in results:
+        print(f"{result['status']:>10}  {result['path']}  {result.get('error', '')}")
+    downloaded = sum(
+        result.get("bytes", 0) for result in results if result["status"] == "downloaded"
+    )
+    print(
+        f"{len(results)} outputs, {downloaded / 2**20:.1f} MB downloaded in {elapsed:.1f}s "
+        f"({downloaded / 2**20 / max(elapsed, 1e-9):.1f} MB/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
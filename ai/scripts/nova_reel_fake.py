@@ -0,0 +1,121 @@
+"""
+In-process stand-ins for the bedrock-runtime and S3 clients used by the Nova
+Reel scripts, for running batches offline (nova_reel_batch.py --fake).
+
+Jobs finish after a randomized duration. Starting more jobs than the
+concurrency quota raises ServiceQuotaExceededException, and a fraction of
+calls can be throttled, so the retry and in-flight handling of the real
+scripts is exercised.
+"""
+
+import io
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from botocore.exceptions import ClientError
+
+
+def _client_error(code, operation):
+    return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+
+class FakeBedrockRuntime:
+    def __init__(self, duration=2.0, jitter=0.5, quota=10, throttle_rate=0.0, seed=0):
+        self.duration = duration
+        self.jitter = jitter
+        self.quota = quota
+        self.throttle_rate = throttle_rate
+        self.calls = {"start_async_invoke": 0, "get_async_invoke": 0}
+        self.max_running = 0
+        self._jobs = {}
+        self._tokens = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _running(self, now):
+        return sum(now < job["end"] for job in self._jobs.values())
+
+    def start_async_invoke(
+        self, modelId, modelInput, outputDataConfig, clientRequestToken=None
+    ):
+        with self._lock:
+            self.calls["start_async_invoke"] += 1
+            if clientRequestToken in self._tokens:
+                return {"invocationArn": self._tokens[clientRequestToken]}
+            if self._random.random() < self.throttle_rate:
+                raise _client_error("ThrottlingException", "StartAsyncInvoke")
+            now = time.monotonic()
+            if self._running(now) >= self.quota:
+                raise _client_error("ServiceQuotaExceededException", "StartAsyncInvoke")
+
+            job_id = f"{len(self._jobs):012x}"
+            arn = f"arn:aws:bedrock:us-east-1:000000000000:async-invoke/{job_id}"
+            duration = self.duration * self._random.uniform(
+                1 - self.jitter, 1 + self.jitter
+            )
+            output_uri = outputDataConfig["s3OutputDataConfig"]["s3Uri"]
+            self._jobs[arn] = {
+                "end": now + duration,
+                "submit_time": datetime.now(timezone.utc),
+                "duration": duration,
+                "output_uri": f"{output_uri.rstrip('/')}/{job_id}",
+            }
+            if clientRequestToken:
+                self._tokens[clientRequestToken] = arn
+            self.max_running = max(self.max_running, self._running(now))
+            return {"invocationArn": arn}
+
+    def get_async_invoke(self, invocationArn):
+        with self._lock:
+            self.calls["get_async_invoke"] += 1
+            job = self._jobs.get(invocationArn)
+            if job is None:
+                raise _client_error("ValidationException", "GetAsyncInvoke")
+            response = {
+                "invocationArn": invocationArn,
+                "modelArn": "arn:aws:bedrock:us-east-1::foundation-model/amazon.nova-reel-v1:1",
+                "status": "InProgress",
+                "submitTime": job["submit_time"],
+                "outputDataConfig": {
+                    "s3OutputDataConfig": {"s3Uri": job["output_uri"]}
+                },
+            }
+            if time.monotonic() >= job["end"]:
+                response["status"] = "Completed"
+                response["endTime"] = job["submit_time"] + timedelta(
+                    seconds=job["duration"]
+                )
+            return response
+
+
+class _Body(io.BytesIO):
+    def iter_chunks(self, chunk_size=1024):
+        return iter(lambda: self.read(chunk_size), b"")
+
+
+class FakeS3:
+    """Serves every object with the same payload, a small JPEG-like one by default."""
+
+    def __init__(self, body=b"\xff\xd8\xff\xe0" + bytes(4096)):
+        self.body = body
+        self.calls = {"head_object": 0, "get_object": 0}
+
+    def head_object(self, Bucket, Key):
+        self.calls["head_object"] += 1
+        return {"ContentLength": len(self.body), "ETag": '"fake-etag"'}
+
+    def get_object(self, Bucket, Key, Range=None, IfMatch=None):
+        self.calls["get_object"] += 1
+        if IfMatch not in (None, '"fake-etag"'):
+            raise _client_error("PreconditionFailed", "GetObject")
+        body = self.body
+        if Range is not None:
+            start, end = Range.removeprefix("bytes=").split("-")
+            body = body[int(start) : int(end) + 1]
+        return {
+            "Body": _Body(body),
+            "ContentLength": len(body),
+            "ETag": '"fake-etag"',
+        }
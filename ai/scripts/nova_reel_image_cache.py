@@ -0,0 +1,141 @@
+"""
+ETag-keyed cache of base64-encoded input images for Nova Reel requests.
+
+Each S3 image is downloaded and encoded once. The encoded payload is kept in
+an in-memory LRU and on disk under its ETag, so repeated submissions against
+the same image cost no S3 GETs and no re-encoding, also across runs. A cached
+image is revalidated with a HEAD request after revalidate_seconds, so a
+replaced object is picked up.
+"""
+
+import base64
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from nova_reel_aws import parse_s3_uri
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "NOVA_REEL_CACHE_DIR", os.path.expanduser("~/.cache/nova_reel/images")
+)
+DEFAULT_MAX_MEMORY_BYTES = 256 * 2**20
+DEFAULT_REVALIDATE_SECONDS = 300.0
+
+
+class ImageCache:
+    def __init__(
+        self,
+        s3_client,
+        cache_dir=DEFAULT_CACHE_DIR,
+        max_memory_bytes=DEFAULT_MAX_MEMORY_BYTES,
+        revalidate_seconds=DEFAULT_REVALIDATE_SECONDS,
+    ):
+        self.s3_client = s3_client
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.revalidate_seconds = revalidate_seconds
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "head_requests": 0}
+        # (S3 URI, ETag) -> encoded payload, least recently used first
+        self._payloads = OrderedDict()
+        self._memory_bytes = 0
+        # S3 URI -> (ETag, time it was last confirmed)
+        self._etags = {}
+        self._lock = threading.Lock()
+        self._uri_locks = {}
+
+    def payload(self, s3_uri):
+        """Base64 payload (str) of the image at s3_uri."""
+        with self._lock:
+            uri_lock = self._uri_locks.setdefault(s3_uri, threading.Lock())
+        # One thread fetches a given image; the others wait and then hit the cache
+        with uri_lock:
+            etag = self._current_etag(s3_uri)
+            if etag is not None:
+                with self._lock:
+                    payload = self._payloads.get((s3_uri, etag))
+                    if payload is not None:
+                        self._payloads.move_to_end((s3_uri, etag))
+                        self.stats["memory_hits"] += 1
+                        return payload
+                payload = self._read_disk(s3_uri, etag)
+                if payload is not None:
+                    self._count("disk_hits")
+                    self._remember(s3_uri, etag, payload)
+                    return payload
+
+            self._count("misses")
+            bucket, key = parse_s3_uri(s3_uri)
+            response = self.s3_client.get_object(Bucket=bucket, Key=key)
+            payload = base64.b64encode(response["Body"].read()).decode("ascii")
+            etag = response["ETag"]
+            self._write_disk(s3_uri, etag, payload)
+            self._remember(s3_uri, etag, payload)
+            return payload
+
+    def _current_etag(self, s3_uri):
+        """The ETag of s3_uri, confirmed by HEAD at most every revalidate_seconds."""
+        known = self._etags.get(s3_uri)
+        if known and time.monotonic() - known[1] < self.revalidate_seconds:
+            return known[0]
+        if known is None and not os.path.isdir(self.cache_dir):
+            return None
+
+        bucket, key = parse_s3_uri(s3_uri)
+        self._count("head_requests")
+        etag = self.s3_client.head_object(Bucket=bucket, Key=key)["ETag"]
+        self._etags[s3_uri] = (etag, time.monotonic())
+        return etag
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _remember(self, s3_uri, etag, payload):
+        with self._lock:
+            self._etags[s3_uri] = (etag, time.monotonic())
+            if (s3_uri, etag) not in self._payloads:
+                self._payloads[(s3_uri, etag)] = payload
+                self._memory_bytes += len(payload)
+            self._payloads.move_to_end((s3_uri, etag))
+            while (
+                self._memory_bytes > self.max_memory_bytes and len(self._payloads) > 1
+            ):
+                _, evicted = self._payloads.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _disk_path(self, s3_uri, etag):
+        digest = hashlib.sha256(f"{s3_uri}\0{etag}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.b64")
+
+    def _read_disk(self, s3_uri, etag):
+        try:
+            with open(self._disk_path(s3_uri, etag)) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, s3_uri, etag, payload):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._disk_path(s3_uri, etag)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def hit_rate(self):
+        lookups = (
+            self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        )
+        if not lookups:
+            return None
+        return (self.stats["memory_hits"] + self.stats["disk_hits"]) / lookups
+
+    def report(self):
+        hit_rate = self.hit_rate()
+        return {
+            **self.stats,
+            "hit_rate": None if hit_rate is None else round(hit_rate, 3),
+            "memory_mb": round(self._memory_bytes / 2**20, 1),
+        }
@@ -0,0 +1,189 @@
+"""
+Shared, adaptive status polling for async Bedrock invocations.
+
+One background thread checks every outstanding invocation ARN. Each job is
+checked rarely while it is far from its expected duration, more often as that
+time approaches, and with exponential backoff once it runs over. The expected
+duration adapts to the latencies of completed jobs. watch() returns a Future
+that resolves as soon as the job has finished.
+
+    with InvocationPoller(bedrock_runtime) as poller:
+        result = poller.watch(invocation_arn).result()
+"""
+
+import statistics
+import threading
+import time
+from concurrent.futures import Future
+
+from nova_reel_aws import call_with_retries
+
+# A 6 second 720p Nova Reel clip typically takes about 90 seconds
+EXPECTED_JOB_SECONDS = 90.0
+MIN_POLL_SECONDS = 5.0
+MAX_POLL_SECONDS = 60.0
+# Weight of each completed job's latency in the expected duration
+EXPECTED_SECONDS_SMOOTHING = 0.3
+FINAL_STATUSES = ("Completed", "Failed")
+
+
+class InvocationPoller:
+    def __init__(
+        self,
+        bedrock_runtime,
+        expected_seconds=EXPECTED_JOB_SECONDS,
+        min_interval=MIN_POLL_SECONDS,
+        max_interval=MAX_POLL_SECONDS,
+    ):
+        self.bedrock_runtime = bedrock_runtime
+        self.expected_seconds = expected_seconds
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.polls = 0
+        self.latencies = {}
+        self._watches = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="invocation-poller", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Stop polling; futures of unfinished jobs are cancelled."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+        for watch in self._watches.values():
+            watch["future"].cancel()
+        self._watches.clear()
+
+    def watch(self, invocation_arn, submitted_at=None):
+        """
+        Track invocation_arn until it has finished. Returns a Future resolving
+        to {"invocationArn", "status", "response", "latency_seconds", "polls"}
+        plus "service_seconds" when the response has submit and end times.
+        submitted_at is a time.monotonic() value (default: now).
+        """
+        submitted_at = time.monotonic() if submitted_at is None else submitted_at
+        future = Future()
+        with self._condition:
+            self._watches[invocation_arn] = {
+                "future": future,
+                "submitted_at": submitted_at,
+                "polls": 0,
+                "overdue_polls": 0,
+                "due": submitted_at + self._interval(0.0, 0),
+            }
+            self._condition.notify()
+        return future
+
+    def _interval(self, elapsed, overdue_polls):
+        """Seconds until the next check of a job that has been running for elapsed seconds."""
+        remaining = self.expected_seconds - elapsed
+        if remaining > 0:
+            # Halve the gap to the expected completion time
+            interval = remaining / 2
+        else:
+            interval = self.min_interval * 2**overdue_polls
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed:
+                    now = time.monotonic()
+                    due = [
+                        arn
+                        for arn, watch in self._watches.items()
+                        if watch["due"] <= now
+                    ]
+                    if due:
+                        break
+                    next_due = min(
+                        (watch["due"] for watch in self._watches.values()), default=None
+                    )
+                    self._condition.wait(None if next_due is None else next_due - now)
+                if self._closed:
+                    return
+                watches = {arn: self._watches[arn] for arn in due}
+
+            # Check every due job in one pass, outside the lock so watch() never blocks
+            for arn, watch in watches.items():
+                self._check(arn, watch)
+
+    def _check(self, arn, watch):
+        # Any error fails this job's future; the thread keeps polling the rest
+        try:
+            self._poll(arn, watch)
+        except Exception as error:
+            with self._condition:
+                self._watches.pop(arn, None)
+            if not watch["future"].done():
+                watch["future"].set_exception(error)
+
+    def _poll(self, arn, watch):
+        response = call_with_retries(
+            self.bedrock_runtime.get_async_invoke, invocationArn=arn
+        )
+        self.polls += 1
+        watch["polls"] += 1
+        now = time.monotonic()
+        elapsed = now - watch["submitted_at"]
+        if response["status"] not in FINAL_STATUSES:
+            with self._condition:
+                watch["due"] = now + self._interval(elapsed, watch["overdue_polls"])
+                if elapsed >= self.expected_seconds:
+                    watch["overdue_polls"] += 1
+            return
+
+        with self._condition:
+            self._watches.pop(arn, None)
+            self.latencies[arn] = elapsed
+            if response["status"] == "Completed":
+                self.expected_seconds += EXPECTED_SECONDS_SMOOTHING * (
+                    elapsed - self.expected_seconds
+                )
+        result = {
+            "invocationArn": arn,
+            "status": response["status"],
+            "response": response,
+            "latency_seconds": round(elapsed, 3),
+            "polls": watch["polls"],
+        }
+        if response.get("submitTime") and response.get("endTime"):
+            # Time the service spent on the job, without the polling delay
+            service_time = response["endTime"] - response["submitTime"]
+            result["service_seconds"] = round(service_time.total_seconds(), 3)
+        watch["future"].set_result(result)
+
+    def stats(self):
+        """API calls made and submit-to-complete latency of the finished jobs."""
+        latencies = list(self.latencies.values())
+        return {
+            "polls": self.polls,
+            "finished": len(latencies),
+            "expected_seconds": round(self.expected_seconds, 1),
+            "latency_seconds": (
+                {
+                    "min": round(min(latencies), 3),
+                    "median": round(statistics.median(latencies), 3),
+                    "max": round(max(latencies), 3),
+                }
+                if latencies
+                else None
+            ),
+        }
@@ -5,10 +5,9 @@ Example: Amazon Nova Reel text-to-video generation (async) using boto3.
 import base64
 import os
 import random
-import time
-from urllib.parse import urlparse
 
-import boto3
+from nova_reel_aws import client, parse_s3_uri
+from nova_reel_poller import InvocationPoller
 
 # Replace with your own S3 bucket to store the generated video
 # Format: s3://your-bucket-name/videos/
@@ -24,13 +23,6 @@ INPUT_S3_URI = os.environ.get(
 )
 
 
-def parse_s3_uri(s3_uri):
-    parsed = urlparse(s3_uri)
-    if parsed.scheme != "s3" or not parsed.netloc or not parsed.path:
-        raise ValueError(f"Invalid S3 URI: {s3_uri}")
-    return parsed.netloc, parsed.path.lstrip("/")
-
-
 def load_image_bytes(s3_client, s3_uri):
     bucket, key = parse_s3_uri(s3_uri)
     response = s3_client.get_object(Bucket=bucket, Key=key)
@@ -38,17 +30,33 @@ def load_image_bytes(s3_client, s3_uri):
 
 
 def start_text_to_video_generation_job(
-    bedrock_runtime, s3_client, prompt, output_s3_uri, input_s3_uri
+    bedrock_runtime,
+    s3_client,
+    prompt,
+    output_s3_uri,
+    input_s3_uri,
+    seed=None,
+    client_request_token=None,
+    image_cache=None,
 ):
     """
     Starts an asynchronous text-to-video generation job using Amazon Nova Reel.
+
+    A random seed is used unless one is given. Retrying with the same
+    client_request_token does not start a second job. With an image_cache
+    (see nova_reel_image_cache.py) the input image is downloaded and encoded
+    only once.
     """
     model_id = "amazon.nova-reel-v1:1"
-    seed = random.randint(0, 2147483646)
+    if seed is None:
+        seed = random.randint(0, 2147483646)
 
-    image_bytes = load_image_bytes(s3_client, input_s3_uri)
-    image_b64 = base64.b64encode(image_bytes).decode("utf-8")
-    image_format = "jpeg" if input_s3_uri.lower().endswith(".jpg") else "png"
+    if image_cache is not None:
+        image_b64 = image_cache.payload(input_s3_uri)
+    else:
+        image_bytes = load_image_bytes(s3_client, input_s3_uri)
+        image_b64 = base64.b64encode(image_bytes).decode("utf-8")
+    image_format = "jpeg" if input_s3_uri.lower().endswith((".jpg", ".jpeg")) else "png"
 
     model_input = {
         "taskType": "TEXT_VIDEO",
@@ -71,9 +79,14 @@ def start_text_to_video_generation_job(
 
     output_config = {"s3OutputDataConfig": {"s3Uri": output_s3_uri}}
 
-    response = bedrock_runtime.start_async_invoke(
-        modelId=model_id, modelInput=model_input, outputDataConfig=output_config
-    )
+    request = {
+        "modelId": model_id,
+        "modelInput": model_input,
+        "outputDataConfig": output_config,
+    }
+    if client_request_token:
+        request["clientRequestToken"] = client_request_token
+    response = bedrock_runtime.start_async_invoke(**request)
 
     return response["invocationArn"]
 
@@ -85,8 +98,8 @@ def query_job_status(bedrock_runtime, invocation_arn):
 
 def main():
     """Generate a video from a text prompt using Amazon Nova Reel."""
-    bedrock_runtime = boto3.client("bedrock-runtime", region_name="us-east-1")
-    s3_client = boto3.client("s3", region_name="us-east-1")
+    bedrock_runtime = client("bedrock-runtime", region_name="us-east-1")
+    s3_client = client("s3", region_name="us-east-1")
     prompt = "Breeze of wind and sea waves. The character walking slowly toward the camera."
 
     if "REPLACE-WITH-YOUR-S3-BUCKET" in OUTPUT_S3_URI:
@@ -106,21 +119,21 @@ def main():
     )
     print(f"Job started with invocation ARN: {invocation_arn}")
 
-    while True:
-        print("\nPolling job status...")
-        job = query_job_status(bedrock_runtime, invocation_arn)
-        status = job["status"]
-
-        if status == "Completed":
-            bucket_uri = job["outputDataConfig"]["s3OutputDataConfig"]["s3Uri"]
-            print(f"\nSuccess! The video is available at: {bucket_uri}/output.mp4")
-            break
-        if status == "Failed":
-            print(f"\nVideo generation failed: {job.get('failureMessage', 'Unknown error')}")
-            break
-
-        print("In progress. Waiting 15 seconds...")
-        time.sleep(15)
+    # Checks are spaced out while the job is far from done and tighten as it
+    # nears the expected duration
+    print("Waiting for the job to finish...")
+    with InvocationPoller(bedrock_runtime) as poller:
+        result = poller.watch(invocation_arn).result()
+    job = result["response"]
+
+    if result["status"] == "Completed":
+        bucket_uri = job["outputDataConfig"]["s3OutputDataConfig"]["s3Uri"]
+        print(
+            f"\nSuccess after {result['latency_seconds']:.0f}s! "
+            f"The video is available at: {bucket_uri}/output.mp4"
+        )
+    else:
+        print(f"\nVideo generation failed: {job.get('failureMessage', 'Unknown error')}")
 
 
 if __name__ == "__main__":
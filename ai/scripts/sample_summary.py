@@ -3,6 +3,8 @@ import os
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+from ev_stats import summarize
+
 # Load the CSV file
 csv_path = os.path.join(os.path.dirname(__file__), '../data/sample.csv')
 df = pd.read_csv(csv_path)
@@ -20,8 +22,12 @@ print(df.describe(include='all'), "\n")
 print("=== DEPARTMENT COUNTS ===")
 print(df['department'].value_counts())
 
-df.groupby('department')['salary'].mean()
-df.groupby('department').agg({'salary': ['mean', 'max', 'count']})
+salary_by_department = pd.concat(summarize(df, {
+    'mean': ('mean', 'department', 'salary'),
+    'max': ('max', 'department', 'salary'),
+    'count': ('count', 'department', 'salary'),
+}), axis=1)
+print(salary_by_department)
 
 df[df['salary'] > 80000]
 df[df['department'] == 'Engineering']
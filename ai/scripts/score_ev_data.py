@@ -0,0 +1,48 @@
+"""
+Label a new EV registration CSV with a saved clustering model.
+
+    python score_ev_data.py --model ../data/models --input new_registrations.csv --output labeled.csv
+
+--model is an artifact directory written by cluster_ev_data_refactored.py
+--save-model, or the artifact root (its LATEST version is used). Rows without
+a list price are excluded from training, so they are left unlabeled here.
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from ev_artifacts import cluster_label_column, load_cluster_model, score_frame
+from ev_data import is_priced, load_ev_data
+
+
+def score_csv(model_path, input_path, output_path):
+    started = time.perf_counter()
+    model = load_cluster_model(model_path)
+    df = load_ev_data(input_path, use_cache=False)
+
+    # Same rows as training: unpriced rows get no cluster (<NA>) and no label
+    priced = is_priced(df).to_numpy()
+    clusters = score_frame(model, df.loc[priced, model['features']])
+    df['Cluster'] = pd.Series(pd.NA, index=df.index, dtype='Int32')
+    df.loc[priced, 'Cluster'] = clusters
+    labels = pd.Series(cluster_label_column(model, clusters), index=df.index[priced])
+    df['Cluster Label'] = labels.reindex(df.index)
+    df.to_csv(output_path, index=False)
+
+    elapsed = time.perf_counter() - started
+    print(f"Scored {priced.sum()} of {len(df)} rows with {model['manifest']['method']} model {model['path']} "
+          f"in {elapsed:.2f}s ({len(df) - priced.sum()} unpriced rows left unlabeled)")
+    print(df['Cluster Label'].value_counts(dropna=False)[lambda s: s > 0])
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Label EV registrations with a saved clustering model.")
+    parser.add_argument('--model', required=True, help="artifact directory or artifact root")
+    parser.add_argument('--input', required=True, help="CSV of registrations to label")
+    parser.add_argument('--output', required=True, help="labeled CSV to write")
+    args = parser.parse_args()
+
+    score_csv(args.model, args.input, args.output)
@@ -0,0 +1,60 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ev_artifacts import LATEST, load_cluster_model, resolve_artifact, save_cluster_model, score_frame
+from ev_clustering import cluster_stage, feature_engineering, generate_cluster_labels, load_and_prepare_data
+from ev_synthetic import generate_ev_data
+from score_ev_data import score_csv
+
+FEATURES = ['Electric Range', 'Base MSRP', 'Model Year']
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    df = generate_ev_data(3000, random_state=11)
+    rng = np.random.default_rng(11)
+    # Every third row keeps the dataset's 0 MSRP, i.e. has no list price
+    df['Base MSRP'] = np.where(np.arange(len(df)) % 3 == 0, 0, rng.integers(30_000, 120_000, len(df)))
+    path = tmp_path / 'ev_data.csv'
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize('method, kwargs', [
+    ('kmeans', {'n_clusters': 4, 'max_samples': 1000, 'assign_all': True}),
+    ('minibatch_kmeans', {'n_clusters': 4, 'batch_size': 256}),
+])
+def test_saved_model_scores_like_training(csv_path, tmp_path, method, kwargs):
+    df = feature_engineering(load_and_prepare_data(csv_path))
+    df_clustered, _, fitted_model = cluster_stage(method, df, FEATURES, return_model=True, **kwargs)
+    cluster_labels = generate_cluster_labels(df_clustered)
+    # The cached form of the model holds plain arrays only, no sklearn objects
+    assert b'sklearn' not in pickle.dumps(fitted_model)
+
+    artifact_root = str(tmp_path / 'models')
+    path = save_cluster_model(artifact_root, cluster_labels=cluster_labels, **fitted_model)
+    assert resolve_artifact(artifact_root) == path
+    with open(os.path.join(artifact_root, LATEST)) as f:
+        assert f.read() == os.path.basename(path)
+
+    model = load_cluster_model(artifact_root)
+    assert isinstance(model['mean'], np.memmap)
+    assert model['labels'] == cluster_labels
+    np.testing.assert_array_equal(score_frame(model, df_clustered), df_clustered['Cluster'].to_numpy())
+
+    output_path = str(tmp_path / 'scored.csv')
+    scored = score_csv(artifact_root, csv_path, output_path)
+    priced = scored['Base MSRP'] > 1000
+    assert scored.loc[~priced, 'Cluster'].isna().all()
+    assert scored.loc[~priced, 'Cluster Label'].isna().all()
+    np.testing.assert_array_equal(
+        scored.loc[priced, 'Cluster'].to_numpy(dtype=np.int32), df_clustered['Cluster'].to_numpy()
+    )
+    expected_labels = df_clustered['Cluster'].map(cluster_labels).to_numpy()
+    np.testing.assert_array_equal(scored.loc[priced, 'Cluster Label'].astype(object).to_numpy(), expected_labels)
+    written = pd.read_csv(output_path)
+    assert written['Cluster'].isna().sum() == (~priced).sum()
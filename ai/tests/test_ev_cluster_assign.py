@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ev_cluster_assign import label_and_merge_clusters
+from ev_synthetic import generate_ev_data
+
+
+def loc_merge(df, ev_cluster_df, cluster_labels):
+    """The original copy-and-.loc merge that label_and_merge_clusters replaced."""
+    df_clusters = df.copy()
+    df_clusters['Cluster'] = -1
+    df_clusters.loc[ev_cluster_df.index, 'Cluster'] = ev_cluster_df['Cluster']
+    df_clusters['Cluster Label'] = df_clusters['Cluster'].map(cluster_labels)
+    return df_clusters
+
+
+def clustered_sample(df, n_clusters=4):
+    rng = np.random.default_rng(0)
+    ev_cluster_df = df.sample(frac=0.7, random_state=0)[['Electric Range']].copy()
+    ev_cluster_df['Cluster'] = rng.integers(-1, n_clusters, len(ev_cluster_df))
+    return ev_cluster_df
+
+
+def test_matches_loc_merge():
+    # Shuffled, non-contiguous index labels
+    df = generate_ev_data(500, random_state=0).sample(frac=1.0, random_state=1)
+    df.index = df.index * 3 + 7
+    ev_cluster_df = clustered_sample(df)
+    # Two clusters share a label; cluster 3 has none
+    cluster_labels = {-1: 'Noise', 0: 'Budget', 1: 'Premium', 2: 'Budget'}
+
+    expected = loc_merge(df, ev_cluster_df, cluster_labels)
+    result = label_and_merge_clusters(df, ev_cluster_df, cluster_labels)
+
+    assert result is df
+    pd.testing.assert_series_equal(result['Cluster'].astype(np.int64), expected['Cluster'])
+    pd.testing.assert_series_equal(result['Cluster Label'].astype(object), expected['Cluster Label'].astype(object))
+
+
+def test_rejects_rows_missing_from_df():
+    df = generate_ev_data(100, random_state=0)
+    ev_cluster_df = clustered_sample(df)
+    df = df.drop(index=ev_cluster_df.index[:1])
+    before = df.copy()
+
+    with pytest.raises(ValueError, match='not in df'):
+        label_and_merge_clusters(df, ev_cluster_df, {0: 'Budget'})
+    # The last row is not silently relabeled
+    pd.testing.assert_frame_equal(df, before)
+
+
+def test_rejects_duplicate_index():
+    df = generate_ev_data(100, random_state=0)
+    ev_cluster_df = clustered_sample(df)
+    df.index = df.index % 50
+
+    with pytest.raises(ValueError, match='unique index'):
+        label_and_merge_clusters(df, ev_cluster_df, {0: 'Budget'})
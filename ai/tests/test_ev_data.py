@@ -0,0 +1,128 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ev_data
+from ev_data import cache_path_for, compact_dtypes, extract_lat_lon, load_ev_data
+from ev_synthetic import generate_ev_data
+
+BAD_LOCATIONS = [
+    'POINT (abc 47.6)',
+    'POINT (-122.3)',
+    'POINT (-122.3 47.6 10)',
+    'LINESTRING (-122.3 47.6, -122.4 47.7)',
+    '',
+]
+
+
+def apply_lat_lon(wkt):
+    """The per-row parser extract_lat_lon replaced."""
+    try:
+        wkt = wkt.strip().replace("POINT (", "").replace(")", "")
+        lon, lat = map(float, wkt.split())
+        return pd.Series({'Latitude': lat, 'Longitude': lon})
+    except:  # noqa: E722
+        return pd.Series({'Latitude': None, 'Longitude': None})
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'ev_data.csv'
+    df = generate_ev_data(2000, random_state=3)
+    # Scores that float32 cannot hold exactly, and an integer column with gaps
+    df['Score'] = np.random.default_rng(3).normal(size=len(df))
+    df.loc[::7, 'Electric Range'] = np.nan
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture(params=['pyarrow', 'pandas'])
+def parser(request, monkeypatch):
+    if request.param == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    else:
+        monkeypatch.setattr(ev_data, 'parquet_available', lambda: False)
+    return request.param
+
+
+def test_cache_path_tracks_mtime_size_and_schema(csv_path, monkeypatch):
+    path = cache_path_for(csv_path)
+    assert cache_path_for(csv_path) == path
+
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    touched = cache_path_for(csv_path)
+    assert touched != path
+
+    with open(csv_path, 'a') as f:
+        f.write('\n')
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert cache_path_for(csv_path) not in (path, touched)
+
+    monkeypatch.setattr(ev_data, 'CACHE_SCHEMA_VERSION', ev_data.CACHE_SCHEMA_VERSION + 1)
+    assert cache_path_for(csv_path) != touched
+
+
+def test_changed_csv_rebuilds_the_cache(csv_path):
+    pytest.importorskip('pyarrow')
+    load_ev_data(csv_path)
+    first = cache_path_for(csv_path)
+    assert os.path.exists(first)
+
+    df = pd.read_csv(csv_path)
+    df.iloc[:10].to_csv(csv_path, index=False)
+    assert len(load_ev_data(csv_path)) == 10
+    # The stale cache of the old file is removed
+    assert os.listdir(os.path.dirname(first)) == [os.path.basename(cache_path_for(csv_path))]
+
+
+@pytest.mark.parametrize('use_cache', [True, False])
+def test_compact_dtypes_keeps_csv_values(csv_path, use_cache):
+    if use_cache:
+        pytest.importorskip('pyarrow')
+    raw = pd.read_csv(csv_path)
+
+    compact = load_ev_data(csv_path, use_cache=use_cache)
+
+    assert isinstance(compact['Make'].dtype, pd.CategoricalDtype)
+    assert compact['Model Year'].dtype.itemsize < raw['Model Year'].dtype.itemsize
+    assert compact['Score'].dtype == np.float64
+    pd.testing.assert_frame_equal(compact.astype(raw.dtypes.to_dict()), raw)
+
+
+def test_compact_dtypes_narrows_only_exact_values():
+    df = pd.DataFrame({
+        'whole': [1.0, 2.0, np.nan],
+        'halves': [0.5, 1.5, np.nan],
+        'tenths': [0.1, 0.2, 0.3],
+    })
+    compact = compact_dtypes(df.copy())
+
+    assert compact['halves'].dtype == np.float32
+    assert compact['tenths'].dtype == np.float64
+    pd.testing.assert_frame_equal(compact.astype(np.float64), df)
+
+
+def test_extract_lat_lon_matches_per_row_parser(parser):
+    locations = generate_ev_data(1000, random_state=5)['Vehicle Location']
+    valid = locations.dropna()
+    expected = valid.apply(apply_lat_lon).astype(np.float64)
+
+    for series in (valid, valid.astype('category')):
+        lat, lon, malformed = extract_lat_lon(series)
+        np.testing.assert_array_equal(lat, expected['Latitude'].to_numpy())
+        np.testing.assert_array_equal(lon, expected['Longitude'].to_numpy())
+        assert malformed == 0
+
+
+def test_extract_lat_lon_counts_malformed(parser):
+    locations = pd.Series(['POINT (-122.3 47.6)', *BAD_LOCATIONS, None, np.nan, 'POINT (-122.3 47.6)'])
+
+    for series in (locations, locations.astype('category')):
+        lat, lon, malformed = extract_lat_lon(series)
+        assert malformed == len(BAD_LOCATIONS)
+        np.testing.assert_array_equal(lat[[0, -1]], [47.6, 47.6])
+        np.testing.assert_array_equal(lon[[0, -1]], [-122.3, -122.3])
+        assert np.isnan(lat[1:-1]).all() and np.isnan(lon[1:-1]).all()
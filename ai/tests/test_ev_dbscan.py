@@ -0,0 +1,26 @@
+import numpy as np
+from sklearn.cluster import DBSCAN
+from sklearn.metrics import adjusted_rand_score
+
+from ev_cluster_assign import nearest_core_point
+from ev_dbscan import kdtree_dbscan
+
+
+def grid(size=20):
+    return np.array([(x, y) for x in range(size) for y in range(size)], dtype=np.float64)
+
+
+def test_neighbors_at_exactly_eps_are_reachable():
+    # Edge points have 4 neighbors at distance exactly 1: border points, not noise
+    X = grid()
+    labels, _ = kdtree_dbscan(X, eps=1.0, min_samples=5)
+    expected = DBSCAN(eps=1.0, min_samples=5).fit_predict(X)
+
+    np.testing.assert_array_equal(labels == -1, expected == -1)
+    assert adjusted_rand_score(labels, expected) == 1.0
+
+
+def test_nearest_core_point_includes_exact_eps():
+    predict = nearest_core_point(np.array([[0.0, 0.0]]), [3], eps=1.0)
+    labels = predict(np.array([[1.0, 0.0], [0.0, -1.0], [1.0, 0.5]]))
+    np.testing.assert_array_equal(labels, [3, 3, -1])
@@ -0,0 +1,28 @@
+import importlib
+import sys
+
+from ev_importtime import ImportTimer
+
+
+def installed_timers():
+    return [finder for finder in sys.meta_path if isinstance(finder, ImportTimer)]
+
+
+def test_importing_the_pipeline_installs_no_timer():
+    import cluster_ev_data_refactored
+
+    assert cluster_ev_data_refactored.IMPORT_TIMER is None
+    assert installed_timers() == []
+
+
+def test_timer_records_imports_only_while_active():
+    sys.modules.pop('colorsys', None)
+    with ImportTimer() as timer:
+        assert installed_timers() == [timer]
+        importlib.import_module('colorsys')
+    assert installed_timers() == []
+    assert [record['module'] for record in timer.records] == ['colorsys']
+
+    sys.modules.pop('colorsys', None)
+    importlib.import_module('colorsys')
+    assert len(timer.records) == 1
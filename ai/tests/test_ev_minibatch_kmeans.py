@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from ev_minibatch_kmeans import fit_minibatch_kmeans
+from ev_synthetic import generate_ev_data
+
+FEATURES = ['Electric Range', 'Base MSRP', 'Model Year']
+
+
+def priced_ev_data(n_rows, unpriced_rows):
+    """Synthetic EV rows, all priced except the first unpriced_rows."""
+    df = generate_ev_data(n_rows, random_state=1)
+    rng = np.random.default_rng(1)
+    df['Base MSRP'] = rng.integers(30_000, 120_000, n_rows)
+    df.loc[:unpriced_rows - 1, 'Base MSRP'] = 0
+    return df
+
+
+def test_fit_skips_batches_without_complete_rows():
+    df = priced_ev_data(2000, 0)
+    empty = df.iloc[:100].assign(**{'Base MSRP': np.nan})
+    batches = [empty, df.iloc[:1000], df.iloc[:0], df.iloc[1000:]]
+
+    scaler, model, stats = fit_minibatch_kmeans(lambda: iter(batches), FEATURES, n_clusters=3, batch_size=256)
+
+    assert stats['rows'] > 0
+    assert model.cluster_centers_.shape == (3, len(FEATURES))
+    np.testing.assert_allclose(scaler.mean_, df[FEATURES].mean().to_numpy())
+
+
+def test_streaming_pipeline_with_unpriced_chunk(tmp_path):
+    from cluster_ev_data_refactored import run_streaming_pipeline
+
+    csv_path = tmp_path / 'ev.csv'
+    output_path = tmp_path / 'labeled.csv'
+    # The first 100-row chunk has no priced rows at all
+    priced_ev_data(1000, 100).to_csv(csv_path, index=False)
+
+    run_streaming_pipeline(str(csv_path), str(output_path), n_clusters=3, chunk_size=100, batch_size=128)
+
+    labeled = pd.read_csv(output_path)
+    assert len(labeled) == 900
+    assert (labeled['Cluster'] >= 0).all()
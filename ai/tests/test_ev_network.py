@@ -0,0 +1,61 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+import ev_network
+from ev_network import correlation_graph, network_layout
+from ev_stage_cache import StageCache
+
+
+@pytest.fixture
+def corr():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(500, 6))
+    values[:, 1] = -values[:, 0] + 0.3 * rng.normal(size=500)
+    values[:, 2] = values[:, 0] + 0.5 * rng.normal(size=500)
+    return pd.DataFrame(values, columns=list('abcdef')).corr()
+
+
+def loop_graph(corr, threshold, absolute_weight):
+    """The per-pair loop correlation_graph replaced."""
+    G = nx.Graph()
+    G.add_nodes_from(corr.columns)
+    for i in range(len(corr.columns)):
+        for j in range(i + 1, len(corr.columns)):
+            value = corr.iloc[i, j]
+            if abs(value) >= threshold:
+                G.add_edge(corr.columns[i], corr.columns[j], weight=abs(value) if absolute_weight else value)
+    return G
+
+
+@pytest.mark.parametrize('absolute_weight', [False, True])
+def test_graph_and_layout_match_the_loop(corr, absolute_weight):
+    G = correlation_graph(corr, 0.5, absolute_weight=absolute_weight)
+    expected = loop_graph(corr, 0.5, absolute_weight)
+
+    assert {frozenset(edge) for edge in G.edges} == {frozenset(edge) for edge in expected.edges}
+    for u, v, weight in expected.edges(data='weight'):
+        assert G[u][v]['weight'] == pytest.approx(weight)
+        assert G[u][v]['corr'] == pytest.approx(corr.loc[u, v])
+    assert (min(weight for _, _, weight in G.edges(data='weight')) < 0) != absolute_weight
+
+    expected_pos = nx.spring_layout(expected, seed=42)
+    pos = network_layout(G)
+    for node in expected_pos:
+        np.testing.assert_allclose(pos[node], expected_pos[node])
+
+
+def test_layout_is_persisted(corr, tmp_path, monkeypatch):
+    G = correlation_graph(corr, 0.5)
+    stages = StageCache(str(tmp_path))
+    monkeypatch.setattr(ev_network, '_layouts', {})
+    first = network_layout(G, stages=stages)
+
+    # A new process starts without the in-memory layouts
+    monkeypatch.setattr(ev_network, '_layouts', {})
+    again = network_layout(G, stages=stages)
+
+    assert (stages.misses, stages.hits) == (1, 1)
+    for node in first:
+        np.testing.assert_array_equal(again[node], first[node])
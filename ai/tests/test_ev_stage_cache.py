@@ -0,0 +1,114 @@
+import importlib
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ev_clustering
+from ev_stage_cache import MANIFEST, StageCache, local_sources
+
+
+def double(frame, factor=2):
+    return frame * factor
+
+
+def mixed_result():
+    frame = pd.DataFrame({'a': np.arange(5, dtype=np.int32), 'b': list('vwxyz')})
+    return frame, np.linspace(0, 1, 7), {'labels': {0: 'Budget', -1: 'Noise'}}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return StageCache(str(tmp_path / 'stages'))
+
+
+@pytest.fixture
+def stage_module(tmp_path, monkeypatch):
+    """A stage function whose helper lives in another module, imported lazily."""
+    (tmp_path / 'stage_helpers.py').write_text('def scale(x):\n    return x * 2\n')
+    (tmp_path / 'stage_module.py').write_text(
+        'def run_stage(x):\n    from stage_helpers import scale\n\n    return scale(x)\n'
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield importlib.import_module('stage_module')
+    sys.modules.pop('stage_module', None)
+    sys.modules.pop('stage_helpers', None)
+
+
+def test_key_is_stable_and_covers_data_and_parameters(cache):
+    frame = pd.DataFrame({'x': [1.0, 2.0, 3.0]})
+    key = cache.run('double', double, frame).key
+
+    assert cache.run('double', double, frame.copy()).key == key
+    assert StageCache(cache.cache_dir).run('double', double, frame).key == key
+    assert cache.run('double', double, frame, factor=3).key != key
+    assert cache.run('double', double, frame.assign(x=[1.0, 2.0, 4.0])).key != key
+    assert cache.run('double', double, frame, inputs=['data.csv:1']).key != key
+
+
+def test_changing_an_imported_helper_misses(cache, stage_module, tmp_path):
+    first = cache.run('stage', stage_module.run_stage, 21)
+    assert first.value == 42
+    assert cache.run('stage', stage_module.run_stage, 21).key == first.key
+
+    (tmp_path / 'stage_helpers.py').write_text('def scale(x):\n    return x * 3\n')
+    sys.modules.pop('stage_helpers')
+    second = cache.run('stage', stage_module.run_stage, 21)
+
+    assert second.key != first.key
+    assert second.value == 63
+    assert cache.misses == 2
+
+
+def test_clustering_stages_cover_their_helper_modules():
+    sources = local_sources(ev_clustering.__file__)
+    for module in ('ev_cluster_assign', 'ev_data', 'ev_dbscan', 'ev_hierarchical', 'ev_kselect',
+                   'ev_minibatch_kmeans'):
+        assert f"{module}.py" in sources
+
+
+def test_tuple_parts_round_trip(cache):
+    pytest.importorskip('pyarrow')
+    frame, array, extra = mixed_result()
+
+    cache.run('mixed', mixed_result).value
+    loaded = cache.run('mixed', mixed_result)
+    value = loaded.value
+
+    with open(os.path.join(cache.cache_dir, loaded.key, MANIFEST)) as f:
+        assert json.load(f) == {'parts': ['parquet', 'npy', 'pkl'], 'tuple': True}
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert isinstance(value, tuple)
+    pd.testing.assert_frame_equal(value[0], frame)
+    np.testing.assert_array_equal(value[1], array)
+    assert value[2] == extra
+
+    # A part is a stage input keyed by its parent, so a chained stage hits without recomputing
+    doubled = cache.run('double', double, loaded.part(1))
+    np.testing.assert_array_equal(doubled.value, array * 2)
+    assert cache.run('double', double, cache.run('mixed', mixed_result).part(1)).key == doubled.key
+    assert cache.run('double', double, loaded.part(0)).key != doubled.key
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = StageCache(str(tmp_path / 'stages'), max_bytes=3 * 8192)
+    arrays = {name: np.full(1000, index, dtype=np.float64) for index, name in enumerate('abcd')}
+
+    keys = {}
+    for age, name in enumerate('abc'):
+        result = cache.run(name, np.copy, arrays[name])
+        result.value
+        keys[name] = result.key
+        # Distinct, increasing access times without sleeping
+        os.utime(os.path.join(cache.cache_dir, result.key), (age, age))
+    # Reading 'a' makes it the most recently used entry
+    cache.run('a', np.copy, arrays['a']).value
+    cache.run('d', np.copy, arrays['d']).value
+
+    remaining = set(os.listdir(cache.cache_dir))
+    assert keys['b'] not in remaining
+    assert {keys['a'], keys['c']} <= remaining
+    assert cache.hits == 1
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ev_stats import CorrelationAccumulator, GROUP_REDUCTIONS, streaming_correlations, summarize
+from ev_synthetic import generate_ev_data
+
+COLUMNS = ['Electric Range', 'Base MSRP', 'Model Year', 'Score']
+VEHICLE_TYPE = 'Electric Vehicle Type'
+GROUPS = {
+    'BEV': lambda batch: batch[VEHICLE_TYPE].str.contains('Battery Electric', na=False),
+    'PHEV': lambda batch: batch[VEHICLE_TYPE].str.contains('Plug-in Hybrid', na=False),
+}
+
+
+@pytest.fixture
+def df():
+    df = generate_ev_data(3000, random_state=7)
+    rng = np.random.default_rng(7)
+    df['Score'] = rng.normal(size=len(df)) + df['Electric Range'] / 100
+    df.loc[rng.random(len(df)) < 0.1, 'Electric Range'] = np.nan
+    df.loc[rng.random(len(df)) < 0.05, 'Score'] = np.inf
+    df.loc[rng.random(len(df)) < 0.02, 'Make'] = np.nan
+    # BEVs first, so the first batches hold a single vehicle type
+    return df.sort_values(VEHICLE_TYPE, kind='stable').reset_index(drop=True)
+
+
+def batches(df, sizes):
+    start = 0
+    for size in sizes:
+        yield df.iloc[start:start + size]
+        start += size
+    yield df.iloc[start:]
+
+
+def expected_corr(frame):
+    return frame[COLUMNS].replace([np.inf, -np.inf], np.nan).corr()
+
+
+@pytest.mark.parametrize('categorical', [False, True])
+@pytest.mark.parametrize('keys', ['Make', ['Make', VEHICLE_TYPE]])
+def test_summarize_matches_groupby(df, keys, categorical):
+    source = df.astype({'Make': 'category', VEHICLE_TYPE: 'category'}) if categorical else df
+    columns = ['Electric Range', 'Base MSRP']
+    aggregations = {'size': ('size', keys)}
+    aggregations.update({reduction: (reduction, keys, columns) for reduction in GROUP_REDUCTIONS[1:]})
+
+    summary = summarize(source, aggregations)
+
+    # Expected from the plain string keys: summarize() labels groups with the
+    # category values rather than a CategoricalIndex
+    grouped = df.groupby(keys, observed=True, sort=True)
+    expected_size = grouped.size()
+    pd.testing.assert_series_equal(summary['size'], expected_size[expected_size > 0], check_names=False)
+    for reduction in GROUP_REDUCTIONS[1:]:
+        expected = grouped[columns].agg(reduction)
+        pd.testing.assert_frame_equal(summary[reduction], expected, check_dtype=False, rtol=1e-9)
+
+
+def test_summarize_single_column_and_nulls(df):
+    summary = summarize(df, {'range': ('mean', 'Make', 'Electric Range'), 'missing': ('nulls',)})
+
+    pd.testing.assert_series_equal(summary['range'], df.groupby('Make')['Electric Range'].mean(), rtol=1e-9)
+    pd.testing.assert_series_equal(summary['missing'], df.isna().sum(), check_names=False)
+
+
+@pytest.mark.parametrize('sizes', [[], [1000, 7, 1], [500] * 5])
+def test_streaming_correlations_match_pandas(df, sizes):
+    correlations = streaming_correlations(batches(df, sizes), COLUMNS, groups=GROUPS)
+
+    pd.testing.assert_frame_equal(correlations['all'].corr(), expected_corr(df), rtol=1e-9, atol=1e-12)
+    for name, select in GROUPS.items():
+        subset = df[select(df)]
+        assert correlations[name].rows == len(subset)
+        pd.testing.assert_frame_equal(correlations[name].corr(), expected_corr(subset), rtol=1e-9, atol=1e-12)
+
+
+def test_accumulators_merge_like_one_pass(df):
+    left = CorrelationAccumulator(COLUMNS).update(df.iloc[:1200])
+    right = CorrelationAccumulator(COLUMNS).update(df.iloc[1200:], mask=(df['Model Year'] > 2015).iloc[1200:])
+    merged = left.merge(right)
+
+    expected = pd.concat([df.iloc[:1200], df.iloc[1200:][df['Model Year'].iloc[1200:] > 2015]])
+    pd.testing.assert_frame_equal(merged.corr(), expected_corr(expected), rtol=1e-9, atol=1e-12)
+    moments = merged.moments()
+    finite = expected[COLUMNS].replace([np.inf, -np.inf], np.nan)
+    np.testing.assert_allclose(moments['count'], finite.count())
+    np.testing.assert_allclose(moments['mean'], finite.mean(), rtol=1e-12)
+    np.testing.assert_allclose(moments['std'], finite.std(), rtol=1e-9)
@@ -0,0 +1,98 @@
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from nova_reel_aws import parse_s3_uri
+from nova_reel_download import ETAG_SUFFIX, download_outputs, local_path
+
+BUCKET = "videos"
+
+
+@pytest.fixture
+def s3():
+    with mock_aws():
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket=BUCKET)
+        yield s3_client
+
+
+def put_video(s3_client, job_id, body):
+    key = f"out/{job_id}/output.mp4"
+    s3_client.put_object(Bucket=BUCKET, Key=key, Body=body)
+    return f"s3://{BUCKET}/{key}"
+
+
+class StaleHead:
+    """Reports an outdated ETag from HEAD, as if the object changed mid-download."""
+
+    def __init__(self, s3_client):
+        self.s3_client = s3_client
+
+    def head_object(self, **kwargs):
+        return {**self.s3_client.head_object(**kwargs), "ETag": '"stale"'}
+
+    def get_object(self, **kwargs):
+        return self.s3_client.get_object(**kwargs)
+
+
+def test_ranged_parts_reassemble_in_order(s3, tmp_path):
+    bodies = {job_id: os.urandom(10_000 + 777 * n) for n, job_id in enumerate("abc")}
+    uris = [put_video(s3, job_id, body) for job_id, body in bodies.items()]
+    uris.append(put_video(s3, "empty", b""))
+
+    results = download_outputs(s3, uris, tmp_path, part_size=1024, max_workers=4)
+
+    assert [result["uri"] for result in results] == uris
+    assert [result["status"] for result in results] == ["downloaded"] * 4
+    for uri, body in zip(uris, [*bodies.values(), b""]):
+        path = local_path(tmp_path, uri)
+        with open(path, "rb") as f:
+            assert f.read() == body
+        bucket, key = parse_s3_uri(uri)
+        with open(path + ETAG_SUFFIX) as f:
+            assert f.read() == s3.head_object(Bucket=bucket, Key=key)["ETag"]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
+
+
+def test_current_files_are_skipped(s3, tmp_path):
+    uris = [put_video(s3, job_id, os.urandom(5000)) for job_id in "ab"]
+    download_outputs(s3, uris, tmp_path, part_size=1024)
+
+    results = download_outputs(s3, uris, tmp_path, part_size=1024)
+    assert [result["status"] for result in results] == ["skipped"] * 2
+
+    # Without the .etag sidecar, single-part ETags are checked against the MD5
+    os.remove(local_path(tmp_path, uris[0]) + ETAG_SUFFIX)
+    results = download_outputs(s3, uris[:1], tmp_path, part_size=1024)
+    assert results[0]["status"] == "skipped"
+
+
+def test_changed_files_are_downloaded_again(s3, tmp_path):
+    uri = put_video(s3, "a", os.urandom(5000))
+    download_outputs(s3, [uri], tmp_path, part_size=1024)
+    path = local_path(tmp_path, uri)
+
+    # A truncated local copy
+    with open(path, "r+b") as f:
+        f.truncate(4000)
+    assert download_outputs(s3, [uri], tmp_path)[0]["status"] == "downloaded"
+    assert os.path.getsize(path) == 5000
+
+    # Same size, new content and ETag
+    body = os.urandom(5000)
+    put_video(s3, "a", body)
+    assert download_outputs(s3, [uri], tmp_path)[0]["status"] == "downloaded"
+    with open(path, "rb") as f:
+        assert f.read() == body
+
+
+def test_replaced_object_fails_without_partial_file(s3, tmp_path):
+    uri = put_video(s3, "a", os.urandom(5000))
+
+    results = download_outputs(StaleHead(s3), [uri], tmp_path, part_size=1024)
+
+    assert results[0]["status"] == "failed"
+    assert "PreconditionFailed" in results[0]["error"]
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from nova_reel_fake import FakeBedrockRuntime
+from nova_reel_poller import InvocationPoller
+
+OUTPUT_CONFIG = {"s3OutputDataConfig": {"s3Uri": "s3://bucket/videos"}}
+
+
+def start_job(runtime):
+    response = runtime.start_async_invoke(
+        modelId="amazon.nova-reel-v1:1", modelInput={}, outputDataConfig=OUTPUT_CONFIG
+    )
+    return response["invocationArn"]
+
+
+class RecordingRuntime:
+    """Wraps a fake runtime, recording when each ARN is checked."""
+
+    def __init__(self, runtime, broken_arns=()):
+        self.runtime = runtime
+        self.broken_arns = set(broken_arns)
+        self.checks = {}
+
+    def get_async_invoke(self, invocationArn):
+        self.checks.setdefault(invocationArn, []).append(time.monotonic())
+        if invocationArn in self.broken_arns:
+            return {"invocationArn": invocationArn}
+        return self.runtime.get_async_invoke(invocationArn=invocationArn)
+
+
+def test_futures_resolve_when_jobs_complete():
+    runtime = FakeBedrockRuntime(duration=0.2, jitter=0.0)
+    with InvocationPoller(
+        runtime, expected_seconds=0.2, min_interval=0.01, max_interval=0.05
+    ) as poller:
+        arns = [start_job(runtime) for _ in range(3)]
+        futures = [poller.watch(arn) for arn in arns]
+        results = [future.result(timeout=5) for future in futures]
+
+    assert [result["status"] for result in results] == ["Completed"] * 3
+    for arn, result in zip(arns, results):
+        # Resolved within a poll interval or two of the job finishing
+        assert 0.2 <= result["latency_seconds"] < 0.4
+        assert poller.latencies[arn] == pytest.approx(result["latency_seconds"], abs=1e-3)
+        assert result["service_seconds"] == pytest.approx(0.2, abs=1e-3)
+    assert poller.stats()["finished"] == 3
+
+
+def test_backoff_grows_once_a_job_is_overdue():
+    poller = InvocationPoller(
+        None, expected_seconds=10.0, min_interval=1.0, max_interval=60.0
+    )
+    assert poller._interval(0.0, 0) == 5.0
+    overdue = [poller._interval(12.0, polls) for polls in range(8)]
+    assert overdue == [1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 60.0, 60.0]
+
+    runtime = RecordingRuntime(FakeBedrockRuntime(duration=0.6, jitter=0.0))
+    with InvocationPoller(
+        runtime, expected_seconds=0.1, min_interval=0.02, max_interval=1.0
+    ) as poller:
+        arn = start_job(runtime.runtime)
+        submitted_at = time.monotonic()
+        poller.watch(arn, submitted_at=submitted_at).result(timeout=5)
+
+    overdue_checks = [t for t in runtime.checks[arn] if t - submitted_at >= 0.1]
+    gaps = [later - earlier for earlier, later in zip(overdue_checks, overdue_checks[1:])]
+    assert len(gaps) >= 3
+    assert all(later > earlier for earlier, later in zip(gaps, gaps[1:]))
+    assert gaps[-1] > 0.1
+
+
+def test_failed_check_fails_only_that_future():
+    runtime = RecordingRuntime(FakeBedrockRuntime(duration=0.1, jitter=0.0))
+    with InvocationPoller(
+        runtime, expected_seconds=0.1, min_interval=0.01, max_interval=0.05
+    ) as poller:
+        unknown = poller.watch("arn:aws:bedrock:us-east-1:000000000000:async-invoke/x")
+        broken_arn = start_job(runtime.runtime)
+        runtime.broken_arns.add(broken_arn)
+        broken = poller.watch(broken_arn)
+        healthy = poller.watch(start_job(runtime.runtime))
+
+        with pytest.raises(ClientError):
+            unknown.result(timeout=5)
+        # A response without a status must not take down the poller thread
+        with pytest.raises(KeyError):
+            broken.result(timeout=5)
+        assert healthy.result(timeout=5)["status"] == "Completed"